@@ -0,0 +1,187 @@
+import json
+import re
+import logging
+from backend.chunking import weighted_vote
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Combined tone/engagement assessment settings
+MAX_FLAGGED_SENTENCES = 5  # Flagged sentences requested per chunk
+MAX_REPORTED_SENTENCES = 20  # Flagged sentences kept in a report
+ASSESSMENT_MAX_TOKENS = 800  # Output budget for one JSON reply
+
+TONES = ("positive", "neutral", "technical")
+PRONOUNS = ("second_person", "third_person", "mixed", "none")
+ISSUES = ("technical", "unengaging", "third_person", "complex")
+
+ASSESSMENT_PROMPT = (
+    "Assess the following documentation text for non-technical marketers. Report its tone "
+    "(positive, neutral or technical), whether it is engaging, which pronouns it mainly uses for the "
+    "reader (second_person, third_person, mixed or none), and up to "
+    f"{MAX_FLAGGED_SENTENCES} sentences that are too technical, unengaging, written in the third person "
+    "or too complex, quoted exactly. Reply with JSON only."
+)
+
+# Gemini responseSchema (OpenAPI subset) for the reply
+ASSESSMENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "tone": {"type": "STRING", "enum": list(TONES)},
+        "engaging": {"type": "BOOLEAN"},
+        "pronouns": {"type": "STRING", "enum": list(PRONOUNS)},
+        "flagged_sentences": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "sentence": {"type": "STRING"},
+                    "issue": {"type": "STRING", "enum": list(ISSUES)}
+                },
+                "required": ["sentence", "issue"]
+            }
+        }
+    },
+    "required": ["tone", "engaging", "pronouns", "flagged_sentences"]
+}
+
+GENERATION_CONFIG = {
+    "maxOutputTokens": ASSESSMENT_MAX_TOKENS,
+    "responseMimeType": "application/json",
+    "responseSchema": ASSESSMENT_SCHEMA
+}
+
+CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.I)
+
+def normalize_enum(value, allowed):
+    """Match a string to an enum value, ignoring case and space/hyphen/underscore differences.
+
+    Args:
+        value: Decoded JSON value.
+        allowed (tuple): Enum values.
+
+    Returns:
+        str: The matching enum value, or None.
+    """
+    if not isinstance(value, str):
+        return None
+    value = re.sub(r'[\s-]+', '_', value.strip().lower())
+    return value if value in allowed else None
+
+def normalize_bool(value):
+    """Read a boolean, accepting "true"/"false" strings.
+
+    Args:
+        value: Decoded JSON value.
+
+    Returns:
+        bool: The value, or None if it is not a boolean.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return None
+
+def validate_assessment(data):
+    """Check a decoded reply against ASSESSMENT_SCHEMA, leniently.
+
+    Enum values are matched ignoring case, "true"/"false" strings count as
+    booleans and a missing 'flagged_sentences' as an empty list. Invalid
+    flagged-sentence entries are dropped rather than rejecting the whole
+    reply; 'tone', 'engaging' and 'pronouns' must be present and valid.
+
+    Args:
+        data: Decoded JSON reply.
+
+    Returns:
+        dict: Normalized assessment, or None if the reply does not match the schema.
+    """
+    if not isinstance(data, dict):
+        return None
+    tone, pronouns = normalize_enum(data.get("tone"), TONES), normalize_enum(data.get("pronouns"), PRONOUNS)
+    engaging = normalize_bool(data.get("engaging"))
+    flagged = data.get("flagged_sentences")
+    if flagged is None:
+        flagged = []
+    if tone is None or engaging is None or pronouns is None or not isinstance(flagged, list):
+        return None
+    sentences = [{"sentence": item["sentence"].strip(), "issue": normalize_enum(item.get("issue"), ISSUES)}
+                 for item in flagged
+                 if isinstance(item, dict) and isinstance(item.get("sentence"), str) and item["sentence"].strip()
+                 and normalize_enum(item.get("issue"), ISSUES)]
+    return {"tone": tone, "engaging": engaging, "pronouns": pronouns,
+            "flagged_sentences": sentences[:MAX_FLAGGED_SENTENCES], "fallback": False}
+
+def fallback_assessment(reply):
+    """Read an assessment out of a free-text reply with the old phrase checks.
+
+    Used only when a reply is not JSON at all, so one free-text answer does
+    not cost a second request. JSON replies are never scanned: the schema's
+    own enum values would match the phrases.
+
+    Args:
+        reply (str): Raw reply text.
+
+    Returns:
+        dict: Assessment with 'pronouns' None (unknown) and no flagged sentences.
+    """
+    lower = reply.lower()
+    tone = "technical" if "technical" in lower else ("positive" if "positive" in lower else "neutral")
+    engaging = not any(phrase in lower for phrase in ("lacks engagement", "not engaging", "unengaging"))
+    return {"tone": tone, "engaging": engaging, "pronouns": None, "flagged_sentences": [], "fallback": True}
+
+def parse_assessment(reply):
+    """Parse and validate one Gemini reply to ASSESSMENT_PROMPT.
+
+    Args:
+        reply (str or dict): Reply text, or an error dict from a failed request.
+
+    Returns:
+        dict: Assessment with 'tone', 'engaging', 'pronouns', 'flagged_sentences'
+            and 'fallback' (True if the reply was not JSON), or None if the
+            request failed or its JSON does not match the schema.
+    """
+    if not isinstance(reply, str):
+        return None
+    try:
+        data = json.loads(CODE_FENCE.sub('', reply))
+    except ValueError:
+        logger.warning("Assessment reply is not JSON; using phrase checks")
+        return fallback_assessment(reply)
+    assessment = validate_assessment(data)
+    if assessment is None:
+        logger.warning("Assessment reply did not match the schema; treating the chunk as failed")
+    return assessment
+
+def combine_assessments(assessments, weights):
+    """Combine per-chunk assessments into the document-level votes both dimensions read.
+
+    Args:
+        assessments (list): Assessment dict, or None for a failed request, per chunk.
+        weights (list): Weight of each chunk (its length).
+
+    Returns:
+        dict: 'tone_vote' (technical tone) and 'engagement_vote' (lacks engagement
+            or addresses readers in the third person), each a weighted vote with
+            'chunks'; the majority 'pronouns' usage; 'flagged_sentences'; and the
+            number of 'fallback_chunks' whose reply was not JSON.
+    """
+    def vote(verdict):
+        result = weighted_vote([verdict(a) if a else None for a in assessments], weights)
+        result["chunks"] = len(assessments)
+        return result
+
+    pronoun_weights = {}
+    for assessment, weight in zip(assessments, weights):
+        if assessment and assessment["pronouns"]:
+            pronoun_weights[assessment["pronouns"]] = pronoun_weights.get(assessment["pronouns"], 0) + weight
+    flagged = [item for assessment in assessments if assessment for item in assessment["flagged_sentences"]]
+    return {
+        "tone_vote": vote(lambda a: a["tone"] == "technical"),
+        "engagement_vote": vote(lambda a: not a["engaging"] or a["pronouns"] == "third_person"),
+        "pronouns": max(pronoun_weights, key=pronoun_weights.get) if pronoun_weights else None,
+        "flagged_sentences": flagged[:MAX_REPORTED_SENTENCES],
+        "fallback_chunks": sum(1 for a in assessments if a and a["fallback"])
+    }
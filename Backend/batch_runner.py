@@ -0,0 +1,345 @@
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from pathlib import Path
+from backend.doc_context import DocumentContext
+from backend.crawler import HostThrottle, analyze_page, summarize, load_sitemap, load_url_list, PAGES_FILE, SUMMARY_FILE
+from backend.run_store import atomic_write
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sharded batch settings
+SHARD_SIZE = 50  # Targets per shard; a shard is the unit of work and of retry
+PAGE_CONCURRENCY = 4  # Pages in flight per worker process (fetches and Gemini calls overlap)
+SHARD_RETRIES = 2  # Times a failed or killed shard is retried before the run gives up on it
+PROGRESS_INTERVAL = 1.0  # Seconds between progress updates
+
+MANIFEST_FILE = "manifest.json"
+SHARDS_DIR = "shards"
+HTML_SUFFIXES = ('.html', '.htm')
+
+def collect_targets(inputs=(), url_list=None, sitemap=None):
+    """Build the ordered, de-duplicated list of pages to process.
+
+    Args:
+        inputs (list): URLs, local HTML files, or directories searched recursively for HTML files.
+        url_list (str): Text file with one URL or path per line.
+        sitemap (str): URL of a sitemap.xml.
+
+    Returns:
+        list: Targets; URLs stay as given and local files become absolute paths.
+    """
+    raw = list(inputs)
+    if url_list:
+        raw.extend(load_url_list(url_list))
+    if sitemap:
+        raw.extend(load_sitemap(sitemap))
+    targets = []
+    for item in raw:
+        if item.startswith(('http://', 'https://')):
+            targets.append(item)
+        elif os.path.isdir(item):
+            targets.extend(str(path.resolve()) for path in sorted(Path(item).rglob('*'))
+                           if path.suffix.lower() in HTML_SUFFIXES)
+        elif os.path.isfile(item):
+            targets.append(os.path.abspath(item))
+        else:
+            logger.warning(f"Skipping {item}: not a URL, HTML file or directory")
+    return list(dict.fromkeys(targets))
+
+def load_target(target, throttle):
+    """Fetch a URL or read a local HTML file into a document context.
+
+    Args:
+        target (str): URL or absolute file path.
+        throttle (HostThrottle): Politeness throttle for URLs.
+
+    Returns:
+        DocumentContext: Parsed page; local files get a file:// URL.
+    """
+    if target.startswith(('http://', 'https://')):
+        throttle.wait(target)
+        return DocumentContext.fetch(target)
+    url = Path(target).as_uri()
+    try:
+        with open(target, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+    except OSError as e:
+        return DocumentContext(url, error=f"Error reading file: {str(e)}.")
+    return DocumentContext.from_html(url, html)
+
+def shard_path(output_dir, index, suffix):
+    """Path of a shard's output ('.jsonl') or completion marker ('.done')."""
+    return os.path.join(output_dir, SHARDS_DIR, f"shard-{index:05d}{suffix}")
+
+def read_shard(path):
+    """Read a shard's records, dropping a partial last line left by a killed worker.
+
+    The file is truncated after its last complete line, so appending more
+    records cannot glue them onto a half-written one.
+
+    Args:
+        path (str): Shard JSONL path.
+
+    Returns:
+        list: Complete records.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end < len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+def run_shard(output_dir, index, targets, first_index, concurrency=PAGE_CONCURRENCY, delay=0.0, revise=True):
+    """Process one shard in a worker process, resuming after its last completed page.
+
+    Pages are analyzed (and revised) a few at a time on threads, so fetches
+    and Gemini calls of different pages overlap while parsing and scoring
+    use this process's core. Each record is appended to the shard's JSONL as
+    soon as it is done; the shard is marked complete at the end.
+
+    Args:
+        output_dir (str): Batch output directory.
+        index (int): Shard number.
+        targets (list): Targets of this shard.
+        first_index (int): Position of the shard's first target in the whole batch.
+        concurrency (int): Pages in flight at once.
+        delay (float): Minimum seconds between requests to one host from this process.
+        revise (bool): Also produce revised text.
+
+    Returns:
+        dict: Shard number and counts of processed, skipped and failed pages.
+    """
+    path = shard_path(output_dir, index, ".jsonl")
+    done = {record["index"] for record in read_shard(path) if "index" in record}
+    todo = [(first_index + offset, target) for offset, target in enumerate(targets)
+            if first_index + offset not in done]
+    throttle = HostThrottle(delay)
+    errors = 0
+
+    def process(item):
+        position, target = item
+        try:
+            record = analyze_page(load_target(target, throttle), revise)
+        except Exception as e:
+            logger.error(f"Failed to process {target}: {str(e)}")
+            record = {"url": target, "status": "error", "error": str(e)}
+        record["index"] = position
+        record["source"] = target
+        return record
+
+    with open(path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"shard{index}") as pool:
+        for future in as_completed([pool.submit(process, item) for item in todo]):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            errors += record["status"] != "ok"
+    result = {"shard": index, "processed": len(todo), "skipped": len(done), "errors": errors}
+    atomic_write(shard_path(output_dir, index, ".done"), json.dumps(result))
+    return result
+
+def init_worker(log_level):
+    """Set the log level in a worker process (spawned workers do not inherit it)."""
+    logging.getLogger().setLevel(log_level)
+
+class Progress:
+    """Counts finished pages by following the shard files and prints a status line.
+
+    Args:
+        output_dir (str): Batch output directory.
+        shards (int): Number of shards.
+        total (int): Number of targets.
+        stream (file): Where to print (default: stderr).
+    """
+
+    def __init__(self, output_dir, shards, total, stream=None):
+        self.output_dir = output_dir
+        self.shards = shards
+        self.total = total
+        self.stream = stream or sys.stderr
+        self._offsets = {}
+        self._pages = 0
+        self._start = time.monotonic()
+        self._start_pages = self.pages()  # Already done when resuming; not counted in the rate
+
+    def pages(self):
+        """Return the number of pages written so far, reading only new bytes of each shard."""
+        for index in range(self.shards):
+            path = shard_path(self.output_dir, index, ".jsonl")
+            offset = self._offsets.get(index, 0)
+            try:
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue
+            end = data.rfind(b'\n') + 1
+            self._pages += data[:end].count(b'\n')
+            self._offsets[index] = offset + end
+        return self._pages
+
+    def update(self, shards_done, final=False):
+        """Print the current progress line.
+
+        Args:
+            shards_done (int): Shards marked complete.
+            final (bool): End the line instead of overwriting it.
+        """
+        pages = self.pages()
+        elapsed = time.monotonic() - self._start
+        rate = (pages - self._start_pages) / elapsed if elapsed > 0 else 0.0
+        eta = f"{(self.total - pages) / rate:.0f}s" if rate > 0 and pages < self.total else "-"
+        percent = 100.0 * pages / self.total if self.total else 100.0
+        line = (f"{pages}/{self.total} pages ({percent:.1f}%), {shards_done}/{self.shards} shards, "
+                f"{rate:.2f} pages/s, ETA {eta}")
+        end = "\n" if final or not self.stream.isatty() else ""
+        self.stream.write(("\r" if self.stream.isatty() else "") + line + end)
+        self.stream.flush()
+
+def load_manifest(output_dir, targets, shard_size):
+    """Create the batch manifest, or reuse the existing one when resuming.
+
+    Args:
+        output_dir (str): Batch output directory.
+        targets (list): Targets of this invocation (ignored when resuming with none given).
+        shard_size (int): Targets per shard for a new batch.
+
+    Returns:
+        dict: Manifest with 'targets' and 'shard_size'.
+
+    Raises:
+        ValueError: If the directory holds a batch over different targets.
+    """
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if targets and targets != manifest["targets"]:
+            raise ValueError(f"{output_dir} holds a batch over different targets; use another --output")
+        logger.info(f"Resuming batch of {len(manifest['targets'])} targets")
+        return manifest
+    manifest = {"targets": targets, "shard_size": shard_size, "created": time.time()}
+    os.makedirs(os.path.join(output_dir, SHARDS_DIR), exist_ok=True)
+    atomic_write(path, json.dumps(manifest))
+    return manifest
+
+def merge_shards(output_dir, shards):
+    """Merge shard files into pages.jsonl in input order and write the summary.
+
+    Args:
+        output_dir (str): Batch output directory.
+        shards (int): Number of shards.
+
+    Returns:
+        dict: Site-level summary (see crawler.summarize) with merge details.
+    """
+    pages_path = os.path.join(output_dir, PAGES_FILE)
+    temp_path = pages_path + ".tmp"
+    merged = 0
+    with open(temp_path, 'w', encoding='utf-8') as out:
+        for index in range(shards):
+            records = {}
+            for record in read_shard(shard_path(output_dir, index, ".jsonl")):
+                records[record.get("index")] = record  # A retried page keeps its last record
+            for _, record in sorted(records.items(), key=lambda item: item[0] if item[0] is not None else -1):
+                out.write(json.dumps(record) + "\n")
+                merged += 1
+    os.replace(temp_path, pages_path)
+    summary = summarize(pages_path)
+    summary["shards"] = shards
+    summary["incomplete_shards"] = [index for index in range(shards)
+                                    if not os.path.exists(shard_path(output_dir, index, ".done"))]
+    atomic_write(os.path.join(output_dir, SUMMARY_FILE), json.dumps(summary, indent=4))
+    logger.info(f"Merged {merged} records from {shards} shards into {pages_path}")
+    return summary
+
+def run_batch_shards(targets, output_dir, workers=None, shard_size=SHARD_SIZE, concurrency=PAGE_CONCURRENCY,
+                     delay=0.0, revise=True, retries=SHARD_RETRIES, progress=True):
+    """Analyze and revise many pages across all cores, with sharded, resumable output.
+
+    Targets are split into shards of shard_size. Each shard runs in a worker
+    process and writes shards/shard-NNNNN.jsonl, resuming after its last
+    completed page if it was interrupted; completed shards are skipped on a
+    rerun with the same output_dir. A shard whose worker fails or is killed
+    is retried up to `retries` times. Finally all shards are merged into
+    pages.jsonl (input order) and summary.json.
+
+    Args:
+        targets (list): URLs and local HTML file paths (see collect_targets).
+        output_dir (str): Output directory; rerun with the same directory to resume.
+        workers (int): Worker processes (default: CPU count).
+        shard_size (int): Targets per shard for a new batch.
+        concurrency (int): Pages in flight per worker.
+        delay (float): Minimum seconds between requests to one host across all workers.
+        revise (bool): Also store revised text for each page.
+        retries (int): Retries per failed shard.
+        progress (bool): Print a progress line to stderr.
+
+    Returns:
+        dict: Site-level summary, also written to summary.json.
+    """
+    manifest = load_manifest(output_dir, targets, shard_size)
+    targets, shard_size = manifest["targets"], manifest["shard_size"]
+    shards = math.ceil(len(targets) / shard_size) if targets else 0
+    workers = workers or os.cpu_count() or 1
+    # Each process spaces its own requests; spreading the delay keeps the combined rate per host
+    worker_delay = delay * min(workers, shards or 1)
+    tracker = Progress(output_dir, shards, len(targets)) if progress else None
+
+    pending = [index for index in range(shards) if not os.path.exists(shard_path(output_dir, index, ".done"))]
+    done_count = shards - len(pending)
+    attempts = {}
+    failed = []
+    log_level = logging.getLogger().level
+    while pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=init_worker,
+                                 initargs=(log_level,)) as pool:
+            futures = {}
+            for index in pending:
+                start = index * shard_size
+                futures[pool.submit(run_shard, output_dir, index, targets[start:start + shard_size], start,
+                                    concurrency, worker_delay, revise)] = index
+            pending = []
+            while futures:
+                finished, _ = wait(futures, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = futures.pop(future)
+                    try:
+                        future.result()
+                        done_count += 1
+                    except Exception as e:  # Includes BrokenProcessPool when a worker is killed
+                        attempts[index] = attempts.get(index, 0) + 1
+                        if attempts[index] <= retries:
+                            logger.warning(f"Shard {index} failed ({str(e) or type(e).__name__}); retry {attempts[index]}")
+                            pending.append(index)
+                        else:
+                            logger.error(f"Shard {index} failed after {attempts[index]} attempts: {str(e)}")
+                            failed.append(index)
+                if tracker:
+                    tracker.update(done_count)
+    if tracker:
+        tracker.update(done_count, final=True)
+
+    summary = merge_shards(output_dir, shards)
+    if failed:
+        logger.error(f"{len(failed)} shards did not complete; rerun with the same output directory to retry them")
+    return summary
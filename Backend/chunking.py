@@ -0,0 +1,125 @@
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from backend.metrics import in_context
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Chunking settings
+CHUNK_TOKEN_BUDGET = 1000  # Approximate input tokens per chunk
+CHUNK_WORKERS = 4  # Chunks sent to Gemini at once
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+def estimate_tokens(text):
+    """Roughly estimate the Gemini token count of a text (about 4 characters per token).
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return max(1, len(text) // 4)
+
+def split_oversized(sentence, token_budget):
+    """Split a single sentence that is over budget at word boundaries.
+
+    Args:
+        sentence (str): Sentence longer than the budget.
+        token_budget (int): Approximate tokens per piece.
+
+    Returns:
+        list: Pieces, each within the budget unless a single word exceeds it.
+    """
+    pieces, current = [], []
+    used = 0
+    for word in sentence.split():
+        cost = estimate_tokens(word + ' ')
+        if current and used + cost > token_budget:
+            pieces.append(' '.join(current))
+            current, used = [], 0
+        current.append(word)
+        used += cost
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+def chunk_text(text, token_budget=CHUNK_TOKEN_BUDGET):
+    """Split text into chunks on sentence and line boundaries under a token budget.
+
+    Every character of meaningful text ends up in exactly one chunk; nothing
+    is truncated.
+
+    Args:
+        text (str): Text to split.
+        token_budget (int): Approximate input tokens per chunk.
+
+    Returns:
+        list: Text chunks in document order.
+    """
+    chunks, current = [], []
+    used = 0
+    for sentence in SENTENCE_BOUNDARY.split(text or ""):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        cost = estimate_tokens(sentence) + 1
+        pieces = [sentence] if cost <= token_budget else split_oversized(sentence, token_budget)
+        for piece in pieces:
+            cost = estimate_tokens(piece) + 1
+            if current and used + cost > token_budget:
+                chunks.append(' '.join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += cost
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+def map_chunks(func, chunks, workers=CHUNK_WORKERS):
+    """Apply a function to every chunk concurrently, keeping chunk order.
+
+    Args:
+        func (callable): Function taking one chunk.
+        chunks (list): Chunks to process.
+        workers (int): Chunks processed at once.
+
+    Returns:
+        list: Results in chunk order.
+    """
+    if len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    logger.info(f"Processing {len(chunks)} chunks")
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return list(pool.map(in_context(func), chunks))
+
+def weighted_vote(verdicts, weights=None):
+    """Combine per-chunk yes/no verdicts into a document-level verdict.
+
+    Chunks whose verdict is None (e.g. failed requests) are ignored.
+
+    Args:
+        verdicts (list): True, False or None for each chunk.
+        weights (list): Weight of each chunk, e.g. its length (default: equal weights).
+
+    Returns:
+        dict: 'verdict' (bool, or None if no chunk voted), 'share' of weight voting yes,
+            and 'votes' counted.
+    """
+    weights = weights or [1] * len(verdicts)
+    yes = total = 0
+    votes = 0
+    for verdict, weight in zip(verdicts, weights):
+        if verdict is None:
+            continue
+        votes += 1
+        total += weight
+        if verdict:
+            yes += weight
+    if not total:
+        return {"verdict": None, "share": 0.0, "votes": 0}
+    share = yes / total
+    return {"verdict": share > 0.5, "share": round(share, 3), "votes": votes}
@@ -0,0 +1,320 @@
+import json
+import threading
+import time
+import logging
+import os
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urldefrag, urlparse
+from backend.doc_context import DocumentContext, REQUEST_HEADERS
+from backend.doc_analyzer import analyze_documentation
+from backend.doc_revision import apply_suggestions, revise_sections
+from backend.sentence_memo import tracking, dedup_summary, SOURCES
+from backend.run_store import atomic_write
+from backend.resources import lazy_import
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+requests = lazy_import("requests")
+
+# Crawl settings
+BATCH_DIR = os.path.join("Output", "batches")
+CRAWL_CONCURRENCY = 4  # Pages processed at once
+HOST_DELAY = 1.0  # Minimum seconds between requests to the same host
+
+PAGES_FILE = "pages.jsonl"
+SUMMARY_FILE = "summary.json"
+
+class HostThrottle:
+    """Per-host politeness: spaces requests to each host at least delay seconds apart.
+
+    Args:
+        delay (float): Minimum seconds between two requests to one host.
+    """
+
+    def __init__(self, delay=HOST_DELAY):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the URL's host may be requested again.
+
+        Args:
+            url (str): URL about to be requested.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+def load_sitemap(url, throttle=None, _depth=0):
+    """Read page URLs from a sitemap.xml, following sitemap index files.
+
+    Args:
+        url (str): Sitemap URL.
+        throttle (HostThrottle): Politeness throttle for the sitemap requests.
+
+    Returns:
+        list: Page URLs in sitemap order.
+    """
+    logger.info(f"Loading sitemap: {url}")
+    if throttle:
+        throttle.wait(url)
+    response = requests.get(url, timeout=30, headers=REQUEST_HEADERS)
+    response.raise_for_status()
+    root = ET.fromstring(response.content)
+    locs = [el.text.strip() for el in root.iter() if el.tag.endswith('loc') and el.text]
+    if not root.tag.endswith('sitemapindex'):
+        return locs
+    if _depth >= 3:
+        logger.warning(f"Sitemap index nesting too deep at {url}")
+        return []
+    urls = []
+    for child in locs:
+        try:
+            urls.extend(load_sitemap(child, throttle, _depth + 1))
+        except Exception as e:
+            logger.error(f"Failed to load child sitemap {child}: {str(e)}")
+    return urls
+
+def load_url_list(path):
+    """Read URLs from a text file, one per line; blank lines and # comments are skipped.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        list: URLs.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def normalize_url(url):
+    """Drop the fragment so page anchors map to one URL.
+
+    Args:
+        url (str): URL to normalize.
+
+    Returns:
+        str: URL without fragment.
+    """
+    return urldefrag(url)[0]
+
+def extract_links(doc, allowed_hosts):
+    """Collect same-domain links from a fetched page.
+
+    Args:
+        doc (DocumentContext): Fetched page.
+        allowed_hosts (set): Hosts the crawl may follow links to.
+
+    Returns:
+        list: Absolute, fragment-free URLs in document order.
+    """
+    links = []
+    for href in doc.links:
+        url = normalize_url(urljoin(doc.url, href))
+        parsed = urlparse(url)
+        if parsed.scheme in ('http', 'https') and parsed.netloc in allowed_hosts:
+            links.append(url)
+    return links
+
+def process_page(url, throttle, revise=False, incremental=False):
+    """Fetch and analyze one page for a batch.
+
+    Args:
+        url (str): Page URL.
+        throttle (HostThrottle): Politeness throttle.
+        revise (bool): Also produce revised text.
+        incremental (bool): Use conditional GETs and reuse results for unchanged content.
+
+    Returns:
+        tuple: (record dict for pages.jsonl, fetched DocumentContext).
+    """
+    throttle.wait(url)
+    doc = DocumentContext.fetch(url, incremental)
+    return analyze_page(doc, revise, incremental), doc
+
+def analyze_page(doc, revise=False, incremental=False):
+    """Analyze (and optionally revise) a fetched page into a batch record.
+
+    Args:
+        doc (DocumentContext): Fetched page.
+        revise (bool): Also produce revised text.
+        incremental (bool): Reuse cached revisions of unchanged sections.
+
+    Returns:
+        dict: Record for pages.jsonl with 'url', 'status' and 'report' or 'error';
+            revised pages also get 'revised_text' and 'simplification' counts.
+    """
+    if doc.html is None:
+        return {"url": doc.url, "status": "error", "error": doc.error}
+    report = analyze_documentation(doc, save=False)
+    report.pop("run_id", None)
+    record = {"url": doc.url, "status": "ok", "report": report}
+    if revise:
+        with tracking() as simplification:
+            if incremental:
+                record["revised_text"] = revise_sections(doc, report.get("analysis", {}))
+            else:
+                record["revised_text"] = apply_suggestions(doc.text, report.get("analysis", {}),
+                                                           doc.segments if doc.text else None)
+        record["simplification"] = simplification.summary()
+    return record
+
+def summarize(pages_path):
+    """Aggregate per-page reports into a site-level summary.
+
+    Args:
+        pages_path (str): Path to pages.jsonl.
+
+    Returns:
+        dict: Page counts, average readability scores, suggestion frequencies
+            and, for revised pages, simplification sources with the dedup ratio.
+    """
+    pages = ok = 0
+    errors = []
+    flesch, fog = [], []
+    partial = 0
+    not_modified = reused = 0
+    suggestion_counts = {}
+    simplified = Counter()
+    if os.path.exists(pages_path):
+        with open(pages_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted run
+                pages += 1
+                if record.get("status") != "ok":
+                    errors.append({"url": record.get("url"), "error": record.get("error")})
+                    continue
+                ok += 1
+                report = record.get("report", {})
+                if report.get("partial"):
+                    partial += 1
+                incremental = report.get("incremental", {})
+                not_modified += bool(incremental.get("not_modified"))
+                reused += bool(incremental.get("reused_report"))
+                analysis = report.get("analysis", {})
+                score = analysis.get("readability", {}).get("score")
+                if isinstance(score, dict):
+                    flesch.append(score.get("flesch_kincaid", 0))
+                    fog.append(score.get("gunning_fog", 0))
+                for dimension, result in analysis.items():
+                    counts = suggestion_counts.setdefault(dimension, Counter())
+                    counts.update(result.get("suggestions", []))
+                simplified.update({source: record.get("simplification", {}).get(source, 0) for source in SOURCES})
+    return {
+        "pages": pages,
+        "analyzed": ok,
+        "errors": len(errors),
+        "partial_reports": partial,
+        "not_modified": not_modified,
+        "reused_reports": reused,
+        "average_scores": {
+            "flesch_kincaid": round(sum(flesch) / len(flesch), 2) if flesch else None,
+            "gunning_fog": round(sum(fog) / len(fog), 2) if fog else None
+        },
+        "suggestions": {dimension: dict(counts.most_common()) for dimension, counts in suggestion_counts.items()},
+        "simplification": dedup_summary(simplified),
+        "failed_pages": errors[:100]
+    }
+
+def crawl_site(seeds, output_dir, max_depth=0, max_pages=None, concurrency=CRAWL_CONCURRENCY,
+               delay=HOST_DELAY, revise=False, incremental=False):
+    """Analyze many pages, streaming per-page reports to JSONL.
+
+    Pages are processed with bounded concurrency and per-host politeness.
+    With max_depth > 0, same-domain links are followed up to that depth.
+    Every page record lists the links it added to the frontier under
+    'links', so rerunning with the same output_dir rebuilds the frontier
+    from pages.jsonl and resumes where an interrupted crawl stopped.
+
+    Args:
+        seeds (list): Starting URLs (from a sitemap, URL list, or a seed page).
+        output_dir (str): Directory for pages.jsonl and summary.json.
+        max_depth (int): Link-following depth; 0 analyzes only the seeds.
+        max_pages (int): Stop after this many pages in total (None for no limit).
+        concurrency (int): Pages processed at once.
+        delay (float): Minimum seconds between requests to one host.
+        revise (bool): Also store revised text for each page.
+        incremental (bool): Re-analyze only pages and sections changed since the last crawl.
+
+    Returns:
+        dict: Site-level summary, also written to summary.json.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pages_path = os.path.join(output_dir, PAGES_FILE)
+    seeds = [normalize_url(url) for url in seeds]
+    allowed_hosts = {urlparse(url).netloc for url in seeds}
+
+    # Resume: pages already in pages.jsonl are done, and replaying their links rebuilds the frontier
+    done = set()
+    seen = set(seeds)
+    frontier = [(url, 0) for url in dict.fromkeys(seeds)]
+    if os.path.exists(pages_path):
+        with open(pages_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    done.add(record["url"])
+                except (ValueError, KeyError):
+                    continue  # Partial line from an interrupted run
+                for link in record.get("links", []):
+                    if link not in seen:
+                        seen.add(link)
+                        frontier.append((link, record.get("depth", 0) + 1))
+    pending = deque((url, depth) for url, depth in frontier if url not in done)
+    if done:
+        logger.info(f"Resuming crawl: {len(done)} pages done, {len(pending)} pending")
+
+    throttle = HostThrottle(delay)
+    processed = len(done)
+    in_flight = {}
+
+    with open(pages_path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl") as pool:
+        while pending or in_flight:
+            while pending and len(in_flight) < concurrency and \
+                    (max_pages is None or processed + len(in_flight) < max_pages):
+                url, depth = pending.popleft()
+                if url in done:
+                    continue
+                in_flight[pool.submit(process_page, url, throttle, revise, incremental)] = (url, depth)
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                url, depth = in_flight.pop(future)
+                try:
+                    record, doc = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to process {url}: {str(e)}")
+                    record, doc = {"url": url, "status": "error", "error": str(e)}, None
+                links = []
+                if doc is not None and depth < max_depth:
+                    for link in extract_links(doc, allowed_hosts):
+                        if link not in seen:
+                            seen.add(link)
+                            links.append(link)
+                record["depth"] = depth
+                record["links"] = links
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                done.add(url)
+                processed += 1
+                pending.extend((link, depth + 1) for link in links)
+                logger.info(f"Crawled {processed} pages ({len(pending)} pending): {url}")
+
+    summary = summarize(pages_path)
+    atomic_write(os.path.join(output_dir, SUMMARY_FILE), json.dumps(summary, indent=4))
+    logger.info(f"Crawl finished: {summary['pages']} pages, {summary['errors']} errors")
+    return summary
@@ -1,129 +1,165 @@
-import requests
-from bs4 import BeautifulSoup
-import textstat
 import json
-import re
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from backend.doc_context import DocumentContext, load_document
+from backend.llm_client import get_client, LLMError, GEMINI_MODEL
+from backend.run_store import get_run_store, atomic_write
+from backend.chunking import chunk_text, map_chunks
+from backend.assessment import ASSESSMENT_PROMPT, GENERATION_CONFIG as ASSESSMENT_CONFIG, parse_assessment, combine_assessments
+from backend.readability import readability_metrics
+from backend.page_cache import get_section_cache, result_key
+from backend.events import publish
+from backend.metrics import span, in_context, current_trace
 
 # Configure logging for backend debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Google Gemini API key (replace with your own)
-GEMINI_API_KEY = " "  # Obtain from https://aistudio.google.com/app/apikey
+# Parallel analysis settings
+PARALLEL_ANALYSIS = True  # Run the four dimensions concurrently
+DIMENSION_TIMEOUT = 45.0  # Seconds before a dimension is reported as partial
+# Everything besides the content that cached assessments and reports depend on
+ASSESSMENT_KEY_PARAMS = (ASSESSMENT_PROMPT, ASSESSMENT_CONFIG, GEMINI_MODEL)
 
-# Output directory
-OUTPUT_DIR = "Output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-def fetch_article_content(url):
+def fetch_article_content(url, incremental=False):
     """Fetch and parse webpage content using BeautifulSoup.
     
     Args:
         url (str): The webpage URL to scrape.
+        incremental (bool): Send a conditional GET using the validators stored from the last fetch.
     
     Returns:
         tuple: (extracted_text, error_message). Returns None for text and an error message if fetching fails.
     """
-    logger.info(f"Fetching content from URL: {url}")
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-    
-    try:
-        response = requests.get(url, timeout=30, headers=headers)
-        response.raise_for_status()
-        logger.info("Successfully fetched webpage")
-    except Exception as e:
-        logger.error(f"Failed to fetch URL: {str(e)}")
-        fallback_text = "This is a sample webpage content. The platform supports various features to enhance user experience. You can configure settings to achieve optimal results. Learn more about our services and tools."
-        return fallback_text, f"Error fetching URL: {str(e)}. Using fallback text."
-    
-    try:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try multiple selectors to find main content
-        content = (soup.find('article') or
-                   soup.find('main') or
-                   soup.find('div', class_=re.compile('content|article|post|body|main', re.I)) or
-                   soup.find('section') or
-                   soup.find('body'))
-        if not content:
-            logger.warning("No main content found in HTML")
-            return None, "No main content found in HTML structure."
-        
-        # Remove scripts and styles
-        for elem in content.find_all(['script', 'style']):
-            elem.decompose()
-        
-        # Extract text from relevant elements
-        text = ' '.join(p.get_text(strip=True) for p in content.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'span', 'div']) if p.get_text(strip=True))
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        if not text or len(text.split()) < 10:
-            logger.warning("Insufficient meaningful text extracted")
-            return None, "Insufficient meaningful text extracted from webpage."
-        
-        logger.info("Successfully extracted text content")
-        return text, None
-    except Exception as e:
-        logger.error(f"Error parsing HTML: {str(e)}")
-        return None, f"Error parsing HTML: {str(e)}."
+    doc = DocumentContext.fetch(url, incremental)
+    return doc.text, doc.error
 
-def query_gemini(text, prompt, model="gemini-1.5-flash"):
+def query_gemini(text, prompt, model=None, generation_config=None):
     """Query Google Gemini API for text analysis or simplification.
     
     Args:
         text (str): Input text to analyze or simplify.
         prompt (str): Prompt for the Gemini model.
-        model (str): Gemini model to use (default: gemini-1.5-flash).
+        model (str): Gemini model to use (default: GEMINI_MODEL).
+        generation_config (dict): Settings merged over the default output budget,
+            e.g. a JSON response schema.
     
     Returns:
         dict or str: API response or error message.
     """
     logger.info("Querying Google Gemini API")
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "contents": [{"parts": [{"text": prompt + "\n\n" + text[:1000]}]}],  # Limit input size
-        "generationConfig": {"maxOutputTokens": 500}
-    }
-    
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        generated_text = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+        generated_text = get_client().generate(prompt, text, model=model,
+                                               generation_config={"maxOutputTokens": 500, **(generation_config or {})})
         logger.info("Successfully received Gemini response")
-        return generated_text
-    except Exception as e:
-        logger.error(f"Gemini API error: {str(e)}")
-        return {"error": f"Gemini API error: {str(e)}"}
+        return generated_text or ""
+    except LLMError as e:
+        logger.error(str(e))
+        return {"error": str(e)}
+
+def assess_chunks(chunks):
+    """Send the combined assessment prompt for every chunk concurrently.
+    
+    Args:
+        chunks (list): Text chunks.
+    
+    Returns:
+        list: Parsed assessment (see assessment.parse_assessment), or None for a failed request, per chunk.
+    """
+    replies = map_chunks(lambda chunk: query_gemini(chunk, ASSESSMENT_PROMPT, generation_config=ASSESSMENT_CONFIG), chunks)
+    return [parse_assessment(reply) for reply in replies]
+
+def compute_assessment(doc):
+    """Assess tone, engagement, pronouns and flagged sentences of a document in one request per chunk.
+    
+    Outside incremental mode the whole text is chunked. In incremental mode
+    every section is chunked on its own, and the assessments of sections
+    whose content hash was seen before come from the section cache; only
+    changed sections are sent to Gemini.
+    
+    Args:
+        doc (DocumentContext): Fetched document.
+    
+    Returns:
+        dict: Combined result (see assessment.combine_assessments); in
+            incremental mode both votes also carry the number of 'reused_sections'.
+    """
+    if not doc.incremental or not doc.sections:
+        chunks = chunk_text(doc.text or "")
+        return combine_assessments(assess_chunks(chunks), [len(chunk) for chunk in chunks])
+    cache = get_section_cache()
+    assessments, weights = [], []
+    pending = []  # (cache key, chunks) of sections that need Gemini
+    for section in doc.sections:
+        key = result_key("assessment", section["hash"], *ASSESSMENT_KEY_PARAMS)
+        cached = cache.get(key)
+        if cached is not None:
+            assessments.extend(cached["assessments"])
+            weights.extend(cached["weights"])
+        else:
+            pending.append((key, chunk_text(section["text"])))
+    
+    results = iter(assess_chunks([chunk for _, section_chunks in pending for chunk in section_chunks]))
+    for key, section_chunks in pending:
+        section_assessments = [next(results) for _ in section_chunks]
+        section_weights = [len(chunk) for chunk in section_chunks]
+        if None not in section_assessments:  # Failed requests are retried on the next run
+            cache.set(key, {"assessments": section_assessments, "weights": section_weights})
+        assessments.extend(section_assessments)
+        weights.extend(section_weights)
+    
+    combined = combine_assessments(assessments, weights)
+    for vote in (combined["tone_vote"], combined["engagement_vote"]):
+        vote["reused_sections"] = len(doc.sections) - len(pending)
+    return combined
 
-def analyze_readability(text):
-    """Analyze text readability using textstat and Gemini for tone.
+def assess_document(doc):
+    """Return the document's combined assessment, requesting it only once.
+    
+    analyze_readability and analyze_style both read this result; when they
+    run in parallel the second one waits for the first one's request.
     
     Args:
-        text (str): Text to analyze.
+        doc (DocumentContext): Fetched document.
+    
+    Returns:
+        dict: Result of compute_assessment.
+    """
+    def compute():
+        with span("assessment"):
+            return compute_assessment(doc)
+    return doc.memo("assessment", compute)
+
+def analyze_readability(doc):
+    """Analyze text readability from shared segmentation and Gemini for tone.
+    
+    Args:
+        doc (DocumentContext): Fetched document to analyze.
     
     Returns:
         dict: Readability scores, assessment, and suggestions.
     """
+    text = doc.text or ""
     if not text:
         logger.warning("No text provided for readability analysis")
         return {"score": 0, "assessment": "No content to analyze.", "suggestions": []}
     
     logger.info("Analyzing readability")
-    flesch_score = textstat.flesch_kincaid_grade(text)
-    fog_score = textstat.gunning_fog(text)
+    segments = doc.segments
+    with span("readability"):
+        metrics = readability_metrics(segments)
+    flesch_score = metrics["flesch_kincaid"]
+    fog_score = metrics["gunning_fog"]
     
     assessment = f"Flesch-Kincaid Grade: {flesch_score:.1f}, Gunning Fog: {fog_score:.1f}. "
     suggestions = []
     
-    # Use Gemini to assess tone
-    prompt = "Analyze the tone of the following text. Is it positive, neutral, or technical? Suggest improvements if the tone is not positive or engaging."
-    gemini_result = query_gemini(text, prompt)
+    # Tone comes from the combined Gemini assessment shared with analyze_style
+    tone_vote = assess_document(doc)["tone_vote"]
     
-    if isinstance(gemini_result, str) and "technical" in gemini_result.lower():
+    if tone_vote["verdict"]:
         assessment += "The tone may feel technical or neutral. "
         suggestions.append("Use a positive, engaging tone, e.g., 'Easily explore our features'.")
     
@@ -137,81 +173,70 @@ def analyze_readability(text):
     
     logger.info("Readability analysis completed")
     return {
-        "score": {"flesch_kincaid": flesch_score, "gunning_fog": fog_score},
+        "score": metrics,
         "assessment": assessment,
-        "suggestions": suggestions
+        "suggestions": suggestions,
+        "tone_vote": tone_vote
     }
 
-def analyze_structure(url, text):
-    """Analyze webpage structure using BeautifulSoup.
+def analyze_structure(doc):
+    """Analyze webpage structure from the parsed document.
     
     Args:
-        url (str): Webpage URL.
-        text (str): Extracted text (unused here, kept for compatibility).
+        doc (DocumentContext): Fetched document to analyze.
     
     Returns:
         dict: Structure assessment and suggestions.
     """
-    logger.info(f"Analyzing structure for URL: {url}")
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-    
-    try:
-        response = requests.get(url, timeout=30, headers=headers)
-        response.raise_for_status()
-    except Exception as e:
-        logger.error(f"Failed to fetch URL for structure analysis: {str(e)}")
+    logger.info(f"Analyzing structure for URL: {doc.url}")
+    if doc.structure is None:
+        logger.error(f"No parsed HTML for structure analysis: {doc.error}")
         return {
-            "assessment": f"Error analyzing structure: {str(e)}.",
+            "assessment": f"Error analyzing structure: {doc.error}",
             "suggestions": []
         }
     
-    try:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        headings = len(soup.find_all(['h1', 'h2', 'h3', 'h4']))
-        paragraphs = len(soup.find_all('p'))
-        lists = len(soup.find_all(['ul', 'ol']))
-        
-        assessment = f"Page has {headings} headings, {paragraphs} paragraphs, and {lists} lists. "
-        suggestions = []
-        
-        if headings < 1:
-            assessment += "Lack of headings makes navigation difficult. "
-            suggestions.append("Add at least one heading, e.g., 'Introduction' or 'How It Works'.")
-        
-        if paragraphs > 15 and lists == 0:
-            assessment += "Dense paragraphs without lists may overwhelm readers. "
-            suggestions.append("Use lists to break up content, e.g., list steps or features.")
-        
-        logger.info("Structure analysis completed")
-        return {
-            "assessment": assessment,
-            "suggestions": suggestions
-        }
-    except Exception as e:
-        logger.error(f"Error analyzing structure: {str(e)}")
-        return {
-            "assessment": f"Error analyzing structure: {str(e)}",
-            "suggestions": []
-        }
+    headings = doc.structure["headings"]
+    paragraphs = doc.structure["paragraphs"]
+    lists = doc.structure["lists"]
+    
+    assessment = f"Page has {headings} headings, {paragraphs} paragraphs, and {lists} lists. "
+    suggestions = []
+    
+    if headings < 1:
+        assessment += "Lack of headings makes navigation difficult. "
+        suggestions.append("Add at least one heading, e.g., 'Introduction' or 'How It Works'.")
+    
+    if paragraphs > 15 and lists == 0:
+        assessment += "Dense paragraphs without lists may overwhelm readers. "
+        suggestions.append("Use lists to break up content, e.g., list steps or features.")
+    
+    logger.info("Structure analysis completed")
+    return {
+        "assessment": assessment,
+        "suggestions": suggestions
+    }
 
-def analyze_completeness(text):
+def analyze_completeness(doc):
     """Analyze content completeness.
     
     Args:
-        text (str): Text to analyze.
+        doc (DocumentContext): Fetched document to analyze.
     
     Returns:
         dict: Completeness assessment and suggestions.
     """
     logger.info("Analyzing completeness")
+    text = doc.text or ""
     assessment = "The content provides an overview. "
     suggestions = []
     
-    if len(text.split()) < 100:
+    word_count = doc.segments.word_count
+    if word_count < 100:
         assessment += "The content is too brief for comprehensive coverage. "
         suggestions.append("Expand with details, e.g., add examples or FAQs.")
     
-    if "example" not in text.lower() and len(text.split()) < 500:
+    if "example" not in text.lower() and word_count < 500:
         assessment += "Lack of examples may limit understanding. "
         suggestions.append("Include practical examples, e.g., 'Here’s how to use this feature.'")
     
@@ -221,21 +246,22 @@ def analyze_completeness(text):
         "suggestions": suggestions
     }
 
-def analyze_style(text):
-    """Analyze content style using Gemini for tone.
+def analyze_style(doc):
+    """Analyze content style using Gemini for engagement and pronoun usage.
     
     Args:
-        text (str): Text to analyze.
+        doc (DocumentContext): Fetched document to analyze.
     
     Returns:
-        dict: Style assessment and suggestions.
+        dict: Style assessment, suggestions, engagement vote, the majority
+            pronoun usage and sentences Gemini flagged.
     """
     logger.info("Analyzing style")
+    text = doc.text or ""
     assessment = "The tone is generally clear. "
     suggestions = []
     
-    sentences = text.split('.')
-    longest_sentence = max(sentences, key=len, default="")
+    longest_sentence = doc.segments.longest_sentence()
     if len(longest_sentence) > 40:
         assessment += "Some sentences are too long, reducing readability. "
         suggestions.append(f"Shorten long sentences, e.g., split '{longest_sentence.strip()[:40]}...' into shorter parts.")
@@ -244,55 +270,197 @@ def analyze_style(text):
         assessment += "Jargon may confuse readers. "
         suggestions.append("Replace jargon with simple terms, e.g., 'use' instead of 'leverage'.")
     
-    # Use Gemini to check engagement
-    prompt = "Evaluate if the following text is engaging and uses second-person pronouns (e.g., 'you'). Suggest improvements if it lacks engagement or uses third-person pronouns."
-    gemini_result = query_gemini(text, prompt)
+    # Engagement and pronoun usage come from the combined Gemini assessment
+    combined = assess_document(doc)
+    engagement_vote = combined["engagement_vote"]
     
-    if isinstance(gemini_result, str) and "lacks engagement" in gemini_result.lower():
+    if engagement_vote["verdict"]:
         assessment += "The tone lacks engagement. "
         suggestions.append("Use second-person pronouns, e.g., 'You can explore features' instead of 'Users can explore features.'")
     
     logger.info("Style analysis completed")
     return {
         "assessment": assessment,
-        "suggestions": suggestions
+        "suggestions": suggestions,
+        "engagement_vote": engagement_vote,
+        "pronouns": combined["pronouns"],
+        "flagged_sentences": combined["flagged_sentences"]
     }
 
-def analyze_documentation(url):
+# Analysis dimensions in report order
+DIMENSIONS = {
+    "readability": analyze_readability,
+    "structure": analyze_structure,
+    "completeness": analyze_completeness,
+    "style": analyze_style
+}
+
+def run_dimension(name, func, doc):
+    """Run one analysis dimension and time it.
+    
+    Args:
+        name (str): Dimension name, used for logging.
+        func (callable): Analysis function taking a DocumentContext.
+        doc (DocumentContext): Fetched document to analyze.
+    
+    Returns:
+        tuple: (result, elapsed_seconds).
+    """
+    start = time.perf_counter()
+    with span(f"analysis.{name}"):
+        result = func(doc)
+    elapsed = time.perf_counter() - start
+    logger.info(f"{name.capitalize()} dimension finished in {elapsed:.2f}s")
+    return result, elapsed
+
+def partial_result(name, reason):
+    """Build the placeholder result for a dimension that did not finish.
+    
+    Args:
+        name (str): Dimension name.
+        reason (str): Why the dimension is incomplete.
+    
+    Returns:
+        dict: Assessment marked as partial, with no suggestions.
+    """
+    return {
+        "assessment": f"{name.capitalize()} analysis incomplete: {reason}",
+        "suggestions": [],
+        "partial": True
+    }
+
+def analyze_dimensions_parallel(doc, timeout=DIMENSION_TIMEOUT):
+    """Run all analysis dimensions concurrently with a per-dimension timeout.
+    
+    Each dimension is published as a 'dimension' progress event as soon as
+    it finishes, so streaming clients see fast dimensions first.
+    
+    Args:
+        doc (DocumentContext): Fetched document to analyze.
+        timeout (float): Seconds each dimension may take before it is marked partial.
+    
+    Returns:
+        tuple: (analysis dict, timings dict, list of partial dimension names).
+    """
+    analysis, timings, partial = {}, {}, []
+    pool = ThreadPoolExecutor(max_workers=len(DIMENSIONS), thread_name_prefix="analysis")
+    start = time.perf_counter()
+    # Workers run in the caller's context so spans and progress events reach the active trace and job
+    run = in_context(run_dimension)
+    futures = {pool.submit(run, name, func, doc): name for name, func in DIMENSIONS.items()}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            name = futures[future]
+            try:
+                analysis[name], elapsed = future.result()
+            except Exception as e:
+                logger.error(f"{name.capitalize()} dimension failed: {str(e)}")
+                analysis[name] = partial_result(name, f"{str(e)}.")
+                elapsed = time.perf_counter() - start
+                partial.append(name)
+            timings[name] = round(elapsed, 3)
+            publish("dimension", name=name, result=analysis[name], elapsed=timings[name])
+    except FuturesTimeoutError:
+        for name in DIMENSIONS:
+            if name not in analysis:
+                logger.error(f"{name.capitalize()} dimension timed out after {timeout}s")
+                analysis[name] = partial_result(name, f"timed out after {timeout}s.")
+                timings[name] = round(time.perf_counter() - start, 3)
+                partial.append(name)
+                publish("dimension", name=name, result=analysis[name], elapsed=timings[name])
+    # Don't wait for timed-out dimensions; their threads finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Report order follows DIMENSIONS, not completion order
+    analysis = {name: analysis[name] for name in DIMENSIONS}
+    timings = {name: timings[name] for name in DIMENSIONS}
+    partial = [name for name in DIMENSIONS if name in partial]
+    return analysis, timings, partial
+
+def votes_complete(analysis):
+    """Check that every Gemini vote in an analysis got a reply for each chunk.
+    
+    Args:
+        analysis (dict): Per-dimension results.
+    
+    Returns:
+        bool: True if no chunk request failed, so the analysis may be cached.
+    """
+    return all(vote["votes"] == vote["chunks"]
+               for result in analysis.values() for key, vote in result.items() if key.endswith("_vote"))
+
+def analyze_documentation(doc, parallel=None, timeout=DIMENSION_TIMEOUT, run_id=None, save=True, incremental=False):
     """Analyze a webpage's content and generate a report.
     
+    In incremental mode a URL is fetched with a conditional GET, the whole
+    analysis is reused if the content hash matches a previous run, and
+    otherwise only changed sections are sent to Gemini.
+    
     Args:
-        url (str): Webpage URL to analyze.
+        doc (DocumentContext or str): Fetched document, or a webpage URL to fetch.
+        parallel (bool): Run the dimensions concurrently (default: PARALLEL_ANALYSIS).
+        timeout (float): Per-dimension timeout in seconds when running in parallel.
+        run_id (str): Run to save the report into (default: a new run).
+        save (bool): Save the report to the run store; batch callers keep it in memory.
+        incremental (bool): Reuse cached results for unchanged content.
     
     Returns:
-        dict: Analysis report with readability, structure, completeness, and style.
+        dict: Analysis report with readability, structure, completeness, and style,
+            per-dimension timings in seconds, the names of any partial dimensions,
+            the run ID it was saved under, in incremental mode what was reused and,
+            when a trace is active (see backend.metrics.start_trace), its spans so far.
     """
-    logger.info(f"Starting analysis for URL: {url}")
-    text, error = fetch_article_content(url)
-    
-    if error:
-        report = {
-            "url": url,
-            "error": error,
-            "analysis": {
-                "readability": analyze_readability(text or ""),
-                "structure": analyze_structure(url, text or ""),
-                "completeness": analyze_completeness(text or ""),
-                "style": analyze_style(text or "")
-            }
-        }
-    else:
-        report = {
-            "url": url,
-            "analysis": {
-                "readability": analyze_readability(text),
-                "structure": analyze_structure(url, text),
-                "completeness": analyze_completeness(text),
-                "style": analyze_style(text)
-            }
+    doc = load_document(doc, incremental)
+    logger.info(f"Starting analysis for URL: {doc.url}")
+    if parallel is None:
+        parallel = PARALLEL_ANALYSIS
+    store = get_run_store()
+    if save and run_id is None:
+        run_id = store.new_run()
+    
+    report = {"url": doc.url, "run_id": run_id}
+    if doc.error:
+        report["error"] = doc.error
+    
+    cached = None
+    if doc.incremental and doc.text:
+        report_key = result_key("report", doc.content_hash, *ASSESSMENT_KEY_PARAMS)
+        cached = get_section_cache().get(report_key)
+    
+    with span("analysis"):
+        if cached is not None:
+            logger.info("Content unchanged since the last analysis; reusing cached results")
+            analysis, timings, partial = cached["analysis"], {}, []
+            for name, result in analysis.items():
+                publish("dimension", name=name, result=result, elapsed=0.0)
+        elif parallel:
+            analysis, timings, partial = analyze_dimensions_parallel(doc, timeout)
+        else:
+            analysis, timings, partial = {}, {}, []
+            for name, func in DIMENSIONS.items():
+                analysis[name], elapsed = run_dimension(name, func, doc)
+                timings[name] = round(elapsed, 3)
+                publish("dimension", name=name, result=analysis[name], elapsed=timings[name])
+    if doc.incremental and doc.text and cached is None and not partial and votes_complete(analysis):
+        get_section_cache().set(report_key, {"analysis": analysis})
+    
+    report["analysis"] = analysis
+    report["timings"] = timings
+    if partial:
+        report["partial"] = partial
+    if doc.incremental:
+        report["incremental"] = {
+            "not_modified": doc.not_modified,
+            "sections": len(doc.sections),
+            "changed_sections": doc.changed_sections,
+            "reused_report": cached is not None
         }
+    trace = current_trace()
+    if trace is not None:
+        report["trace"] = trace
     
-    if save_report(report, os.path.join(OUTPUT_DIR, "analysis_report.json")):
+    if not save:
+        return report
+    if save_report(report, store.path(run_id, "analysis_report.json")):
         logger.info("Analysis report saved successfully")
     else:
         logger.error("Failed to save analysis report")
@@ -311,8 +479,8 @@ def save_report(report, filename):
     """
     logger.info(f"Saving report to {filename}")
     try:
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=4)
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        atomic_write(filename, json.dumps(report, indent=4))
         return True
     except Exception as e:
         logger.error(f"Error saving report: {str(e)}")
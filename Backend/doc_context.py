@@ -0,0 +1,503 @@
+import re
+import hashlib
+import threading
+import importlib.util
+import functools
+import logging
+import os
+from backend.resources import lazy_import
+from backend.segmentation import SegmentedText
+from backend.page_cache import get_page_cache, split_sections, hash_text
+from backend.metrics import span, FETCH_REQUESTS, FETCH_BYTES
+from backend.shared_state import get_shared_state, single_flight
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+lxml_html = lazy_import("lxml.html")
+
+# HTML parser backend: "lxml" (C parser, one pass, no BeautifulSoup tree), "html.parser"
+# (BeautifulSoup, pure Python) or "auto" (lxml when installed)
+HTML_PARSER = os.environ.get("HTML_PARSER", "auto")
+
+# Seconds a fetched page is shared with other requests and workers (0 turns the fetch cache off)
+FETCH_CACHE_TTL = float(os.environ.get("FETCH_CACHE_TTL", "60"))
+
+REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+# Elements that start a new text block; text inside other elements joins the enclosing block
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'div', 'dl', 'dt',
+              'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary',
+              'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+# Tags counted by analyze_structure, and the content containers in order of preference
+STRUCTURE_TAGS = {'h1': 'headings', 'h2': 'headings', 'h3': 'headings', 'h4': 'headings',
+                  'p': 'paragraphs', 'ul': 'lists', 'ol': 'lists'}
+CONTENT_CONTAINERS = ('article', 'main', 'div', 'section', 'body')
+CONTENT_CLASS = re.compile('content|article|post|body|main', re.I)  # Classes that mark a content div
+FALLBACK_TEXT = "This is a sample webpage content. The platform supports various features to enhance user experience. You can configure settings to achieve optimal results. Learn more about our services and tools."
+
+class DocumentContext:
+    """A webpage fetched and parsed once, shared by the analyzer and the reviser.
+
+    Attributes:
+        url (str): The webpage URL.
+        html (str): Raw HTML, or None if fetching failed.
+        soup (BeautifulSoup): Parsed tree, or None if fetching or parsing failed. With the
+            lxml backend it is only built if something asks for it.
+        links (list): href values of the page's links, in document order.
+        text (str): Extracted main-content text (fallback text if fetching failed).
+        error (str): Error message from fetching or extraction, or None.
+        structure (dict): Counts of headings, paragraphs and lists, or None.
+        blocks (list): Text blocks with heading levels, in document order.
+        incremental (bool): Reuse cached per-section results when analyzing and revising.
+        not_modified (bool): The server answered a conditional GET with 304 Not Modified.
+        previous_sections (list): Section hashes from the last fetch, or None if never fetched.
+    """
+
+    def __init__(self, url, html=None, soup=None, text=None, error=None, structure=None, blocks=None):
+        self.url = url
+        self.html = html
+        self._soup = soup
+        self.text = text
+        self.error = error
+        self.structure = structure
+        self.blocks = blocks or []
+        self.links = []
+        self.incremental = False
+        self.not_modified = False
+        self.previous_sections = None
+        self._segments = None
+        self._segments_lock = threading.Lock()
+        self._sections = None
+        self._memo = {}
+        self._memo_locks = {}
+        self._memo_lock = threading.Lock()
+
+    @property
+    def soup(self):
+        """BeautifulSoup: Parsed tree; built on first use if the page was parsed with lxml."""
+        if self._soup is None and self.html is not None and self.structure is not None:
+            self._soup = bs4.BeautifulSoup(self.html, 'html.parser')
+        return self._soup
+
+    @soup.setter
+    def soup(self, soup):
+        self._soup = soup
+
+    @property
+    def segments(self):
+        """SegmentedText: Sentence/word segmentation of the text, computed once on first use."""
+        with self._segments_lock:
+            if self._segments is None:
+                with span("segment"):
+                    self._segments = SegmentedText(self.text or "")
+            return self._segments
+
+    @property
+    def segmented(self):
+        """bool: Whether the segmentation has been computed already."""
+        return self._segments is not None
+
+    @property
+    def sections(self):
+        """list: Heading-delimited sections of the text with content hashes, computed once on first use."""
+        if self._sections is None:
+            self._sections = split_sections(self.blocks) if self.text else []
+        return self._sections
+
+    @property
+    def content_hash(self):
+        """str: Hash of everything the analysis depends on: the text and the structure counts."""
+        return hash_text(f"{self.text or ''} {sorted((self.structure or {}).items())}")
+
+    @property
+    def changed_sections(self):
+        """int: Sections whose hash did not appear in the previous fetch (all of them on a first fetch)."""
+        previous = set(self.previous_sections or [])
+        return sum(1 for section in self.sections if section["hash"] not in previous)
+
+    def memo(self, name, compute):
+        """Compute a per-document result once, even when several threads ask for it.
+
+        Callers asking for the same name while it is being computed wait for
+        that computation instead of starting their own. If compute raises,
+        nothing is stored and the next caller tries again.
+
+        Args:
+            name (str): Name of the result.
+            compute (callable): Function returning the result.
+
+        Returns:
+            The stored or newly computed result.
+        """
+        with self._memo_lock:
+            lock = self._memo_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._memo:
+                self._memo[name] = compute()
+            return self._memo[name]
+
+    @classmethod
+    def fetch(cls, url, incremental=False):
+        """Download a webpage once and build its context.
+
+        A page any worker fetched in the last FETCH_CACHE_TTL seconds is
+        reused from the shared state, and while one worker downloads a page
+        the others wait for it. In incremental mode the request is instead
+        conditional on the ETag and Last-Modified values stored from the
+        previous fetch. On 304 Not Modified the page is rebuilt from the
+        stored HTML; otherwise the new version is stored for next time.
+
+        Args:
+            url (str): The webpage URL to scrape.
+            incremental (bool): Send a conditional GET and mark the context for result reuse.
+
+        Returns:
+            DocumentContext: Context with HTML, parsed tree, text and structure counts.
+        """
+        if incremental or FETCH_CACHE_TTL <= 0:
+            return cls.download(url, incremental)
+        # Pages fetched in the last FETCH_CACHE_TTL seconds are shared, and only one worker downloads a page at a time
+        state = get_shared_state()
+        key = "fetch:" + hashlib.sha256(url.encode("utf-8")).hexdigest()
+        with single_flight(key, lambda: state.get(key)) as html:
+            if html is not None:
+                logger.info(f"Using page fetched by another request: {url}")
+                return cls.from_html(url, html)
+            doc = cls.download(url)
+            if doc.html is not None:
+                state.set(key, doc.html, FETCH_CACHE_TTL)
+            return doc
+
+    @classmethod
+    def download(cls, url, incremental=False):
+        """Download a webpage and build its context, bypassing the shared fetch cache.
+
+        Args:
+            url (str): The webpage URL to scrape.
+            incremental (bool): Send a conditional GET and mark the context for result reuse.
+
+        Returns:
+            DocumentContext: Context with HTML, parsed tree, text and structure counts.
+        """
+        logger.info(f"Fetching content from URL: {url}")
+        headers = dict(REQUEST_HEADERS)
+        stored = None
+        if incremental:
+            stored = get_page_cache().get(url)
+            if stored and stored["etag"]:
+                headers['If-None-Match'] = stored["etag"]
+            if stored and stored["last_modified"]:
+                headers['If-Modified-Since'] = stored["last_modified"]
+        try:
+            with span("fetch"):
+                response = requests.get(url, timeout=30, headers=headers)
+            FETCH_REQUESTS.inc(status=str(response.status_code))
+            FETCH_BYTES.inc(len(response.content))
+            if not (stored and response.status_code == 304):
+                response.raise_for_status()
+            logger.info("Successfully fetched webpage")
+        except Exception as e:
+            if not isinstance(e, requests.HTTPError):
+                FETCH_REQUESTS.inc(status="error")
+            logger.error(f"Failed to fetch URL: {str(e)}")
+            doc = cls(url, text=FALLBACK_TEXT, error=f"Error fetching URL: {str(e)}. Using fallback text.")
+        else:
+            if stored and response.status_code == 304:
+                logger.info(f"Not modified since last fetch, reusing stored page: {url}")
+                doc = cls.from_html(url, stored["html"])
+                doc.not_modified = True
+                get_page_cache().touch(url)
+            else:
+                doc = cls.from_html(url, response.text)
+                if incremental:
+                    get_page_cache().set(url, response.text, response.headers.get('ETag'),
+                                         response.headers.get('Last-Modified'), [s["hash"] for s in doc.sections])
+        # Failed fetches are marked too, so every document from an incremental run reports it the same way
+        if incremental:
+            doc.incremental = True
+            doc.previous_sections = stored["sections"] if stored else None
+        return doc
+
+    @classmethod
+    def from_html(cls, url, html, parser=None):
+        """Parse already-downloaded HTML into a context.
+
+        With the lxml backend one pass over the tree counts the structure,
+        collects links and finds the content container, and only that
+        container's subtree is walked for text; no BeautifulSoup tree is built.
+
+        Args:
+            url (str): The webpage URL the HTML came from.
+            html (str): Raw HTML.
+            parser (str): 'lxml', 'html.parser' or 'auto' (default: HTML_PARSER).
+
+        Returns:
+            DocumentContext: Context with text, blocks, structure counts and links.
+        """
+        doc = cls(url, html=html)
+        try:
+            if resolve_parser(parser) == "lxml":
+                with span("parse"):
+                    root = parse_lxml(html)
+                with span("extract"):
+                    doc.structure, doc.links, content = scan_tree(root)
+                    blocks = extract_blocks_lxml(content) if content is not None else None
+            else:
+                with span("parse"):
+                    doc.soup = bs4.BeautifulSoup(html, 'html.parser')
+                with span("extract"):
+                    doc.structure = count_structure(doc.soup)
+                    doc.links = [a['href'] for a in doc.soup.find_all('a', href=True)]
+                    content = find_content(doc.soup)
+                    blocks = extract_blocks(content) if content else None
+            doc.text, doc.error, doc.blocks = text_from_blocks(blocks)
+        except Exception as e:
+            logger.error(f"Error parsing HTML: {str(e)}")
+            doc.text, doc.error = None, f"Error parsing HTML: {str(e)}."
+        return doc
+
+def count_structure(soup):
+    """Count headings, paragraphs and lists in a parsed page.
+
+    Args:
+        soup (BeautifulSoup): Parsed webpage.
+
+    Returns:
+        dict: Counts keyed by 'headings', 'paragraphs' and 'lists'.
+    """
+    return {
+        "headings": len(soup.find_all(['h1', 'h2', 'h3', 'h4'])),
+        "paragraphs": len(soup.find_all('p')),
+        "lists": len(soup.find_all(['ul', 'ol']))
+    }
+
+def extract_blocks(content):
+    """Extract text blocks from a content element in one pass over the tree.
+    
+    Each text node is emitted exactly once, into the innermost block-level
+    element that contains it, so nested divs and spans no longer repeat
+    their subtree's text. Headings keep their level.
+    
+    Args:
+        content (Tag): Main content element.
+    
+    Returns:
+        list: Blocks in document order, each a dict with 'type' ('heading' or
+            'text'), 'level' (1-6 for headings, else None) and 'text'.
+    """
+    NavigableString, CData = bs4.NavigableString, bs4.CData
+    blocks = []
+    buffer = []
+    levels = []  # Heading levels of the open heading elements
+    
+    def flush():
+        text = ' '.join(' '.join(buffer).split())
+        buffer.clear()
+        if text:
+            level = levels[-1] if levels else None
+            blocks.append({"type": "heading" if level else "text", "level": level, "text": text})
+    
+    stack = [(content, False)]
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            flush()
+            if node.name in HEADING_TAGS:
+                levels.pop()
+            continue
+        if isinstance(node, NavigableString):
+            if type(node) in (NavigableString, CData):
+                buffer.append(str(node))
+            continue
+        if node.name in SKIP_TAGS:
+            continue
+        if node.name == 'br':
+            buffer.append(' ')
+            continue
+        if node.name in BLOCK_TAGS:
+            flush()
+            if node.name in HEADING_TAGS:
+                levels.append(HEADING_TAGS[node.name])
+            stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.contents))
+    flush()
+    return blocks
+
+def find_content(soup):
+    """Find the main content element of a parsed page.
+    
+    Args:
+        soup (BeautifulSoup): Parsed webpage.
+    
+    Returns:
+        Tag: Main content element, or None.
+    """
+    # Try multiple selectors to find main content
+    return (soup.find('article') or
+            soup.find('main') or
+            soup.find('div', class_=CONTENT_CLASS) or
+            soup.find('section') or
+            soup.find('body'))
+
+def text_from_blocks(blocks):
+    """Join extracted blocks into the page text, checking there is enough of it.
+    
+    Args:
+        blocks (list): Blocks of the content element, or None if none was found.
+    
+    Returns:
+        tuple: (extracted_text, error_message, blocks). Returns None for text and an error message if extraction fails.
+    """
+    if blocks is None:
+        logger.warning("No main content found in HTML")
+        return None, "No main content found in HTML structure.", []
+    
+    text = ' '.join(block["text"] for block in blocks)
+    
+    if not text or len(text.split()) < 10:
+        logger.warning("Insufficient meaningful text extracted")
+        return None, "Insufficient meaningful text extracted from webpage.", blocks
+    
+    logger.info("Successfully extracted text content")
+    return text, None, blocks
+
+@functools.lru_cache(maxsize=None)
+def lxml_available():
+    """Check once whether lxml is installed, without importing it."""
+    return importlib.util.find_spec("lxml") is not None
+
+def resolve_parser(parser=None):
+    """Pick the HTML parser backend to use.
+    
+    Args:
+        parser (str): 'lxml', 'html.parser' or 'auto' (default: HTML_PARSER).
+    
+    Returns:
+        str: 'lxml' or 'html.parser'.
+    """
+    parser = parser or HTML_PARSER
+    if parser == "auto":
+        return "lxml" if lxml_available() else "html.parser"
+    if parser not in ("lxml", "html.parser"):
+        raise ValueError(f"Unknown HTML parser backend: {parser}")
+    return parser
+
+def parse_lxml(html):
+    """Parse HTML with lxml's C parser.
+    
+    Args:
+        html (str): Raw HTML.
+    
+    Returns:
+        HtmlElement: Root element, or None for an empty document.
+    """
+    if not html or not html.strip():
+        return None
+    # Parse bytes so pages with an XML encoding declaration are accepted
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    return lxml_html.document_fromstring(html.encode('utf-8', 'replace'), parser=parser)
+
+def scan_tree(root):
+    """Count structure, collect links and find the content container in one pass.
+    
+    Args:
+        root (HtmlElement): Root from parse_lxml, or None.
+    
+    Returns:
+        tuple: (structure counts as from count_structure, list of link hrefs,
+            content element chosen as find_content would, or None).
+    """
+    structure = {"headings": 0, "paragraphs": 0, "lists": 0}
+    links = []
+    containers = {}
+    if root is None:
+        return structure, links, None
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):  # Comments and processing instructions
+            continue
+        if tag in STRUCTURE_TAGS:
+            structure[STRUCTURE_TAGS[tag]] += 1
+        elif tag == 'a':
+            href = element.get('href')
+            if href is not None:
+                links.append(href)
+        elif tag in CONTENT_CONTAINERS and tag not in containers:
+            if tag != 'div' or CONTENT_CLASS.search(element.get('class') or ''):
+                containers[tag] = element
+    content = next((containers[tag] for tag in CONTENT_CONTAINERS if tag in containers), None)
+    return structure, links, content
+
+def extract_blocks_lxml(content):
+    """Extract text blocks from an lxml content element, as extract_blocks does for BeautifulSoup.
+    
+    Args:
+        content (HtmlElement): Main content element.
+    
+    Returns:
+        list: Blocks in document order, each a dict with 'type', 'level' and 'text'.
+    """
+    blocks = []
+    buffer = []
+    levels = []  # Heading levels of the open heading elements
+    
+    def flush():
+        text = ' '.join(' '.join(buffer).split())
+        buffer.clear()
+        if text:
+            level = levels[-1] if levels else None
+            blocks.append({"type": "heading" if level else "text", "level": level, "text": text})
+    
+    # Stack items: ('open', element), ('close', element) or ('text', string);
+    # lxml keeps the text after an element in its tail, which belongs to the parent
+    stack = [('open', content)]
+    while stack:
+        kind, item = stack.pop()
+        if kind == 'text':
+            buffer.append(item)
+            continue
+        if kind == 'close':
+            flush()
+            if item.tag in HEADING_TAGS:
+                levels.pop()
+            continue
+        if item is not content and item.tail:
+            stack.append(('text', item.tail))
+        tag = item.tag
+        if not isinstance(tag, str) or tag in SKIP_TAGS:
+            continue
+        if tag == 'br':
+            buffer.append(' ')
+            continue
+        if tag in BLOCK_TAGS:
+            flush()
+            if tag in HEADING_TAGS:
+                levels.append(HEADING_TAGS[tag])
+            stack.append(('close', item))
+        stack.extend(('open', child) for child in reversed(item))
+        if item.text:
+            stack.append(('text', item.text))
+    flush()
+    return blocks
+
+def load_document(doc, incremental=False):
+    """Return a DocumentContext, fetching it if given a URL.
+
+    Args:
+        doc (DocumentContext or str): Existing context or webpage URL.
+        incremental (bool): Fetch with a conditional GET and enable result reuse.
+
+    Returns:
+        DocumentContext: The shared document context.
+    """
+    if isinstance(doc, DocumentContext):
+        if incremental:
+            doc.incremental = True
+        return doc
+    return DocumentContext.fetch(doc, incremental)
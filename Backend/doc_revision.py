@@ -1,58 +1,154 @@
-import requests
 import json
-import nltk
 import re
-import os
 import logging
-from backend.doc_analyzer import fetch_article_content
+import contextlib
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from backend.doc_context import load_document
+from backend.llm_client import get_client, LLMError
+from backend.run_store import get_run_store
+from backend.chunking import estimate_tokens
+from backend.rewrite_rules import get_engine
+from backend.segmentation import SegmentedText
+from backend.resources import sent_tokenize
+from backend.page_cache import get_section_cache, result_key
+from backend.events import publish, publishing, publish_text, TEXT_CHUNK_CHARS
+from backend.metrics import span, in_context
+from backend.sentence_memo import Fingerprint, SentenceMemo, get_sentence_memo, restore_numbers, record, tracking, INFLIGHT_WAIT
 
 # Configure logging for backend debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Download NLTK data
-nltk.download('punkt', quiet=True)
+# Batched simplification settings
+BATCH_SIMPLIFY = True  # Pack many sentences into one numbered prompt
+BATCH_TOKEN_BUDGET = 1500  # Approximate input tokens per batched prompt
+SIMPLIFY_MIN_WORDS = 10  # Sentences at or below this length are left as-is
+SIMPLIFY_WORKERS = 4  # Batched requests in flight at once
+SIMPLIFY_PROMPT = "Simplify the following sentence to make it clear and concise, using simple words and short phrases."
+BATCH_SIMPLIFY_PROMPT = ("Simplify each of the following numbered sentences to make it clear and concise, "
+                         "using simple words and short phrases. Reply with exactly one line per sentence, "
+                         "in the same order, formatted as '<number>. <simplified sentence>'. "
+                         "Do not merge, skip or add sentences.")
 
-# Google Gemini API key (replace with your own)
-GEMINI_API_KEY = " "  # Obtain from https://aistudio.google.com/app/apikey
+# Streaming revision settings
+STREAM_WINDOW_CHARS = 20000  # Characters of text sentence-tokenized at a time
+SIMPLIFY_WINDOW_TOKENS = BATCH_TOKEN_BUDGET  # Approximate tokens of sentences to simplify per window (one batched prompt)
+SIMPLIFY_WINDOW_SENTENCES = 100  # Sentences per window at most, counting those too short to simplify
+SIMPLIFY_WINDOWS_IN_FLIGHT = SIMPLIFY_WORKERS  # Windows simplified at once; bounds the sentences buffered
 
-# Output directory
-OUTPUT_DIR = "Output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Fallback suggestions, used without an analysis report; they switch on every revision step
+FALLBACK_SUGGESTIONS = {
+    "readability": {
+        "suggestions": [
+            "Simplify sentences, e.g., replace 'utilize' with 'use'.",
+            "Break sentences longer than 15 words into shorter ones."
+        ]
+    },
+    "style": {
+        "suggestions": [
+            "Use second-person pronouns, e.g., 'You can' instead of 'Users can'.",
+            "Replace jargon with simpler terms.",
+            "Shorten complex sentences."
+        ]
+    }
+}
+
+# Settings overridden for one run, e.g. by an A/B experiment (see revision_settings)
+VARIANT_SETTINGS = ("model", "simplify_prompt", "batch_prompt")
+
+_settings = contextvars.ContextVar("revision_settings", default={})
+_failures = contextvars.ContextVar("simplification_failures", default=None)
+
+@contextlib.contextmanager
+def revision_settings(**overrides):
+    """Override revision settings inside the block, including pool threads run with in_context.
+    
+    Args:
+        **overrides: Any of 'model' (Gemini model), 'simplify_prompt' and
+            'batch_prompt' (used instead of SIMPLIFY_PROMPT and
+            BATCH_SIMPLIFY_PROMPT), 'client' (GeminiClient that sends the
+            requests) and 'memo' (SentenceMemo to use, or None for none).
+    """
+    token = _settings.set({**_settings.get(), **overrides})
+    try:
+        yield
+    finally:
+        _settings.reset(token)
 
-def query_gemini(text, prompt, model="gemini-1.5-flash"):
+def setting(name, default=None):
+    """Return a setting overridden with revision_settings, or the default."""
+    return _settings.get().get(name, default)
+
+@contextlib.contextmanager
+def failure_tracking():
+    """Collect the simplification requests that fail inside the block, including pool threads run with in_context.
+    
+    Yields:
+        list: Error message of every failed request (empty if all succeeded).
+    """
+    failures = []
+    token = _failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _failures.reset(token)
+
+def note_failure(message):
+    """Log a failed simplification request and add it to the active failure_tracking list."""
+    logger.error(message)
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(message)
+
+def variant_settings():
+    """Return the overridden model and prompts, which revisions cached across runs depend on."""
+    return {name: value for name, value in _settings.get().items() if name in VARIANT_SETTINGS}
+
+def simplification_memo():
+    """Return the sentence memo for the active model and prompts, or None if it is disabled."""
+    if "memo" in _settings.get():
+        return setting("memo")
+    prompts = (setting("simplify_prompt", SIMPLIFY_PROMPT), setting("batch_prompt", BATCH_SIMPLIFY_PROMPT))
+    model = setting("model")
+    return get_sentence_memo(*prompts, model) if model else get_sentence_memo(*prompts)
+
+def query_gemini(text, prompt, model=None, max_output_tokens=None):
     """Query Google Gemini API for text simplification.
     
     Args:
         text (str): Input text to simplify.
         prompt (str): Prompt for the Gemini model.
-        model (str): Gemini model to use.
+        model (str): Gemini model to use (default: the 'model' setting, or GEMINI_MODEL).
+        max_output_tokens (int): Output token limit (default: half the input word count, at least 20).
     
     Returns:
-        str: Simplified text or original text on error.
+        str: Simplified text, or the original text on error or an empty reply.
     """
     logger.info("Querying Google Gemini API for simplification")
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "contents": [{"parts": [{"text": prompt + "\n\n" + text[:1000]}]}],
-        "generationConfig": {"maxOutputTokens": max(20, len(text.split()) // 2)}
-    }
+    if max_output_tokens is None:
+        max_output_tokens = max(20, len(text.split()) // 2)
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        simplified_text = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", text)
+        client = setting("client") or get_client()
+        simplified_text = client.generate(prompt, text, model=model or setting("model"),
+                                          generation_config={"maxOutputTokens": max_output_tokens})
+        if not simplified_text or not simplified_text.strip():
+            note_failure("Gemini returned an empty simplification; keeping the original text")
+            return text
         logger.info("Successfully simplified text")
         return simplified_text
-    except Exception as e:
-        logger.error(f"Gemini API error: {str(e)}")
+    except LLMError as e:
+        note_failure(str(e))
         return text  # Fallback to original text
 
 def simplify_sentence(sentence):
     """Simplify a sentence using Google Gemini API.
     
+    A stored simplification of the same sentence, or of a near-duplicate,
+    is reused from the sentence memo instead of sending a request.
+    
     Args:
         sentence (str): Sentence to simplify.
     
@@ -60,12 +156,238 @@ def simplify_sentence(sentence):
         str: Simplified sentence or original if unchanged.
     """
     logger.info("Simplifying sentence")
-    if len(sentence.split()) > 10:
-        prompt = "Simplify the following sentence to make it clear and concise, using simple words and short phrases."
-        simplified = query_gemini(sentence, prompt)
+    if len(sentence.split()) > SIMPLIFY_MIN_WORDS:
+        memo = simplification_memo()
+        fingerprint = Fingerprint(sentence) if memo else None
+        if memo:
+            simplified, source = memo.lookup(fingerprint)
+            if simplified is not None:
+                record(source)
+                return simplified
+        simplified = query_gemini(sentence, setting("simplify_prompt", SIMPLIFY_PROMPT))
+        record("llm")
+        if memo and simplified != sentence:  # Unchanged may mean a failed request; do not store it
+            memo.add(fingerprint, simplified)
         return simplified if simplified != sentence else sentence
     return sentence
 
+def dedupe_sentences(items, memo):
+    """Resolve sentences from the memo and group the rest by near-duplicate.
+    
+    Sentences left to send are claimed in the memo; the caller must release
+    every fingerprint in the returned mapping.
+    
+    Args:
+        items (list): (index, sentence) pairs to simplify.
+        memo (SentenceMemo): Stored simplifications, or None to skip the lookup.
+    
+    Returns:
+        tuple: (reused, pending, copies, waiting, fingerprints): reused maps an
+            index to its stored simplification; pending lists the (index,
+            sentence) pairs to send; copies lists (index, representative index)
+            pairs of sentences that take the simplification of a pending
+            sentence; waiting lists (index, event) pairs of sentences another
+            request is already simplifying; and fingerprints maps pending
+            indexes to their claimed Fingerprint.
+    """
+    reused, pending, copies, waiting, fingerprints = {}, [], [], [], {}
+    seen = SentenceMemo(":memory:", threshold=memo.threshold) if memo else None
+    for index, sentence in items:
+        if memo is None:
+            pending.append((index, sentence))
+            continue
+        fingerprint = Fingerprint(sentence)
+        simplified, source = memo.lookup(fingerprint)
+        if simplified is not None:
+            reused[index] = simplified
+            record(source)
+            continue
+        match = seen.find(fingerprint)
+        if match is not None:
+            copies.append((index, match["value"]))
+            continue
+        event = memo.claim(fingerprint)
+        if event is not None:
+            waiting.append((index, event))
+            continue
+        seen.add(fingerprint, index)
+        pending.append((index, sentence))
+        fingerprints[index] = fingerprint
+    return reused, pending, copies, waiting, fingerprints
+
+def build_batches(items, token_budget=BATCH_TOKEN_BUDGET):
+    """Group (index, sentence) pairs into batches under a token budget.
+    
+    Args:
+        items (list): (index, sentence) pairs to group.
+        token_budget (int): Approximate input tokens allowed per batch.
+    
+    Returns:
+        list: Lists of (index, sentence) pairs; oversized sentences get a batch of their own.
+    """
+    batches = []
+    current = []
+    used = 0
+    for index, sentence in items:
+        cost = estimate_tokens(sentence) + 2  # Room for the "<n>. " prefix
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current = []
+            used = 0
+        current.append((index, sentence))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def parse_numbered_response(response, expected):
+    """Split a numbered Gemini reply back into sentences.
+    
+    Args:
+        response (str): Model reply with one '<n>. sentence' line per item.
+        expected (int): Number of sentences that were sent.
+    
+    Returns:
+        dict: Simplified sentences keyed by their 1-based number; missing or empty items are omitted.
+    """
+    parsed = {}
+    for match in re.finditer(r'^\s*(\d+)\s*[.):-]\s*(.*?)\s*$', response, flags=re.MULTILINE):
+        number = int(match.group(1))
+        sentence = match.group(2).strip()
+        if 1 <= number <= expected and sentence and number not in parsed:
+            parsed[number] = sentence
+    if len(parsed) != expected:
+        logger.warning(f"Batched reply parsed {len(parsed)} of {expected} sentences")
+    return parsed
+
+def simplify_sentences(sentences, batch=None, token_budget=BATCH_TOKEN_BUDGET):
+    """Simplify many sentences, packing them into numbered batch prompts.
+    
+    Sentences that cannot be recovered from a batched reply are simplified
+    one at a time with simplify_sentence. Each batch's changed sentences are
+    published as a 'sentences' progress event as soon as it comes back.
+    
+    Repeated sentences are sent once: sentences with a stored simplification
+    of the same or a near-duplicate sentence reuse it, near-duplicates
+    within the call take the simplification of the first one sent, and
+    sentences another call is sending wait for its result. New
+    simplifications are added to the memo.
+    
+    Args:
+        sentences (list): Sentences to simplify.
+        batch (bool): Use batched prompts (default: BATCH_SIMPLIFY).
+        token_budget (int): Approximate input tokens per batched prompt.
+    
+    Returns:
+        list: Simplified sentences in the original order.
+    """
+    if batch is None:
+        batch = BATCH_SIMPLIFY
+    if not batch:
+        return [simplify_sentence(s) for s in sentences]
+    
+    results = list(sentences)
+    memo = simplification_memo()
+    batch_prompt = setting("batch_prompt", BATCH_SIMPLIFY_PROMPT)
+    long_sentences = [(i, s) for i, s in enumerate(sentences) if len(s.split()) > SIMPLIFY_MIN_WORDS]
+    reused, pending, copies, waiting, fingerprints = dedupe_sentences(long_sentences, memo)
+    for index, simplified in reused.items():
+        results[index] = simplified
+    batches = build_batches(pending, token_budget)
+    logger.info(f"Simplifying {len(long_sentences)} sentences: {len(reused)} from the memo, "
+                f"{len(copies)} duplicates, {len(waiting)} in flight elsewhere, "
+                f"{len(pending)} in {len(batches)} batched requests")
+    
+    def run_batch(chunk):
+        numbered = "\n".join(f"{n}. {' '.join(s.split())}" for n, (_, s) in enumerate(chunk, 1))
+        words = len(numbered.split())
+        response = query_gemini(numbered, batch_prompt, max_output_tokens=max(20, int(words * 1.5)))
+        if response == numbered:
+            # query_gemini hands back its input on API errors; keep the originals
+            return None
+        return parse_numbered_response(response, len(chunk))
+    
+    def report(indexes):
+        if publishing():
+            changed = [{"index": i, "original": sentences[i], "revised": results[i]}
+                       for i in indexes if results[i] != sentences[i]]
+            if changed:
+                publish("sentences", sentences=changed)
+    
+    def run_singles(items):
+        if not items:
+            return
+        logger.info(f"Falling back to single-sentence requests for {len(items)} sentences")
+        with ThreadPoolExecutor(max_workers=SIMPLIFY_WORKERS) as pool:
+            for (index, _), simplified in zip(items, pool.map(in_context(simplify_sentence), [s for _, s in items])):
+                results[index] = simplified
+                report([index])
+    
+    report(list(reused))
+    failed = []
+    multi = [chunk for chunk in batches if len(chunk) > 1]
+    failed.extend(chunk[0] for chunk in batches if len(chunk) == 1)
+    completed = False
+    try:
+        with ThreadPoolExecutor(max_workers=SIMPLIFY_WORKERS) as pool:
+            run = in_context(run_batch)
+            futures = {pool.submit(run, chunk): chunk for chunk in multi}
+            for future in as_completed(futures):
+                chunk, parsed = futures[future], future.result()
+                if parsed is None:
+                    record("llm", len(chunk))
+                    continue
+                for n, (index, sentence) in enumerate(chunk, 1):
+                    if n in parsed:
+                        results[index] = parsed[n]
+                        record("llm")
+                        if memo:
+                            memo.add(fingerprints[index], parsed[n])
+                    else:
+                        failed.append((index, sentence))
+                report([index for index, _ in chunk])
+        run_singles(failed)
+        completed = True
+    finally:
+        # Release claims before waiting on anyone else's, so calls never wait on each other. Unchanged
+        # sentences may be failed requests, so waiters get no outcome for them and send them themselves
+        for index, fingerprint in fingerprints.items():
+            changed = completed and results[index] != sentences[index]
+            memo.release(fingerprint, (sentences[index], results[index]) if changed else None)
+    
+    # Sentences another call was sending take its result like copies do; send them here if that call failed
+    unresolved = []
+    for index, event in waiting:
+        event.wait(INFLIGHT_WAIT)
+        if event.outcome is None:
+            unresolved.append((index, sentences[index]))
+            continue
+        original, simplified = event.outcome
+        simplified = restore_numbers(simplified, Fingerprint(original).numbers, Fingerprint(sentences[index]).numbers)
+        if simplified is None:
+            unresolved.append((index, sentences[index]))
+            continue
+        results[index] = simplified
+        record("duplicate")
+    report([index for index, _ in waiting])
+    run_singles(unresolved)
+    
+    # Copies take their representative's simplification, with their own numbers
+    unmatched = []
+    for index, representative in copies:
+        simplified = results[representative]
+        if simplified != sentences[representative]:  # Unchanged: keep the original, as the representative did
+            simplified = restore_numbers(simplified, fingerprints[representative].numbers,
+                                         Fingerprint(sentences[index]).numbers)
+            if simplified is None:
+                unmatched.append((index, sentences[index]))
+                continue
+            results[index] = simplified
+        record("duplicate")
+    report([index for index, _ in copies])
+    run_singles(unmatched)
+    return results
+
 def replace_jargon(text):
     """Replace technical jargon with simpler terms.
     
@@ -73,21 +395,10 @@ def replace_jargon(text):
         text (str): Input text.
     
     Returns:
-        str: Text with jargon replaced.
+        str: Text with jargon replaced, using the 'jargon' rules in rewrite_rules.json.
     """
     logger.info("Replacing jargon")
-    jargon_dict = {
-        r'\bleverage\b': 'use',
-        r'\butilize\b': 'use',
-        r'\boptimize\b': 'improve',
-        r'\bconfigure\b': 'set up',
-        r'\bimplement\b': 'apply',
-        r'\bsynergize\b': 'work together',
-        r'\borchestration\b': 'management'
-    }
-    for jargon, replacement in jargon_dict.items():
-        text = re.sub(jargon, replacement, text, flags=re.IGNORECASE)
-    return text
+    return get_engine("jargon").apply(text)
 
 def convert_to_second_person(text):
     """Convert third-person pronouns to second-person.
@@ -96,21 +407,24 @@ def convert_to_second_person(text):
         text (str): Input text.
     
     Returns:
-        str: Text with second-person pronouns.
+        str: Text with second-person pronouns, using the 'pronouns' rules in rewrite_rules.json.
     """
     logger.info("Converting to second-person")
-    replacements = {
-        r'\busers can\b': 'you can',
-        r'\bthe user\b': 'you',
-        r'\buser should\b': 'you should',
-        r'\busers should\b': 'you should',
-        r'\busers\b': 'you',
-        r'\bpeople can\b': 'you can',
-        r'\bindividuals\b': 'you'
-    }
-    for old, new in replacements.items():
-        text = re.sub(old, new, text, flags=re.IGNORECASE)
-    return text
+    return get_engine("pronouns").apply(text)
+
+def split_sentence(sentence):
+    """Split a sentence longer than 10 words into chunks of up to 8 words.
+    
+    Args:
+        sentence (str): Input sentence.
+    
+    Returns:
+        list: The sentence itself, or its chunks.
+    """
+    words = sentence.split()
+    if len(words) > 10:
+        return [' '.join(words[i:i+8]) for i in range(0, len(words), 8)]
+    return [sentence]
 
 def split_long_sentences(text):
     """Split sentences longer than 10 words into shorter ones.
@@ -122,23 +436,64 @@ def split_long_sentences(text):
         str: Text with long sentences split.
     """
     logger.info("Splitting long sentences")
-    sentences = nltk.sent_tokenize(text)
-    revised_sentences = []
-    for sentence in sentences:
-        words = sentence.split()
-        if len(words) > 10:
-            chunks = [' '.join(words[i:i+8]) for i in range(0, len(words), 8)]
-            revised_sentences.extend(chunks)
-        else:
-            revised_sentences.append(sentence)
-    return '. '.join(s for s in revised_sentences if s.strip())
+    segments = SegmentedText(text)
+    segments.map_sentences(split_sentence)
+    return segments.text
 
-def apply_suggestions(original_text, suggestions):
+def revision_plan(suggestions):
+    """Work out the revision steps, in order, that a report's suggestions call for.
+    
+    Args:
+        suggestions (dict): Analysis suggestions from report.
+    
+    Returns:
+        list: Step names ('jargon', 'split', 'pronouns', 'simplify'); split and
+            simplify may repeat, the idempotent rule-based rewrites run at most once.
+    """
+    plan = []
+    for suggestion in suggestions.get('readability', {}).get('suggestions', []) + suggestions.get('style', {}).get('suggestions', []):
+        lower = suggestion.lower()
+        if ('simplify sentences' in lower or 'replace jargon' in lower) and 'jargon' not in plan:
+            plan.append('jargon')
+        if 'break sentences' in lower or 'shorten' in lower:
+            plan.append('split')
+        if 'second-person' in lower and 'pronouns' not in plan:
+            plan.append('pronouns')
+        if 'shorten' in lower or 'simplify' in lower:
+            plan.append('simplify')
+    return plan
+
+def sentence_transform(step):
+    """Return the per-sentence transform of a rule-based revision step.
+    
+    The rewrite engine is resolved once per step, not once per sentence.
+    
+    Args:
+        step (str): 'jargon', 'split' or 'pronouns'.
+    
+    Returns:
+        callable: Takes a sentence and returns a sentence or a list of sentences.
+    """
+    if step == 'split':
+        return split_sentence
+    return get_engine(step).apply
+
+STEP_MESSAGES = {
+    'jargon': "Replacing jargon",
+    'split': "Splitting long sentences",
+    'pronouns': "Converting to second-person",
+}
+
+def apply_suggestions(original_text, suggestions, segments=None):
     """Apply readability and style suggestions to text.
     
+    The text is segmented once; every step rewrites sentences in place, and
+    only changed sentences are re-segmented.
+    
     Args:
         original_text (str): Original text to revise.
         suggestions (dict): Analysis suggestions from report.
+        segments (SegmentedText): Existing segmentation of original_text to start from (copied, not modified).
     
     Returns:
         str: Revised text.
@@ -148,21 +503,22 @@ def apply_suggestions(original_text, suggestions):
         return "No content to revise."
     
     logger.info("Applying revision suggestions")
-    revised_text = original_text
+    segments = segments.copy() if segments is not None else SegmentedText(original_text)
     
     # Apply all relevant suggestions
-    for suggestion in suggestions.get('readability', {}).get('suggestions', []) + suggestions.get('style', {}).get('suggestions', []):
-        if 'simplify sentences' in suggestion.lower() or 'replace jargon' in suggestion.lower():
-            revised_text = replace_jargon(revised_text)
-        if 'break sentences' in suggestion.lower() or 'shorten' in suggestion.lower():
-            revised_text = split_long_sentences(revised_text)
-        if 'second-person' in suggestion.lower():
-            revised_text = convert_to_second_person(revised_text)
-        if 'shorten' in suggestion.lower() or 'simplify' in suggestion.lower():
-            sentences = nltk.sent_tokenize(revised_text)
-            revised_text = '. '.join(simplify_sentence(s) for s in sentences if s.strip())
+    for step in revision_plan(suggestions):
+        with span(f"revision.{step}"):
+            if step == 'simplify':
+                # Replace from the end, so a sentence replaced by several (or none) cannot shift the ones still to go
+                simplified = simplify_sentences(segments.sentences)
+                for index in reversed(range(len(simplified))):
+                    segments.replace_sentence(index, simplified[index])
+            else:
+                logger.info(STEP_MESSAGES[step])
+                segments.map_sentences(sentence_transform(step))
     
     # Clean up punctuation
+    revised_text = segments.text
     revised_text = re.sub(r'\.\.+', '.', revised_text)
     revised_text = re.sub(r'\s+\.', '.', revised_text)
     revised_text = revised_text.strip('. ')
@@ -170,67 +526,323 @@ def apply_suggestions(original_text, suggestions):
     logger.info("Revision completed")
     return revised_text
 
-def revise_documentation(url, report_file):
+def iter_sentences(text, window_chars=STREAM_WINDOW_CHARS):
+    """Yield the sentences of a text, tokenizing one bounded window at a time.
+    
+    The last sentence of each window may run past it, so it is tokenized
+    again at the start of the next window; sentence boundaries therefore
+    match tokenizing the whole text at once, without ever doing so.
+    
+    Args:
+        text (str): Text to split.
+        window_chars (int): Characters per tokenized window (grown while a
+            window holds less than two sentences).
+    
+    Yields:
+        str: Non-empty sentences in order.
+    """
+    start, size = 0, window_chars
+    while start < len(text):
+        end = start + size
+        sentences = [sentence for sentence in sent_tokenize(text[start:end]) if sentence.strip()]
+        if end >= len(text):
+            yield from sentences
+            return
+        tail = text.rfind(sentences[-1], start, end) if sentences else -1
+        if len(sentences) < 2 or tail <= start:
+            size *= 2
+            continue
+        yield from sentences[:-1]
+        start, size = tail, window_chars
+
+def map_stage(transform):
+    """Turn a per-sentence transform into a streaming stage.
+    
+    Args:
+        transform (callable): Takes a sentence and returns a sentence or a list of sentences.
+    
+    Returns:
+        callable: Stage taking and returning an iterator of sentences; empty results are dropped.
+    """
+    def stage(sentences):
+        for sentence in sentences:
+            result = transform(sentence)
+            for revised in ([result] if isinstance(result, str) else result):
+                if revised.strip():
+                    yield revised
+    return stage
+
+def sentence_windows(sentences, token_budget=SIMPLIFY_WINDOW_TOKENS, max_sentences=SIMPLIFY_WINDOW_SENTENCES):
+    """Group a sentence stream into windows that fill about one batched prompt each.
+    
+    Only sentences long enough to be simplified count towards the budget,
+    with the same cost as in build_batches.
+    
+    Args:
+        sentences (iterable): Sentences.
+        token_budget (int): Approximate prompt tokens per window.
+        max_sentences (int): Sentences per window at most.
+    
+    Yields:
+        list: Consecutive sentences; a sentence over the budget gets a window of its own.
+    """
+    window, used = [], 0
+    for sentence in sentences:
+        cost = estimate_tokens(sentence) + 2 if len(sentence.split()) > SIMPLIFY_MIN_WORDS else 0
+        if window and (used + cost > token_budget or len(window) >= max_sentences):
+            yield window
+            window, used = [], 0
+        window.append(sentence)
+        used += cost
+    if window:
+        yield window
+
+def simplify_stage(sentences, token_budget=SIMPLIFY_WINDOW_TOKENS, in_flight=SIMPLIFY_WINDOWS_IN_FLIGHT):
+    """Simplify a sentence stream window by window, keeping several windows in flight.
+    
+    Each window goes through simplify_sentences on a worker thread. At most
+    in_flight windows are pending at once, and results come out in input
+    order, so the stage buffers a bounded number of sentences however long
+    the stream is.
+    
+    Args:
+        sentences (iterable): Sentences to simplify.
+        token_budget (int): Approximate tokens per window.
+        in_flight (int): Windows simplified concurrently.
+    
+    Yields:
+        str: Simplified sentences in order.
+    """
+    def simplify_window(window):
+        with span("revision.simplify"):
+            return simplify_sentences(window)
+    
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=in_flight) as pool:
+        run = in_context(simplify_window)
+        for window in sentence_windows(sentences, token_budget):
+            if any(len(s.split()) > SIMPLIFY_MIN_WORDS for s in window):
+                pending.append(pool.submit(run, window))
+            else:
+                # Nothing to simplify; pass the window through in order without a worker
+                done = Future()
+                done.set_result(window)
+                pending.append(done)
+            if len(pending) >= in_flight:
+                yield from (s for s in pending.popleft().result() if s.strip())
+        while pending:
+            yield from (s for s in pending.popleft().result() if s.strip())
+
+def finish_sentences(sentences):
+    """Apply apply_suggestions' punctuation clean-up to a sentence stream.
+    
+    Every sentence gets end punctuation and loses repeated or space-separated
+    periods; leading periods of the first and trailing periods of the last
+    sentence are stripped, which needs one sentence of lookahead.
+    
+    Args:
+        sentences (iterable): Revised sentences.
+    
+    Yields:
+        str: Output sentences, to be joined with single spaces.
+    """
+    previous = None
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if sentence[-1] not in '.!?':
+            sentence += '.'
+        sentence = re.sub(r'\s+\.', '.', re.sub(r'\.\.+', '.', sentence))
+        if previous is None:
+            sentence = sentence.lstrip('. ')
+            if not sentence:
+                continue
+        else:
+            yield previous
+        previous = sentence
+    if previous is not None and previous.rstrip('. '):
+        yield previous.rstrip('. ')
+
+def stream_suggestions(sentences, suggestions):
+    """Revise a sentence stream lazily through the steps the suggestions call for.
+    
+    The generator counterpart of apply_suggestions: sentences flow through
+    composable jargon, split, pronoun and simplify stages one at a time, so
+    output is available as soon as the first window is simplified and memory
+    use does not grow with the length of the text.
+    
+    Args:
+        sentences (iterable): Sentences of the original text (see iter_sentences).
+        suggestions (dict): Analysis suggestions from report.
+    
+    Yields:
+        str: Revised sentences, to be joined with single spaces.
+    """
+    stream = iter(sentences)
+    for step in revision_plan(suggestions):
+        stream = simplify_stage(stream) if step == 'simplify' else map_stage(sentence_transform(step))(stream)
+    yield from finish_sentences(stream)
+
+def write_revision(pieces, run_id, keep_text=True):
+    """Write revised text to the run's Markdown and text files as it is produced.
+    
+    Pieces are joined with single spaces, appended to both files (which
+    appear atomically once complete) and published as 'revised_text' events
+    in chunks of about TEXT_CHUNK_CHARS.
+    
+    Args:
+        pieces (iterable): Revised sentences or sections.
+        run_id (str): Run to write the output files into.
+        keep_text (bool): Also return the whole text; False keeps memory use constant.
+    
+    Returns:
+        tuple: (revised text or None, number of characters, output file paths).
+    """
+    store = get_run_store()
+    header = render_markdown("")
+    kept = [] if keep_text else None
+    pending, pending_chars = [header], len(header)  # Text not yet published
+    chars = 0
+    with store.open_text(run_id, "revised_content.md") as md, store.open_text(run_id, "revised_content.txt") as txt:
+        md.write(header)
+        for piece in pieces:
+            if chars:
+                piece = ' ' + piece
+            md.write(piece)
+            txt.write(piece)
+            chars += len(piece)
+            if kept is not None:
+                kept.append(piece)
+            pending.append(piece)
+            pending_chars += len(piece)
+            if pending_chars >= TEXT_CHUNK_CHARS:
+                # Publish whole chunks only; the remainder waits for more text
+                text = ''.join(pending)
+                cut = len(text) - len(text) % TEXT_CHUNK_CHARS
+                publish_text("revised_text", text[:cut], last=False)
+                pending, pending_chars = [text[cut:]], len(text) - cut
+    publish_text("revised_text", ''.join(pending))
+    return (''.join(kept) if kept is not None else None), chars, [store.path(run_id, "revised_content.md"),
+                                                                  store.path(run_id, "revised_content.txt")]
+
+def revise_sections(doc, suggestions):
+    """Apply suggestions section by section, reusing cached revisions of unchanged sections.
+    
+    Each section's revision is cached under its content hash, the
+    suggestions that drive apply_suggestions and any model or prompt
+    overrides, so only sections that changed since the last run (or got
+    different suggestions) are revised again. A section in which a
+    simplification request failed is not cached, so the next run retries it.
+    
+    Args:
+        doc (DocumentContext): Fetched document with sections.
+        suggestions (dict): Analysis suggestions from report.
+    
+    Returns:
+        str: Revised text.
+    """
+    if not doc.sections:
+        return apply_suggestions(doc.text, suggestions, doc.segments if doc.text else None)
+    cache = get_section_cache()
+    drivers = [suggestions.get(name, {}).get('suggestions', []) for name in ('readability', 'style')]
+    variant = variant_settings()
+    params = (drivers, variant) if variant else (drivers,)
+    revised, reused = [], 0
+    for section in doc.sections:
+        key = result_key("revision", section["hash"], *params)
+        text = cache.get(key)
+        if text is None:
+            with failure_tracking() as failures:
+                text = apply_suggestions(section["text"], suggestions)
+            if not failures:  # Failed requests are retried on the next run
+                cache.set(key, text)
+        else:
+            reused += 1
+        revised.append(text)
+    logger.info(f"Revised {len(doc.sections) - reused} changed sections, reused {reused}")
+    return ' '.join(text if text[-1] in '.!?' else text + '.' for text in revised if text).strip('. ')
+
+def render_markdown(revised_text):
+    """Render revised text as the Markdown output document.
+    
+    Args:
+        revised_text (str): Revised content.
+    
+    Returns:
+        str: Markdown document.
+    """
+    return "# Revised Webpage Content\n\n" + revised_text
+
+def revise_documentation(doc, report=None, run_id=None, keep_text=True):
     """Revise a webpage's content based on analysis report.
     
+    Sentences stream through the revision stages into the output files and
+    'revised_text' progress events as they are revised (see
+    stream_suggestions); in incremental mode the text is revised section by
+    section instead.
+    
     Args:
-        url (str): Webpage URL.
-        report_file (str): Path to analysis report JSON.
+        doc (DocumentContext or str): Fetched document, or a webpage URL to fetch.
+        report (dict or str): Analysis report, or path to an analysis report JSON.
+        run_id (str): Run to save output files into (default: the report's run, or a new run).
+        keep_text (bool): Return the revised text; False keeps memory use constant on very large pages.
     
     Returns:
-        dict: Revision results with original and revised text.
+        dict: Revision results with original and revised text, and where the
+            simplified sentences came from (see sentence_memo.dedup_summary).
     """
+    doc = load_document(doc)
+    url = doc.url
     logger.info(f"Starting revision for URL: {url}")
-    original_text, error = fetch_article_content(url)
-    if error:
-        logger.warning(f"Content fetching error: {error}")
+    original_text = doc.text
+    if doc.error:
+        logger.warning(f"Content fetching error: {doc.error}")
     
-    try:
-        with open(report_file, 'r') as f:
-            report = json.load(f)
-    except Exception as e:
-        logger.error(f"Error reading report: {str(e)}")
-        # Fallback suggestions
-        report = {
-            "analysis": {
-                "readability": {
-                    "suggestions": [
-                        "Simplify sentences, e.g., replace 'utilize' with 'use'.",
-                        "Break sentences longer than 15 words into shorter ones."
-                    ]
-                },
-                "style": {
-                    "suggestions": [
-                        "Use second-person pronouns, e.g., 'You can' instead of 'Users can'.",
-                        "Replace jargon with simpler terms.",
-                        "Shorten complex sentences."
-                    ]
-                }
-            }
-        }
+    if isinstance(report, str):
+        try:
+            with open(report, 'r') as f:
+                report = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading report: {str(e)}")
+            report = None
+    if not report:
+        logger.warning("No analysis report available; using fallback suggestions")
+        report = {"analysis": FALLBACK_SUGGESTIONS}
     
     suggestions = report.get('analysis', {})
-    revised_text = apply_suggestions(original_text, suggestions)
     
-    # Save revised content as Markdown
-    md_output = os.path.join(OUTPUT_DIR, "revised__content.md")
-    txt_output = os.path.join(OUTPUT_DIR, "revised_content.txt")
-    try:
-        with open(md_output, 'w') as f:
-            f.write("# Revised Webpage Content\n\n")
-            f.write(revised_text)
-        logger.info(f"Revised Markdown saved to {md_output}")
-        
-        with open(txt_output, 'w') as f:
-            f.write(revised_text)
-        logger.info(f"Revised text saved to {txt_output}")
-    except Exception as e:
-        logger.error(f"Error saving output files: {str(e)}")
-        return {"url": url, "error": f"Error saving output files: {str(e)}", "revised_text": revised_text}
-    
-    return {
+    def revised_pieces():
+        if not original_text:
+            logger.warning("No text provided for revision")
+            yield "No content to revise."
+        elif doc.incremental:
+            yield revise_sections(doc, suggestions)
+        else:
+            logger.info("Streaming revision suggestions")
+            # Reuse the analysis segmentation if there is one; otherwise tokenize as the stream goes
+            sentences = doc.segments.sentences if doc.segmented else iter_sentences(original_text)
+            yield from stream_suggestions(sentences, suggestions)
+    
+    # Save revised content as Markdown and plain text in the run directory while it is produced
+    store = get_run_store()
+    run_id = run_id or report.get('run_id') or store.new_run()
+    with span("revision"), tracking() as simplification:
+        try:
+            revised_text, revised_chars, output_files = write_revision(revised_pieces(), run_id, keep_text)
+        except OSError as e:
+            logger.error(f"Error saving output files: {str(e)}")
+            return {"url": url, "run_id": run_id, "error": f"Error saving output files: {str(e)}"}
+    logger.info(f"Revised content saved to {', '.join(output_files)}")
+    
+    result = {
         "url": url,
+        "run_id": run_id,
         "original_text": original_text,
-        "revised_text": revised_text,
-        "output_files": [md_output, txt_output]
+        "revised_chars": revised_chars,
+        "simplification": simplification.summary(),
+        "output_files": output_files
     }
+    if keep_text:
+        result["revised_text"] = revised_text
+    return result
@@ -0,0 +1,142 @@
+import contextvars
+import json
+import threading
+import logging
+from collections import deque
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Progress event settings
+MAX_EVENTS = 1000  # Events kept per job; a reader that falls further behind is told about the gap
+TEXT_CHUNK_CHARS = 4000  # Characters of revised text per streamed event
+
+_current = contextvars.ContextVar("event_log", default=None)
+
+class EventLog:
+    """Bounded, append-only log of progress events for one job.
+
+    Events get increasing integer IDs, so a reader (e.g. a Server-Sent
+    Events connection) can resume after the last ID it saw. Only the most
+    recent max_events are kept, which bounds memory for very large
+    documents; a reader that asks for dropped events is told there was a gap.
+
+    Args:
+        max_events (int): Events kept in memory.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._events = deque(maxlen=max_events)
+        self._next_id = 1
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def publish(self, event, data):
+        """Append an event and wake up waiting readers.
+
+        Args:
+            event (str): Event name.
+            data (dict): JSON-serializable payload.
+        """
+        with self._cond:
+            self._events.append((self._next_id, event, data))
+            self._next_id += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Mark the log complete; readers stop once they have read everything."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        """bool: True once the job has finished publishing."""
+        return self._closed
+
+    def read(self, after=0, timeout=None):
+        """Return events newer than an ID, waiting for one if there are none yet.
+
+        Args:
+            after (int): ID of the last event the reader has seen.
+            timeout (float): Seconds to wait for a new event (None waits indefinitely).
+
+        Returns:
+            tuple: (list of (id, event, data) tuples, bool True if events after
+                `after` were dropped before this read).
+        """
+        with self._cond:
+            if self._next_id - 1 <= after and not self._closed:
+                self._cond.wait(timeout)
+            events = [e for e in self._events if e[0] > after]
+            gap = bool(self._events) and self._events[0][0] > after + 1
+            return events, gap
+
+def bind(log):
+    """Make an event log the target of publish() in the current context.
+
+    Args:
+        log (EventLog): Log of the job being run.
+
+    Returns:
+        contextvars.Token: Token for unbind.
+    """
+    return _current.set(log)
+
+def unbind(token):
+    """Restore the previous publish() target.
+
+    Args:
+        token (contextvars.Token): Token returned by bind.
+    """
+    _current.reset(token)
+
+def publishing():
+    """Check whether progress events are being collected, so callers can skip building them.
+
+    Returns:
+        bool: True if an event log is bound in the current context.
+    """
+    return _current.get() is not None
+
+def publish(event, **data):
+    """Publish a progress event to the bound event log; does nothing outside a job.
+
+    Args:
+        event (str): Event name.
+        **data: JSON-serializable payload fields.
+    """
+    log = _current.get()
+    if log is not None:
+        log.publish(event, data)
+
+def publish_text(event, text, chunk_chars=TEXT_CHUNK_CHARS, last=True):
+    """Publish a long text as a series of bounded chunks.
+
+    Args:
+        event (str): Event name; each chunk carries 'text' and 'last'.
+        text (str): Text to stream.
+        chunk_chars (int): Maximum characters per event.
+        last (bool): Whether the text ends the stream; False when more text follows in later calls.
+    """
+    if not publishing():
+        return
+    text = text or ""
+    starts = range(0, len(text), chunk_chars) if text else [0]
+    for start in starts:
+        publish(event, text=text[start:start + chunk_chars], last=last and start + chunk_chars >= len(text))
+
+def format_sse(event_id, event, data):
+    """Format one event for a text/event-stream response.
+
+    Args:
+        event_id (int): Event ID, echoed back by the browser as Last-Event-ID (None to omit).
+        event (str): Event name.
+        data (dict): Payload.
+
+    Returns:
+        str: Server-Sent Events message.
+    """
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
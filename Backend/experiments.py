@@ -0,0 +1,247 @@
+import json
+import re
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from backend.doc_context import DocumentContext, load_document
+from backend.doc_revision import revise_documentation, revision_settings, VARIANT_SETTINGS, FALLBACK_SUGGESTIONS
+from backend.llm_client import GeminiClient, GEMINI_MODEL
+from backend.llm_cache import ResponseCache
+from backend.sentence_memo import SentenceMemo, MEMO_ENABLED
+from backend.readability import readability_metrics
+from backend.run_store import get_run_store
+from backend.metrics import in_context
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# USD per million (prompt, output) tokens, for cost estimates; a variant's 'price' overrides these
+MODEL_PRICES = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-flash-8b": (0.0375, 0.15),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+}
+
+# Experiment settings
+QUALITY_TOLERANCE = 0.5  # Grade levels a variant's Flesch-Kincaid gain may trail the best one and still be recommended
+SCORED_METRICS = ("flesch_kincaid", "gunning_fog")  # Readability scores compared against the original text
+EXPERIMENT_FILE = "experiment.json"
+TABLE_FILE = "comparison.md"
+
+def load_variants(path=None, models=()):
+    """Build the variants to compare from a JSON file and/or model names.
+
+    A variant is a dict with a 'name' and any of 'model', 'simplify_prompt',
+    'batch_prompt' and 'price' ([prompt, output] USD per million tokens).
+
+    Args:
+        path (str): JSON file with a list of variants.
+        models (list): Model names, one variant each with the default prompts.
+
+    Returns:
+        list: Variants with unique names.
+
+    Raises:
+        ValueError: If a variant has unknown keys, a bad price or a duplicate name.
+    """
+    variants = []
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            variants.extend(json.load(f))
+    variants.extend({"model": model} for model in models)
+    names = set()
+    for number, variant in enumerate(variants, 1):
+        if not isinstance(variant, dict):
+            raise ValueError(f"Variant {number} is not an object")
+        unknown = set(variant) - {"name", "price", *VARIANT_SETTINGS}
+        if unknown:
+            raise ValueError(f"Variant {number} has unknown keys: {', '.join(sorted(unknown))}")
+        price = variant.get("price")
+        if price is not None and (not isinstance(price, (list, tuple)) or len(price) != 2):
+            raise ValueError(f"Variant {number} price must be [prompt, output] USD per million tokens")
+        variant.setdefault("name", variant.get("model") or f"variant-{number}")
+        if variant["name"] in names:
+            raise ValueError(f"Duplicate variant name: {variant['name']}")
+        names.add(variant["name"])
+    return variants
+
+def load_page(target):
+    """Fetch a URL or read a local HTML file once, for every variant to share.
+
+    Args:
+        target (str): URL or HTML file path.
+
+    Returns:
+        DocumentContext: Parsed page; local files get a file:// URL.
+    """
+    if target.startswith(('http://', 'https://')):
+        return load_document(target)
+    path = Path(target).resolve()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+    except OSError as e:
+        return DocumentContext(path.as_uri(), error=f"Error reading file: {str(e)}.")
+    return DocumentContext.from_html(path.as_uri(), html)
+
+def estimate_cost(model, usage, price=None):
+    """Estimate the USD cost of a variant's token usage.
+
+    Args:
+        model (str): Model the tokens were sent to.
+        usage (dict): Client usage with 'prompt_tokens' and 'output_tokens'.
+        price (list): [prompt, output] USD per million tokens (default: MODEL_PRICES).
+
+    Returns:
+        float: Cost in USD, or None if the model's price is unknown.
+    """
+    price = price or MODEL_PRICES.get(model)
+    if price is None:
+        return None
+    return round((usage["prompt_tokens"] * price[0] + usage["output_tokens"] * price[1]) / 1e6, 6)
+
+def run_variant(doc, variant, report, baseline, cold):
+    """Revise a document with one variant's model and prompts and score the result.
+
+    Every variant gets its own Gemini client, so its token usage is its
+    own, as if it ran alone; variants on the same model share that model's
+    rate limit, as Gemini quotas are per model.
+
+    Args:
+        doc (DocumentContext): Fetched document shared by all variants.
+        variant (dict): Variant from load_variants.
+        report (dict): Analysis report whose suggestions are applied.
+        baseline (dict): Readability scores of the original text.
+        cold (bool): Use an empty response cache and sentence memo, so every
+            sentence is sent and latency and cost are those of a first run.
+
+    Returns:
+        dict: Variant result with 'run_id', 'seconds', client usage,
+            'cost_usd', 'readability', 'delta' (revised minus original
+            score; negative is easier to read) and 'simplification'.
+    """
+    model = variant.get("model") or GEMINI_MODEL
+    overrides = {name: variant[name] for name in VARIANT_SETTINGS if variant.get(name)}
+    # A cold variant's private cache is invisible to the others, so waiting on their identical requests only serializes them
+    client = GeminiClient(cache=ResponseCache(":memory:"), share_requests=False) if cold else GeminiClient()
+    if cold:
+        overrides["memo"] = SentenceMemo(":memory:") if MEMO_ENABLED else None
+    run_id = get_run_store().new_run()
+    logger.info(f"Running variant {variant['name']} ({model}) into run {run_id}")
+    start = time.perf_counter()
+    with revision_settings(client=client, **overrides):
+        result = revise_documentation(doc, report, run_id=run_id)
+    seconds = time.perf_counter() - start
+    usage = client.usage()
+    row = {"name": variant["name"], "model": model, "run_id": run_id, "seconds": round(seconds, 3),
+           **usage, "request_seconds": round(usage["request_seconds"], 3),
+           "cost_usd": estimate_cost(model, usage, variant.get("price"))}
+    if result.get("error"):
+        row["error"] = result["error"]
+        return row
+    scores = readability_metrics(result["revised_text"])
+    row["readability"] = scores
+    row["delta"] = {name: round(scores[name] - baseline[name], 2) for name in SCORED_METRICS}
+    row["simplification"] = result.get("simplification")
+    return row
+
+def recommend(rows, tolerance=QUALITY_TOLERANCE):
+    """Pick the fastest variant whose readability gain is close to the best one.
+
+    Args:
+        rows (list): Variant results from run_variant.
+        tolerance (float): Flesch-Kincaid grade levels a variant may trail the best gain by.
+
+    Returns:
+        str: Name of the recommended variant, or None if no variant lowered the grade.
+    """
+    scored = [row for row in rows if "delta" in row and row["delta"]["flesch_kincaid"] < 0]
+    if not scored:
+        return None
+    best = min(row["delta"]["flesch_kincaid"] for row in scored)
+    close = [row for row in scored if row["delta"]["flesch_kincaid"] <= best + tolerance]
+    return min(close, key=lambda row: row["seconds"])["name"]
+
+def run_experiment(doc, variants, report=None, cold=True, parallel=True):
+    """Revise the same document with several variants and compare them.
+
+    The page is fetched and segmented once; the variants then run at the
+    same time (or one after another with parallel=False), each writing its
+    output files into its own run.
+
+    Args:
+        doc (DocumentContext or str): Fetched document, or a URL or HTML file to load.
+        variants (list): Variants from load_variants.
+        report (dict): Analysis report whose suggestions every variant applies
+            (default: FALLBACK_SUGGESTIONS, i.e. every revision step).
+        cold (bool): Give every variant an empty response cache and sentence memo.
+        parallel (bool): Run the variants at the same time.
+
+    Returns:
+        dict: 'url', 'baseline' readability scores, one result per variant
+            under 'variants', the 'recommended' variant name, and the
+            experiment's 'run_id' and 'output_files'.
+    """
+    doc = doc if isinstance(doc, DocumentContext) else load_page(doc)
+    if doc.error or not doc.text:
+        return {"url": doc.url, "error": doc.error or "No content to revise."}
+    report = report or {"analysis": FALLBACK_SUGGESTIONS}
+    baseline = readability_metrics(doc.segments)
+    logger.info(f"Comparing {len(variants)} revision variants on {doc.url}")
+
+    def run(variant):
+        try:
+            return run_variant(doc, variant, report, baseline, cold)
+        except Exception as e:
+            logger.error(f"Variant {variant['name']} failed: {str(e)}")
+            return {"name": variant["name"], "model": variant.get("model") or GEMINI_MODEL, "error": str(e)}
+
+    if parallel and len(variants) > 1:
+        with ThreadPoolExecutor(max_workers=len(variants), thread_name_prefix="variant") as pool:
+            rows = list(pool.map(in_context(run), variants))
+    else:
+        rows = [run(variant) for variant in variants]
+
+    experiment = {"url": doc.url, "cold": cold, "baseline": baseline, "variants": rows,
+                  "recommended": recommend(rows)}
+    store = get_run_store()
+    run_id = store.new_run()
+    experiment["run_id"] = run_id
+    experiment["output_files"] = [store.write_json(run_id, EXPERIMENT_FILE, experiment),
+                                  store.write_text(run_id, TABLE_FILE, comparison_table(experiment) + "\n")]
+    return experiment
+
+def comparison_table(experiment):
+    """Render an experiment as a Markdown comparison table.
+
+    Args:
+        experiment (dict): Result of run_experiment.
+
+    Returns:
+        str: Table with one row per variant, the original scores and the recommendation.
+    """
+    baseline = experiment["baseline"]
+    lines = [
+        f"Original: Flesch-Kincaid {baseline['flesch_kincaid']}, Gunning Fog {baseline['gunning_fog']}",
+        "",
+        "| Variant | Model | Seconds | Requests | Prompt tokens | Output tokens | Cost (USD) | FK | ΔFK | Fog | ΔFog |",
+        "|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in experiment["variants"]:
+        if "delta" not in row:
+            error = re.sub(r'[|\s]+', ' ', row.get("error", ""))
+            lines.append(f"| {row['name']} | {row['model']} | error: {error} |" + " |" * 8)
+            continue
+        cost = "n/a" if row["cost_usd"] is None else f"{row['cost_usd']:.6f}"
+        lines.append(
+            f"| {row['name']} | {row['model']} | {row['seconds']:.2f} | {row['requests']} | {row['prompt_tokens']} "
+            f"| {row['output_tokens']} | {cost} | {row['readability']['flesch_kincaid']} "
+            f"| {row['delta']['flesch_kincaid']:+.2f} | {row['readability']['gunning_fog']} "
+            f"| {row['delta']['gunning_fog']:+.2f} |")
+    recommended = experiment.get("recommended")
+    lines += ["", f"Recommended: {recommended}" if recommended else "Recommended: none (no variant lowered the grade)"]
+    return "\n".join(lines)
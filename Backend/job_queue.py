@@ -0,0 +1,250 @@
+import sqlite3
+import json
+import queue
+import threading
+import time
+import uuid
+import logging
+import os
+from backend.events import EventLog, bind, unbind
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Job settings
+JOB_WORKERS = 2  # Worker threads processing jobs
+MAX_FINISHED_JOBS = 500  # Finished jobs kept in memory for result retrieval
+MAX_FINISHED_EVENT_LOGS = 50  # Finished jobs whose progress events stay available for streaming
+HEARTBEAT_INTERVAL = 10.0  # Seconds between heartbeats on the unfinished jobs a process owns (persistent mode)
+STALE_AFTER = 60.0  # Seconds without a heartbeat after which another process may take over a job
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class JobQueue:
+    """In-process job queue with a worker pool and optional SQLite persistence.
+
+    Jobs are keyed by a generated ID. Submitting a URL that already has a
+    queued or running job returns the existing job's ID, so concurrent
+    requests for one page share a single run. With db_path set, job state
+    is written to SQLite, where each unfinished job is owned by the queue
+    that runs it and kept alive by its heartbeat. Unfinished jobs whose
+    owner stopped heartbeating (a crashed or restarted process) are claimed
+    and re-queued on start-up and then periodically, so several processes
+    can share one database without running each other's jobs.
+
+    Every job has an EventLog that is bound while its handler runs, so the
+    pipeline can publish progress events with backend.events.publish. The
+    queue adds a 'status' event when the job starts and a 'done' event when
+    it finishes.
+
+    Args:
+        handler (callable): Function called with a job's URL; its return value becomes the job result.
+        workers (int): Number of worker threads.
+        db_path (str): SQLite file for persistent mode, or None for memory only.
+    """
+
+    def __init__(self, handler, workers=JOB_WORKERS, db_path=None):
+        self.handler = handler
+        self.db_path = db_path
+        self._jobs = {}
+        self._inflight = {}
+        self._finished = []
+        self._events = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._conn = None
+        self.owner = uuid.uuid4().hex
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, url TEXT NOT NULL, status TEXT NOT NULL, "
+                "result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL, "
+                "owner TEXT, heartbeat REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                # Databases from before job ownership; their unfinished jobs have no owner and are claimed below
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+            self._conn.commit()
+            self._restore()
+            threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True).start()
+
+    def submit(self, url):
+        """Queue a URL for processing, reusing an identical in-flight job.
+
+        Args:
+            url (str): Webpage URL to process.
+
+        Returns:
+            str: ID of the new or existing job.
+        """
+        with self._lock:
+            job_id = self._inflight.get(url)
+            if job_id:
+                logger.info(f"Reusing in-flight job {job_id} for URL: {url}")
+                return job_id
+            now = time.time()
+            job_id = uuid.uuid4().hex
+            job = {"id": job_id, "url": url, "status": QUEUED, "result": None,
+                   "error": None, "created": now, "updated": now}
+            self._jobs[job_id] = job
+            self._inflight[url] = job_id
+            self._events[job_id] = EventLog()
+            self._persist(job)
+        logger.info(f"Queued job {job_id} for URL: {url}")
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of a job.
+
+        Args:
+            job_id (str): Job ID from submit.
+
+        Returns:
+            dict: Job fields (id, url, status, result, error, created, updated), or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        if self._conn is not None:
+            return self._load(job_id)
+        return None
+
+    def events(self, job_id):
+        """Return a job's progress event log.
+
+        Args:
+            job_id (str): Job ID from submit.
+
+        Returns:
+            EventLog: The job's events, or None if unknown or no longer kept.
+        """
+        with self._lock:
+            return self._events.get(job_id)
+
+    def _work(self):
+        """Worker loop: take job IDs off the queue and run the handler."""
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job["status"] = RUNNING
+                job["updated"] = time.time()
+                self._persist(job)
+                log = self._events.setdefault(job_id, EventLog())
+            logger.info(f"Running job {job_id}")
+            log.publish("status", {"status": RUNNING, "url": job["url"]})
+            token = bind(log)
+            try:
+                result, error, status = self.handler(job["url"]), None, DONE
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                result, error, status = None, str(e), FAILED
+            finally:
+                unbind(token)
+            with self._lock:
+                job.update(status=status, result=result, error=error, updated=time.time())
+                self._persist(job)
+                if self._inflight.get(job["url"]) == job_id:
+                    del self._inflight[job["url"]]
+                self._finished.append(job_id)
+                while len(self._finished) > MAX_FINISHED_JOBS:
+                    self._jobs.pop(self._finished.pop(0), None)
+                if len(self._finished) > MAX_FINISHED_EVENT_LOGS:
+                    self._events.pop(self._finished[-MAX_FINISHED_EVENT_LOGS - 1], None)
+            log.publish("done", {"status": status, "error": error})
+            log.close()
+            logger.info(f"Job {job_id} {status}")
+
+    def _persist(self, job):
+        """Write a job this queue owns to SQLite in persistent mode. Caller holds the lock."""
+        if self._conn is None:
+            return
+        values = (job["url"], job["status"], json.dumps(job["result"]), job["error"],
+                  job["created"], job["updated"], time.time(), job["id"], self.owner)
+        updated = self._conn.execute(
+            "UPDATE jobs SET url = ?, status = ?, result = ?, error = ?, created = ?, updated = ?, heartbeat = ? "
+            "WHERE id = ? AND owner = ?", values
+        ).rowcount
+        if not updated:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (url, status, result, error, created, updated, heartbeat, id, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", values
+            ).rowcount
+            if not inserted:
+                logger.warning(f"Job {job['id']} was taken over by another process; not saving its state")
+        self._conn.commit()
+
+    def _heartbeat(self):
+        """Heartbeat loop: keep this queue's unfinished jobs alive and take over stale ones."""
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN (?, ?)",
+                        (time.time(), self.owner, QUEUED, RUNNING)
+                    )
+                    self._conn.commit()
+                self._restore()
+            except sqlite3.Error as e:
+                logger.error(f"Job heartbeat failed: {str(e)}")
+
+    def _load(self, job_id):
+        """Read a finished job back from SQLite."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, url, status, result, error, created, updated FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "url": row[1], "status": row[2], "result": json.loads(row[3]) if row[3] else None,
+                "error": row[4], "created": row[5], "updated": row[6]}
+
+    def _restore(self):
+        """Claim and re-queue unfinished jobs whose owner stopped heartbeating.
+
+        Each job is claimed with a conditional UPDATE, so when several
+        processes look at once only one of them takes it over.
+        """
+        stale = (QUEUED, RUNNING, time.time() - STALE_AFTER)
+        restored = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, url, created FROM jobs WHERE status IN (?, ?) "
+                "AND (owner IS NULL OR heartbeat IS NULL OR heartbeat < ?) ORDER BY created", stale
+            ).fetchall()
+            for job_id, url, created in rows:
+                if url in self._inflight:
+                    continue
+                now = time.time()
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET owner = ?, heartbeat = ?, status = ?, updated = ? WHERE id = ? "
+                    "AND status IN (?, ?) AND (owner IS NULL OR heartbeat IS NULL OR heartbeat < ?)",
+                    (self.owner, now, QUEUED, now, job_id) + stale
+                ).rowcount
+                self._conn.commit()
+                if not claimed:
+                    continue  # Another process took it first
+                self._jobs[job_id] = {"id": job_id, "url": url, "status": QUEUED, "result": None,
+                                      "error": None, "created": created, "updated": now}
+                self._inflight[url] = job_id
+                self._events[job_id] = EventLog()
+                self._queue.put(job_id)
+                restored += 1
+        if restored:
+            logger.info(f"Restored {restored} unfinished jobs from {self.db_path}")
@@ -0,0 +1,238 @@
+import sqlite3
+import hashlib
+import json
+import threading
+import time
+import logging
+import os
+from backend.shared_state import get_shared_state
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cache location and limits
+CACHE_PATH = os.path.join("Output", "cache", "gemini_cache.sqlite3")
+CACHE_TTL = 7 * 24 * 3600  # Seconds before an entry expires
+CACHE_MAX_ENTRIES = 50000  # Least recently used entries are evicted beyond this
+
+# Set GEMINI_CACHE_ONLY=1 to serve from a warmed cache without calling the API
+CACHE_ONLY = os.environ.get("GEMINI_CACHE_ONLY") == "1"
+
+class ResponseCache:
+    """Persistent, content-addressed cache of Gemini responses backed by SQLite.
+
+    Entries are keyed by a hash of model, prompt, input text and generation
+    config. Expired entries are dropped on read, and the least recently used
+    entries are evicted once the cache grows past max_entries.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Batch workers in several processes share the file: wait for locks, and let readers run during writes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, prompt, text, generation_config):
+        """Build the cache key for a Gemini request.
+
+        Args:
+            model (str): Gemini model name.
+            prompt (str): Prompt sent to the model.
+            text (str): Input text as sent (after any truncation).
+            generation_config (dict): Generation settings of the request.
+
+        Returns:
+            str: Hex SHA-256 digest identifying the request.
+        """
+        material = json.dumps([model, prompt, text, generation_config], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            str: Cached response text, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def peek(self, key):
+        """Look up a cached response without counting it or touching its entry, e.g. while polling.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            str: Cached response text, or None on a miss or expired entry.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store a response and evict least recently used entries over the cap.
+
+        Args:
+            key (str): Cache key from make_key.
+            value (str): Response text to cache.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the current entry count.
+
+        Returns:
+            dict: Cache statistics.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self):
+        """Remove every cached response and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+class SharedResponseCache:
+    """Gemini response cache kept in a Redis shared state, for workers on several hosts.
+
+    Works like ResponseCache; entries expire after ttl, and least recently
+    used entries are left to the store's own eviction policy.
+
+    Args:
+        state (RedisState): Shared state holding the entries.
+        ttl (float): Seconds before an entry expires.
+    """
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    def __init__(self, state, ttl=CACHE_TTL):
+        self.state = state
+        self.path = state.url
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            str: Cached response text, or None on a miss or expired entry.
+        """
+        value = self.state.get(f"llm:{key}")
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(value)
+
+    def peek(self, key):
+        """Look up a cached response without counting it, e.g. while polling.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            str: Cached response text, or None on a miss or expired entry.
+        """
+        value = self.state.get(f"llm:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        """Store a response.
+
+        Args:
+            key (str): Cache key from make_key.
+            value (str): Response text to cache.
+        """
+        self.state.set(f"llm:{key}", json.dumps(value), self.ttl)
+
+    def stats(self):
+        """Return hit/miss counters (the entry count is not tracked in a shared store).
+
+        Returns:
+            dict: Cache statistics.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": None}
+
+    def clear(self):
+        """Remove every cached response and reset the counters."""
+        self.state.clear("llm:")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide response cache, opening it on first use.
+
+    With a Redis shared state (SHARED_STATE_URL) the cache lives there, so
+    workers on every host share it; otherwise it is the SQLite file at
+    CACHE_PATH, which the processes of one host share.
+
+    Returns:
+        ResponseCache or SharedResponseCache: Shared cache instance.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            state = get_shared_state()
+            _cache = SharedResponseCache(state) if state.kind == "redis" else ResponseCache()
+            logger.info(f"Opened Gemini response cache at {_cache.path}")
+        return _cache
@@ -0,0 +1,260 @@
+import contextlib
+import random
+import threading
+import time
+import logging
+import os
+from backend.llm_cache import get_cache, CACHE_ONLY
+from backend.metrics import span, LLM_REQUESTS, LLM_TOKENS, LLM_CACHE
+from backend.resources import lazy_import
+from backend.shared_state import SharedTokenBucket, single_flight
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+requests = lazy_import("requests")
+
+# Google Gemini API key (replace with your own, or set GEMINI_API_KEY)
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", " ")  # Obtain from https://aistudio.google.com/app/apikey
+
+# Point at a local stub server for testing, e.g. http://127.0.0.1:8081/v1beta
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+
+# Model used when a call does not name one
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+
+# Client limits
+MAX_CONCURRENCY = 8  # Simultaneous in-flight requests per process
+RATE_LIMIT_PER_SECOND = 5.0  # Sustained request rate per model, shared by every worker using the same shared state
+RATE_LIMIT_BURST = 10  # Requests allowed in a burst
+REQUEST_TIMEOUT = 30.0  # Deadline in seconds for one call, including retries
+MAX_RETRIES = 3  # Retries after the first attempt
+BACKOFF_BASE = 0.5  # Seconds; doubled on every retry
+BACKOFF_MAX = 8.0  # Upper bound for a single backoff sleep
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    """Raised when a Gemini request fails after all retries."""
+
+class GeminiClient:
+    """Shared Gemini client with connection pooling, rate limiting and retries.
+
+    All requests go through one pooled requests.Session. In-flight calls are
+    bounded by a semaphore, paced by a per-model token bucket in the shared
+    state (so every worker process and host draws on the same quota), and
+    retried with jittered exponential backoff on 429/5xx responses and
+    connection errors until the per-call deadline runs out. Successful
+    responses are stored in the shared response cache; while one worker
+    sends a request, workers needing the same response wait for it instead
+    of sending it again. Calls, cache hits, tokens and request time are
+    tallied per client (see usage).
+
+    Args:
+        api_key (str): Gemini API key (default: GEMINI_API_KEY).
+        base_url (str): API base URL (default: GEMINI_BASE_URL).
+        max_concurrency (int): Simultaneous in-flight requests.
+        rate (float): Sustained requests per second per model.
+        burst (int): Requests allowed in a burst.
+        timeout (float): Deadline in seconds for one call, including retries.
+        max_retries (int): Retries after the first attempt.
+        cache: Response cache (default: the shared cache from get_cache).
+        share_requests (bool): Wait for identical requests other workers are
+            sending. Turn it off with a private cache, whose results the
+            other workers cannot see.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_concurrency=MAX_CONCURRENCY,
+                 rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES, cache=None, share_requests=True):
+        self.api_key = api_key if api_key is not None else GEMINI_API_KEY
+        self.base_url = (base_url or GEMINI_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        self.share_requests = share_requests
+        self.rate = rate
+        self.burst = burst
+        self._limiters = {}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self._usage = dict.fromkeys(("requests", "cached", "errors", "prompt_tokens", "output_tokens"), 0)
+        self._usage["request_seconds"] = 0.0
+        self._usage_lock = threading.Lock()
+
+    def usage(self):
+        """Return what this client has used so far.
+
+        Returns:
+            dict: 'requests' (answered API calls), 'cached' (calls served from
+                the cache), 'errors' (failed calls), 'prompt_tokens',
+                'output_tokens' and 'request_seconds' (time spent in API calls).
+        """
+        with self._usage_lock:
+            return dict(self._usage)
+
+    def limiter(self, model):
+        """Return the shared token bucket pacing requests to a model."""
+        with self._usage_lock:
+            if model not in self._limiters:
+                self._limiters[model] = SharedTokenBucket(f"gemini:{model}", self.rate, self.burst)
+            return self._limiters[model]
+
+    def _add_usage(self, **amounts):
+        with self._usage_lock:
+            for name, amount in amounts.items():
+                self._usage[name] += amount
+
+    def generate(self, prompt, text, model=None, generation_config=None, timeout=None):
+        """Send a prompt and input text to Gemini and return the generated text.
+
+        Args:
+            prompt (str): Instruction for the model.
+            text (str): Input text, sent after the prompt.
+            model (str): Gemini model to use (default: GEMINI_MODEL).
+            generation_config (dict): Generation settings, e.g. maxOutputTokens.
+            timeout (float): Deadline in seconds for the whole call (default: client timeout).
+
+        Returns:
+            str: Generated text, or None if the response carried no text.
+
+        Raises:
+            LLMError: If the call fails, times out, or is not cached in cache-only mode.
+        """
+        model = model or GEMINI_MODEL
+        generation_config = generation_config or {}
+        cache = self.cache or get_cache()
+        cache_key = cache.make_key(model, prompt, text, generation_config)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached Gemini response")
+            LLM_CACHE.inc(result="hit")
+            self._add_usage(cached=1)
+            return cached
+        LLM_CACHE.inc(result="miss")
+        if CACHE_ONLY:
+            raise LLMError("Gemini response not cached (cache-only mode).")
+
+        flight = single_flight(f"llm:{cache_key}", lambda: cache.peek(cache_key)) if self.share_requests \
+            else contextlib.nullcontext()
+        with flight as cached:
+            if cached is not None:
+                logger.info("Using Gemini response another worker requested")
+                self._add_usage(cached=1)
+                return cached
+            payload = {
+                "contents": [{"parts": [{"text": prompt + "\n\n" + text}]}],
+                "generationConfig": generation_config
+            }
+            start = time.perf_counter()
+            try:
+                with span("llm.request"):
+                    result = self._post(f"{self.base_url}/models/{model}:generateContent", payload,
+                                        timeout or self.timeout, self.limiter(model))
+            except LLMError:
+                self._add_usage(errors=1, request_seconds=time.perf_counter() - start)
+                raise
+            generated_text = response_text(result)
+            prompt_tokens, output_tokens = count_tokens(result, prompt + text, generated_text)
+            self._add_usage(requests=1, prompt_tokens=prompt_tokens, output_tokens=output_tokens,
+                            request_seconds=time.perf_counter() - start)
+            if generated_text is not None:
+                cache.set(cache_key, generated_text)
+            return generated_text
+
+    def _post(self, url, payload, timeout, limiter):
+        """POST a JSON payload with rate limiting, retries and an overall deadline."""
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not limiter.acquire(timeout=remaining):
+                raise LLMError(f"Gemini request exceeded its {timeout:.0f}s deadline")
+            retry_after = None
+            try:
+                with self._slots:
+                    remaining = max(0.1, deadline - time.monotonic())
+                    response = self.session.post(url, params={"key": self.api_key}, json=payload, timeout=remaining)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    result = response.json()
+                    LLM_REQUESTS.inc(outcome="ok")
+                    return result
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            except requests.RequestException as e:
+                LLM_REQUESTS.inc(outcome="error")
+                raise LLMError(f"Gemini API error: {str(e)}") from e
+            except ValueError as e:
+                LLM_REQUESTS.inc(outcome="error")
+                raise LLMError(f"Invalid Gemini response: {str(e)}") from e
+
+            if attempt >= self.max_retries:
+                LLM_REQUESTS.inc(outcome="error")
+                raise LLMError(f"Gemini API error after {attempt + 1} attempts: {error}")
+            delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            if time.monotonic() + delay >= deadline:
+                LLM_REQUESTS.inc(outcome="error")
+                raise LLMError(f"Gemini request exceeded its {timeout:.0f}s deadline ({error})")
+            LLM_REQUESTS.inc(outcome="retry")
+            attempt += 1
+            logger.warning(f"Gemini request failed ({error}); retry {attempt} in {delay:.2f}s")
+            time.sleep(delay)
+
+def response_text(result):
+    """Return the text of the first candidate in a Gemini response.
+
+    Args:
+        result (dict): Parsed Gemini response.
+
+    Returns:
+        str: Generated text, or None if the response has no candidates
+            (e.g. a blocked prompt) or the candidate has no text part.
+    """
+    candidates = result.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or [{}]
+    return parts[0].get("text")
+
+def count_tokens(result, prompt_text, generated_text):
+    """Add a call's token usage to the LLM_TOKENS counter.
+
+    Uses the usageMetadata reported by Gemini, or estimates about four
+    characters per token when the response has none (e.g. a stub server).
+
+    Args:
+        result (dict): Parsed Gemini response.
+        prompt_text (str): Prompt and input text that were sent.
+        generated_text (str): Text of the first candidate, or None.
+
+    Returns:
+        tuple: (prompt_tokens, output_tokens) counted.
+    """
+    usage = result.get("usageMetadata") or {}
+    prompt_tokens = usage.get("promptTokenCount", len(prompt_text) // 4)
+    output_tokens = usage.get("candidatesTokenCount", len(generated_text or "") // 4)
+    LLM_TOKENS.inc(prompt_tokens, direction="prompt")
+    LLM_TOKENS.inc(output_tokens, direction="output")
+    return prompt_tokens, output_tokens
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide Gemini client, creating it on first use.
+
+    Returns:
+        GeminiClient: Shared client instance.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
@@ -0,0 +1,249 @@
+import bisect
+import contextvars
+import threading
+import time
+import logging
+import os
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Instrumentation settings
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"  # Set METRICS_ENABLED=0 to make spans and counters no-ops
+METRIC_PREFIX = "docagent_"  # Prefix of every exported metric name
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # Histogram bounds in seconds
+MAX_TRACE_SPANS = 2000  # Spans recorded in one request trace
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format.
+
+    Args:
+        name (str): Metric name without prefix.
+        help_text (str): One-line description.
+        labels (tuple): Label names.
+    """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = METRIC_PREFIX + name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add to the counter.
+
+        Args:
+            amount (float): Increment.
+            **labels: Label values.
+        """
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        """Return the metric in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{format_labels(self.labels, key)} {value}")
+        return lines
+
+class Histogram:
+    """Histogram of observed values (e.g. latencies) with optional labels.
+
+    Args:
+        name (str): Metric name without prefix.
+        help_text (str): One-line description.
+        labels (tuple): Label names.
+        buckets (tuple): Upper bounds of the buckets, ascending.
+    """
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = METRIC_PREFIX + name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation.
+
+        Args:
+            value (float): Observed value.
+            **labels: Label values.
+        """
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        """Return the metric in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(((key, dict(series, counts=list(series["counts"]))) for key, series in self._series.items()),
+                           key=lambda item: item[0])
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels(self.labels + ('le',), key + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {round(series['sum'], 6)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {series['count']}")
+        return lines
+
+def format_labels(names, values):
+    """Format label pairs as {name="value",...}, escaping quotes and backslashes."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def counter(name, help_text, labels=()):
+    """Return the registered counter with this name, creating it if needed."""
+    with _registry_lock:
+        return _registry.setdefault(name, Counter(name, help_text, labels))
+
+def histogram(name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+    """Return the registered histogram with this name, creating it if needed."""
+    with _registry_lock:
+        return _registry.setdefault(name, Histogram(name, help_text, labels, buckets))
+
+def render_metrics():
+    """Render every registered metric for a /metrics endpoint.
+
+    Returns:
+        str: Prometheus text exposition format.
+    """
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Pipeline metrics
+STAGE_SECONDS = histogram("stage_seconds", "Time spent in each pipeline stage.", ("stage",))
+LLM_REQUESTS = counter("llm_requests_total", "Gemini HTTP attempts by outcome (ok, retry, error).", ("outcome",))
+LLM_TOKENS = counter("llm_tokens_total", "Gemini tokens by direction (prompt, output).", ("direction",))
+LLM_CACHE = counter("llm_cache_lookups_total", "Gemini response cache lookups by result (hit, miss).", ("result",))
+FETCH_REQUESTS = counter("fetch_requests_total", "Page fetches by HTTP status (or 'error').", ("status",))
+FETCH_BYTES = counter("fetch_bytes_total", "Bytes of page content downloaded.")
+SIMPLIFY_SENTENCES = counter("simplify_sentences_total", "Simplified sentences by source (llm, memo_exact, memo_near, duplicate).", ("source",))
+
+_trace = contextvars.ContextVar("trace", default=None)
+
+class Span:
+    """Times a pipeline stage: observed in STAGE_SECONDS and added to the active trace."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        trace = _trace.get()
+        if trace is not None and len(trace["spans"]) < MAX_TRACE_SPANS:
+            entry = {"stage": self.stage, "start": round(self.start - trace["origin"], 6), "seconds": round(elapsed, 6)}
+            if exc_type is not None:
+                entry["error"] = exc_type.__name__
+            trace["spans"].append(entry)
+        return False
+
+class _NoopSpan:
+    """Shared do-nothing span used when instrumentation is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(stage):
+    """Time a stage with a `with` block.
+
+    Returns a shared no-op object when metrics are disabled and no trace
+    is active, so disabled instrumentation costs one function call.
+
+    Args:
+        stage (str): Stage name, e.g. 'fetch' or 'analysis.readability'.
+
+    Returns:
+        Span: Context manager.
+    """
+    if not METRICS_ENABLED and _trace.get() is None:
+        return _NOOP_SPAN
+    return Span(stage)
+
+def start_trace():
+    """Start collecting spans of the current request.
+
+    Returns:
+        contextvars.Token: Token for end_trace.
+    """
+    return _trace.set({"origin": time.perf_counter(), "spans": []})
+
+def current_trace():
+    """Return the spans recorded so far in the active trace (a copy), or None."""
+    trace = _trace.get()
+    return list(trace["spans"]) if trace is not None else None
+
+def end_trace(token):
+    """Stop the trace started with start_trace.
+
+    Args:
+        token (contextvars.Token): Token from start_trace.
+
+    Returns:
+        list: Recorded spans in completion order, each with 'stage', 'start'
+            (seconds since the trace began) and 'seconds'.
+    """
+    trace = _trace.get()
+    _trace.reset(token)
+    return trace["spans"] if trace is not None else []
+
+def in_context(func):
+    """Wrap a function so pool threads run it in a copy of the caller's context.
+
+    Worker threads do not inherit context variables, so without this the
+    active trace and progress event log would not see work done in
+    ThreadPoolExecutor tasks.
+
+    Args:
+        func (callable): Function to run on another thread.
+
+    Returns:
+        callable: Wrapper to pass to submit() or map().
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
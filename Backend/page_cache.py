@@ -0,0 +1,177 @@
+import sqlite3
+import hashlib
+import json
+import threading
+import time
+import zlib
+import logging
+import os
+from backend.llm_cache import ResponseCache
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Incremental re-analysis storage
+PAGE_CACHE_PATH = os.path.join("Output", "cache", "pages.sqlite3")
+SECTION_CACHE_PATH = os.path.join("Output", "cache", "sections.sqlite3")
+SECTION_CACHE_TTL = 30 * 24 * 3600  # Seconds a per-section result is reused
+SECTION_CACHE_MAX_ENTRIES = 200000  # Least recently used section results are evicted beyond this
+
+class PageCache:
+    """Last fetched version of each page, for conditional GETs, backed by SQLite.
+
+    For every URL the cache keeps the ETag and Last-Modified validators, the
+    HTML (zlib-compressed) to rebuild the page from on a 304 response, and
+    the section hashes of that version, so the next run can tell which
+    sections changed.
+
+    Args:
+        path (str): SQLite database path.
+    """
+
+    def __init__(self, path=PAGE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, html BLOB NOT NULL, "
+            "sections TEXT NOT NULL, fetched REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url):
+        """Look up the stored version of a page.
+
+        Args:
+            url (str): Page URL.
+
+        Returns:
+            dict: 'etag', 'last_modified', 'html', 'sections' (list of hashes)
+                and 'fetched' (timestamp), or None if the page was never stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, html, sections, fetched FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "html": zlib.decompress(row[2]).decode("utf-8"),
+            "sections": json.loads(row[3]),
+            "fetched": row[4]
+        }
+
+    def set(self, url, html, etag=None, last_modified=None, sections=None):
+        """Store the current version of a page.
+
+        Args:
+            url (str): Page URL.
+            html (str): Raw HTML.
+            etag (str): ETag response header, if any.
+            last_modified (str): Last-Modified response header, if any.
+            sections (list): Section hashes of this version.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, html, sections, fetched) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, zlib.compress(html.encode("utf-8")), json.dumps(sections or []), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url):
+        """Record that a stored page was revalidated (304 Not Modified).
+
+        Args:
+            url (str): Page URL.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+def hash_text(text):
+    """Hash normalized text so whitespace-only edits do not count as changes.
+
+    Args:
+        text (str): Text to hash.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    return hashlib.sha256(' '.join((text or "").split()).encode("utf-8")).hexdigest()
+
+def split_sections(blocks):
+    """Group text blocks into sections that each start at a heading.
+
+    Text before the first heading forms its own section.
+
+    Args:
+        blocks (list): Blocks from DocumentContext.blocks.
+
+    Returns:
+        list: Sections in document order, each a dict with 'heading' (str or
+            None), 'text' (heading and body joined) and 'hash' of the text.
+    """
+    sections = []
+    current = None
+    for block in blocks:
+        if block["type"] == "heading" or current is None:
+            current = {"heading": block["text"] if block["type"] == "heading" else None, "parts": []}
+            sections.append(current)
+        current["parts"].append(block["text"])
+    result = []
+    for section in sections:
+        text = ' '.join(section["parts"])
+        result.append({"heading": section["heading"], "text": text, "hash": hash_text(text)})
+    return result
+
+def result_key(kind, content_hash, *params):
+    """Build the cache key of a result computed from some content.
+
+    Args:
+        kind (str): Result type, e.g. 'vote', 'revision' or 'report'.
+        content_hash (str): Hash of the content the result depends on.
+        *params: Anything else the result depends on (prompts, suggestions).
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    material = json.dumps([kind, content_hash, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+_page_cache = None
+_section_cache = None
+_caches_lock = threading.Lock()
+
+def get_page_cache():
+    """Return the process-wide page cache, opening it on first use.
+
+    Returns:
+        PageCache: Shared page cache.
+    """
+    global _page_cache
+    with _caches_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+            logger.info(f"Opened page cache at {_page_cache.path}")
+        return _page_cache
+
+def get_section_cache():
+    """Return the process-wide cache of per-section and per-document results.
+
+    Returns:
+        ResponseCache: Shared result cache (TTL and LRU eviction as for Gemini responses).
+    """
+    global _section_cache
+    with _caches_lock:
+        if _section_cache is None:
+            _section_cache = ResponseCache(SECTION_CACHE_PATH, SECTION_CACHE_TTL, SECTION_CACHE_MAX_ENTRIES)
+            logger.info(f"Opened section result cache at {_section_cache.path}")
+        return _section_cache
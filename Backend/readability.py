@@ -0,0 +1,126 @@
+import logging
+from backend.resources import lazy_import
+from backend.segmentation import SegmentedText, COMPLEX_WORD_SYLLABLES
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+
+POLYSYLLABLE_SYLLABLES = 3  # SMOG counts words with at least this many syllables
+SMOG_MIN_SENTENCES = 3  # SMOG is undefined for shorter texts and reported as 0
+
+def sentence_counts(segments):
+    """Collect per-sentence word, syllable, complex-word and letter counts as arrays.
+
+    Args:
+        segments (SegmentedText): Segmented text.
+
+    Returns:
+        dict: NumPy int arrays 'words', 'syllables', 'complex', 'polysyllables'
+            and 'letters', one entry per sentence.
+    """
+    bounds = np.frombuffer(segments.sentence_words, dtype=np.int32)
+    syllables = np.frombuffer(segments.word_syllables, dtype=np.int32)
+    letters = np.frombuffer(segments.word_letters, dtype=np.int32)
+    words = np.diff(bounds)
+    if not len(words):
+        empty = np.zeros(0, dtype=np.int64)
+        return {"words": empty, "syllables": empty, "complex": empty, "polysyllables": empty, "letters": empty}
+
+    # Per-sentence sums as differences of a prefix sum; sentences without words get 0
+    def per_sentence(values):
+        totals = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+        return totals[bounds[1:]] - totals[bounds[:-1]]
+
+    return {
+        "words": words.astype(np.int64),
+        "syllables": per_sentence(syllables),
+        "complex": per_sentence(syllables >= COMPLEX_WORD_SYLLABLES),
+        "polysyllables": per_sentence(syllables >= POLYSYLLABLE_SYLLABLES),
+        "letters": per_sentence(letters)
+    }
+
+def scores_from_totals(words, sentences, syllables, complex_words, polysyllables, letters):
+    """Apply the readability formulas to totals; works on scalars or NumPy arrays.
+
+    Args:
+        words, sentences, syllables, complex_words, polysyllables, letters: Counts.
+
+    Returns:
+        dict: 'flesch_kincaid', 'gunning_fog', 'smog' and 'coleman_liau' scores.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        words_per_sentence = np.divide(words, np.maximum(sentences, 1))
+        syllables_per_word = np.where(words > 0, np.divide(syllables, np.maximum(words, 1)), 0)
+        complex_share = np.where(words > 0, np.divide(complex_words, np.maximum(words, 1)), 0)
+        flesch = np.where(words > 0, 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 0)
+        fog = np.where(words > 0, 0.4 * (words_per_sentence + 100 * complex_share), 0)
+        smog = np.where(sentences >= SMOG_MIN_SENTENCES,
+                        1.043 * np.sqrt(30 * np.divide(polysyllables, np.maximum(sentences, 1))) + 3.1291, 0)
+        letters_per_100 = np.where(words > 0, 100 * np.divide(letters, np.maximum(words, 1)), 0)
+        sentences_per_100 = np.where(words > 0, 100 * np.divide(sentences, np.maximum(words, 1)), 0)
+        coleman = np.where(words > 0, 0.0588 * letters_per_100 - 0.296 * sentences_per_100 - 15.8, 0)
+    return {"flesch_kincaid": flesch, "gunning_fog": fog, "smog": smog, "coleman_liau": coleman}
+
+def readability_metrics(segments, per_sentence=False):
+    """Compute Flesch-Kincaid, Gunning Fog, SMOG and Coleman-Liau in one pass.
+
+    Args:
+        segments (SegmentedText or str): Segmented text (or raw text to segment).
+        per_sentence (bool): Also return the Flesch-Kincaid grade of every sentence.
+
+    Returns:
+        dict: Rounded document scores, plus 'sentence_grades' (list) if requested.
+    """
+    if isinstance(segments, str):
+        segments = SegmentedText(segments)
+    counts = sentence_counts(segments)
+    scored = counts["words"] > 0
+    totals = {name: int(values.sum()) for name, values in counts.items()}
+    scores = scores_from_totals(totals["words"], int(scored.sum()), totals["syllables"],
+                                totals["complex"], totals["polysyllables"], totals["letters"])
+    result = {name: round(float(value), 1 if name == "flesch_kincaid" else 2) for name, value in scores.items()}
+    if per_sentence:
+        grades = scores_from_totals(counts["words"], scored.astype(np.int64), counts["syllables"],
+                                    counts["complex"], counts["polysyllables"], counts["letters"])["flesch_kincaid"]
+        result["sentence_grades"] = np.round(grades, 1).tolist()
+    return result
+
+def readability_batch(documents):
+    """Compute readability scores for many documents with one vectorized pass.
+
+    Per-sentence counts of all documents are concatenated and reduced per
+    document with NumPy, so the formulas run once over arrays instead of
+    once per document.
+
+    Args:
+        documents (list): SegmentedText objects or raw texts.
+
+    Returns:
+        list: One dict of rounded scores per document, in input order.
+    """
+    if not documents:
+        return []
+    segmented = [d if isinstance(d, SegmentedText) else SegmentedText(d) for d in documents]
+    per_doc = [sentence_counts(s) for s in segmented]
+    lengths = np.array([len(c["words"]) for c in per_doc])
+    nonempty = lengths > 0
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+
+    def per_document(values):
+        totals = np.zeros(len(per_doc), dtype=np.int64)
+        if starts.size:
+            totals[nonempty] = np.add.reduceat(np.concatenate(values).astype(np.int64), starts)
+        return totals
+
+    words = per_document([c["words"] for c in per_doc])
+    sentences = per_document([c["words"] > 0 for c in per_doc])
+    scores = scores_from_totals(words, sentences, *(per_document([c[name] for c in per_doc])
+                                                    for name in ("syllables", "complex", "polysyllables", "letters")))
+    logger.debug(f"Scored readability for {len(documents)} documents")
+    return [
+        {name: round(float(values[i]), 1 if name == "flesch_kincaid" else 2) for name, values in scores.items()}
+        for i in range(len(documents))
+    ]
@@ -0,0 +1,140 @@
+import importlib
+import re
+import threading
+import logging
+import os
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Tokenizer data bundled with the project (searched before NLTK's default locations)
+BUNDLED_NLTK_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nltk_data")
+NLTK_AUTO_DOWNLOAD = os.environ.get("NLTK_AUTO_DOWNLOAD") == "1"  # Download punkt on first use if it is missing
+
+# Words that end with a period without ending the sentence (regex fallback only)
+ABBREVIATIONS = {'e.g', 'i.e', 'etc', 'vs', 'cf', 'approx', 'fig', 'no', 'mr', 'mrs', 'ms', 'dr', 'prof', 'inc', 'ltd', 'jr', 'sr', 'st'}
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s+["\'(\[]?[A-Z0-9])')
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access.
+
+    Heavy dependencies (requests, bs4, textstat, numpy) are bound to a
+    LazyModule at module level, so importing the backend stays cheap and a
+    worker pays for each dependency only when it first uses it.
+
+    Args:
+        name (str): Dotted module name.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """Return a proxy that imports a module when it is first used.
+
+    Args:
+        name (str): Dotted module name.
+
+    Returns:
+        LazyModule: Module proxy.
+    """
+    return LazyModule(name)
+
+def regex_sent_tokenize(text):
+    """Split text into sentences with a regex, for use when punkt data is unavailable.
+
+    A sentence ends at '.', '!' or '?' (plus closing quotes or brackets)
+    followed by whitespace and a capital letter or digit. Periods after
+    common abbreviations and single-letter initials do not end a sentence.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list: Sentences.
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        candidate = text[start:match.end()]
+        if match.group(0)[0] == '.':
+            last_word = candidate.split()[-1].lower().rstrip('.!?"\')]')
+            if last_word in ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+                continue
+        sentences.append(candidate.strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+    return [s for s in sentences if s]
+
+def load_sentence_tokenizer():
+    """Find the best available sentence tokenizer without touching the network.
+
+    NLTK's punkt tokenizer is used when its data is installed, either in the
+    project's nltk_data directory or in one of NLTK's standard locations
+    (including the NLTK_DATA environment variable). If it is missing, punkt
+    is downloaded only when NLTK_AUTO_DOWNLOAD=1; otherwise the regex
+    splitter is used.
+
+    Returns:
+        callable: Function mapping text to a list of sentences.
+    """
+    try:
+        nltk = importlib.import_module("nltk")
+    except ImportError:
+        logger.warning("nltk is not installed; using the regex sentence splitter")
+        return regex_sent_tokenize
+    if os.path.isdir(BUNDLED_NLTK_DATA) and BUNDLED_NLTK_DATA not in nltk.data.path:
+        nltk.data.path.insert(0, BUNDLED_NLTK_DATA)
+    for attempt in range(2):
+        try:
+            nltk.sent_tokenize("Probe sentence. Another one.")
+            logger.info("Loaded NLTK punkt sentence tokenizer")
+            return nltk.sent_tokenize
+        except LookupError:
+            if attempt or not NLTK_AUTO_DOWNLOAD:
+                break
+            logger.info("Downloading NLTK punkt data")
+            for package in ('punkt', 'punkt_tab'):
+                nltk.download(package, quiet=True)
+    logger.warning("NLTK punkt data not found; using the regex sentence splitter")
+    return regex_sent_tokenize
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+def get_sentence_tokenizer():
+    """Return the shared sentence tokenizer, loading it on first use."""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = load_sentence_tokenizer()
+    return _tokenizer
+
+def sent_tokenize(text):
+    """Split text into sentences with the shared tokenizer.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list: Sentences.
+    """
+    return get_sentence_tokenizer()(text)
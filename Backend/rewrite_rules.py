@@ -0,0 +1,138 @@
+import json
+import re
+import threading
+import logging
+import os
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# User-editable glossary of rewrite rules
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rewrite_rules.json")
+
+class RewriteEngine:
+    """Applies a set of phrase rewrite rules in a single pass over the text.
+
+    All phrases are compiled once into one case-insensitive regex whose
+    alternation is factored as a prefix trie, so matching cost does not grow
+    with every new rule. At each position the longest matching phrase wins
+    ("users can" before "users"); phrases of equal length keep file order.
+    Whitespace inside a phrase matches any run of whitespace, and a match
+    that starts with a capital letter keeps it in the replacement.
+
+    Args:
+        rules (dict): Phrase -> replacement, matched on word boundaries.
+    """
+
+    def __init__(self, rules):
+        self.rules = {normalize_phrase(phrase): replacement for phrase, replacement in rules.items() if phrase.strip()}
+        self.pattern = compile_phrases(self.rules) if self.rules else None
+
+    def apply(self, text):
+        """Rewrite every matching phrase in the text.
+
+        Args:
+            text (str): Input text.
+
+        Returns:
+            str: Text with all rules applied.
+        """
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(self._replace, text)
+
+    def _replace(self, match):
+        matched = match.group(0)
+        replacement = self.rules[normalize_phrase(matched)]
+        if matched[0].isupper() and replacement:
+            return replacement[0].upper() + replacement[1:]
+        return replacement
+
+def normalize_phrase(phrase):
+    """Lower-case a phrase and collapse its whitespace for rule lookup.
+
+    Args:
+        phrase (str): Phrase as written in the rules or matched in text.
+
+    Returns:
+        str: Normalized phrase.
+    """
+    return ' '.join(phrase.lower().split())
+
+def compile_phrases(phrases):
+    """Compile phrases into one word-bounded regex built from a prefix trie.
+
+    Args:
+        phrases (iterable): Normalized phrases.
+
+    Returns:
+        re.Pattern: Case-insensitive pattern matching the longest phrase at each position.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(r'\b(?:' + trie_to_regex(trie) + r')\b', re.IGNORECASE)
+
+def trie_to_regex(node):
+    """Render a trie node as a regex; longer continuations are tried before ending here."""
+    ends_here = '' in node
+    branches = []
+    for char in sorted(key for key in node if key):
+        token = r'\s+' if char == ' ' else re.escape(char)
+        branches.append(token + trie_to_regex(node[char]))
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if ends_here:
+        # Greedy optional: prefer the longer phrase, fall back to the shorter one
+        return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+    return body
+
+def load_rules(path=RULES_PATH):
+    """Read rule sets from the JSON glossary.
+
+    Args:
+        path (str): Path to the rules file.
+
+    Returns:
+        dict: Rule set name -> {phrase: replacement}.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+_engines = {}
+_engines_mtime = None
+_engines_lock = threading.Lock()
+
+def get_engine(rule_set, path=RULES_PATH):
+    """Return the compiled engine for a rule set, recompiling if the rules file changed.
+
+    Args:
+        rule_set (str): Rule set name, e.g. 'jargon' or 'pronouns'.
+        path (str): Path to the rules file.
+
+    Returns:
+        RewriteEngine: Compiled engine (empty if the rule set is missing).
+    """
+    global _engines_mtime
+    with _engines_lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if mtime != _engines_mtime:
+            try:
+                rule_sets = load_rules(path)
+            except Exception as e:
+                logger.error(f"Error loading rewrite rules from {path}: {str(e)}")
+                rule_sets = {}
+            _engines.clear()
+            for name, rules in rule_sets.items():
+                _engines[name] = RewriteEngine(rules)
+            _engines_mtime = mtime
+            logger.info(f"Compiled {sum(len(e.rules) for e in _engines.values())} rewrite rules from {path}")
+        return _engines.get(rule_set) or RewriteEngine({})
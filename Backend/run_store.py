@@ -0,0 +1,192 @@
+import json
+import contextlib
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import logging
+import os
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Run storage location and retention
+RUNS_DIR = os.path.join("Output", "runs")
+MAX_RUNS = 200  # Oldest runs beyond this count are deleted
+MAX_RUN_AGE = 7 * 24 * 3600  # Runs older than this many seconds are deleted
+
+@contextlib.contextmanager
+def atomic_writer(path):
+    """Open a temporary file that is renamed into place when the block succeeds.
+
+    Text can be written in pieces as it is produced; readers see either the
+    previous file or the complete new one. If the block raises, the
+    temporary file is removed.
+
+    Args:
+        path (str): Destination file path.
+
+    Yields:
+        file: Text file to write to.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_write(path, data):
+    """Write a file atomically by renaming a temporary file into place.
+
+    Args:
+        path (str): Destination file path.
+        data (str): Text to write.
+    """
+    with atomic_writer(path) as f:
+        f.write(data)
+
+class RunStore:
+    """Per-run output directories under Output/runs/<run_id>/.
+
+    Each analysis/revision run writes its files into its own directory, so
+    concurrent requests never share output paths. Old runs are evicted by
+    age and count whenever a new run is created.
+
+    Args:
+        root (str): Directory holding the run directories.
+        max_runs (int): Number of most recent runs to keep.
+        max_age (float): Maximum run age in seconds.
+    """
+
+    def __init__(self, root=RUNS_DIR, max_runs=MAX_RUNS, max_age=MAX_RUN_AGE):
+        self.root = root
+        self.max_runs = max_runs
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def new_run(self):
+        """Create a run directory and evict expired runs.
+
+        Returns:
+            str: The new run ID.
+        """
+        run_id = uuid.uuid4().hex
+        os.makedirs(self.run_dir(run_id), exist_ok=True)
+        self.evict(keep=run_id)
+        logger.info(f"Created run {run_id}")
+        return run_id
+
+    def run_dir(self, run_id):
+        """Return the directory of a run.
+
+        Args:
+            run_id (str): Run ID.
+
+        Returns:
+            str: Path of the run directory.
+        """
+        if not run_id or os.path.basename(run_id) != run_id or run_id.startswith('.'):
+            raise ValueError(f"Invalid run ID: {run_id!r}")
+        return os.path.join(self.root, run_id)
+
+    def path(self, run_id, name):
+        """Return the path of a file inside a run directory.
+
+        Args:
+            run_id (str): Run ID.
+            name (str): File name.
+
+        Returns:
+            str: File path.
+        """
+        return os.path.join(self.run_dir(run_id), name)
+
+    def write_text(self, run_id, name, text):
+        """Atomically write a text file into a run.
+
+        Args:
+            run_id (str): Run ID.
+            name (str): File name.
+            text (str): File contents.
+
+        Returns:
+            str: Path of the written file.
+        """
+        path = self.path(run_id, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, text)
+        return path
+
+    def open_text(self, run_id, name):
+        """Open a text file in a run for incremental, atomic writing.
+
+        Args:
+            run_id (str): Run ID.
+            name (str): File name.
+
+        Returns:
+            contextmanager: atomic_writer for the file's path.
+        """
+        path = self.path(run_id, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return atomic_writer(path)
+
+    def write_json(self, run_id, name, data):
+        """Atomically write a JSON file into a run.
+
+        Args:
+            run_id (str): Run ID.
+            name (str): File name.
+            data: JSON-serializable data.
+
+        Returns:
+            str: Path of the written file.
+        """
+        return self.write_text(run_id, name, json.dumps(data, indent=4))
+
+    def evict(self, keep=None):
+        """Delete runs older than max_age and the oldest runs beyond max_runs.
+
+        Args:
+            keep (str): Run ID that must not be evicted.
+
+        Returns:
+            int: Number of runs deleted.
+        """
+        with self._lock:
+            try:
+                entries = [e for e in os.scandir(self.root) if e.is_dir() and e.name != keep]
+            except FileNotFoundError:
+                return 0
+            now = time.time()
+            entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+            keep_count = self.max_runs - (1 if keep else 0)
+            expired = [e for i, e in enumerate(entries)
+                       if i >= keep_count or now - e.stat().st_mtime > self.max_age]
+            for entry in expired:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        if expired:
+            logger.info(f"Evicted {len(expired)} old runs from {self.root}")
+        return len(expired)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_run_store():
+    """Return the process-wide run store.
+
+    Returns:
+        RunStore: Shared run store.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore()
+        return _store
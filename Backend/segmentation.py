@@ -0,0 +1,194 @@
+import re
+import logging
+from array import array
+from backend.resources import lazy_import, sent_tokenize
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+textstat = lazy_import("textstat")
+
+WORD_PATTERN = re.compile(r"\S*\w\S*")
+COMPLEX_WORD_SYLLABLES = 3  # Words with at least this many syllables count as complex
+
+SYLLABLE_CACHE_SIZE = 200000  # Distinct words kept in the syllable dictionary
+
+_syllables = {}
+
+def word_syllables(word):
+    """Count the syllables of one word, memoized across documents.
+
+    Counts come from textstat's pyphen-based syllable_count and are kept in
+    a process-wide dictionary keyed by the lower-cased word, so each
+    distinct word is hyphenated once.
+
+    Args:
+        word (str): A word, possibly with surrounding punctuation.
+
+    Returns:
+        int: Syllable count (0 for tokens without letters).
+    """
+    word = word.lower()
+    count = _syllables.get(word)
+    if count is None:
+        count = textstat.syllable_count(word)
+        if len(_syllables) < SYLLABLE_CACHE_SIZE:
+            _syllables[word] = count
+    return count
+
+class SegmentedText:
+    """Sentence and word segmentation of a text, computed once and shared.
+
+    Sentences are tokenized once with the shared sentence tokenizer. For every word the store keeps its
+    character offset within its sentence and its syllable count in flat
+    arrays, with a per-sentence index into them, so analysis code reads
+    counts without re-tokenizing. Revision steps replace sentences through
+    replace_sentence, which re-segments only the changed sentence.
+
+    Args:
+        text (str): Text to segment.
+        sentences (list): Pre-split sentences; skips sentence tokenization if given.
+    """
+
+    def __init__(self, text="", sentences=None):
+        if sentences is None:
+            sentences = [s for s in sent_tokenize(text) if s.strip()] if text else []
+        self._sentences = []
+        self.word_offsets = array('i')  # Start offset of each word within its sentence
+        self.word_lengths = array('i')  # Character length of each word
+        self.word_syllables = array('i')  # Syllable count of each word
+        self.word_letters = array('i')  # Letters and digits in each word, without punctuation
+        self.sentence_words = array('i', [0])  # Index of each sentence's first word; one extra entry at the end
+        self.extend(sentences)
+
+    def extend(self, sentences):
+        """Append sentences to the end of the text.
+
+        Args:
+            sentences (list): Sentences to append.
+        """
+        for sentence in sentences:
+            offsets, lengths, syllables, letters = segment_words(sentence)
+            self._sentences.append(sentence)
+            self.word_offsets.extend(offsets)
+            self.word_lengths.extend(lengths)
+            self.word_syllables.extend(syllables)
+            self.word_letters.extend(letters)
+            self.sentence_words.append(self.sentence_words[-1] + len(offsets))
+
+    def copy(self):
+        """Return an independent copy that can be revised without re-tokenizing.
+
+        Returns:
+            SegmentedText: Copy of this segmentation.
+        """
+        clone = SegmentedText.__new__(SegmentedText)
+        clone._sentences = list(self._sentences)
+        clone.word_offsets = array('i', self.word_offsets)
+        clone.word_lengths = array('i', self.word_lengths)
+        clone.word_syllables = array('i', self.word_syllables)
+        clone.word_letters = array('i', self.word_letters)
+        clone.sentence_words = array('i', self.sentence_words)
+        return clone
+
+    def replace_sentence(self, index, new_sentences):
+        """Replace one sentence with zero or more sentences, re-segmenting only those.
+
+        Args:
+            index (int): Index of the sentence to replace.
+            new_sentences (str or list): Replacement sentence, or sentences if it was split.
+        """
+        if isinstance(new_sentences, str):
+            new_sentences = [new_sentences]
+        new_sentences = [s for s in new_sentences if s.strip()]
+        if new_sentences == [self._sentences[index]]:
+            return
+        offsets, lengths, syllables, letters, counts = array('i'), array('i'), array('i'), array('i'), []
+        for sentence in new_sentences:
+            o, l, s, c = segment_words(sentence)
+            offsets.extend(o)
+            lengths.extend(l)
+            syllables.extend(s)
+            letters.extend(c)
+            counts.append(len(o))
+        start, end = self.sentence_words[index], self.sentence_words[index + 1]
+        self.word_offsets[start:end] = offsets
+        self.word_lengths[start:end] = lengths
+        self.word_syllables[start:end] = syllables
+        self.word_letters[start:end] = letters
+        self._sentences[index:index + 1] = new_sentences
+        # Rebuild the sentence index from the changed sentence onwards
+        tail = array('i', [start])
+        for count in counts:
+            tail.append(tail[-1] + count)
+        delta = len(offsets) - (end - start)
+        tail.extend(i + delta for i in self.sentence_words[index + 2:])
+        self.sentence_words[index:] = tail
+
+    def map_sentences(self, func):
+        """Apply a sentence transform, updating only the sentences it changes.
+
+        A transform that returns an empty or whitespace-only result drops the
+        sentence, and the next sentence moves into its place.
+
+        Args:
+            func (callable): Takes a sentence and returns a sentence or a list of sentences.
+        """
+        index = 0
+        while index < len(self._sentences):
+            result = func(self._sentences[index])
+            if isinstance(result, str):
+                result = [result]
+            self.replace_sentence(index, result)
+            index += len([s for s in result if s.strip()])
+
+    @property
+    def sentences(self):
+        """list: The current sentences (read-only copy)."""
+        return list(self._sentences)
+
+    @property
+    def text(self):
+        """str: The sentences joined back into text, adding a period where a sentence lacks end punctuation."""
+        parts = []
+        for sentence in self._sentences:
+            sentence = sentence.strip()
+            parts.append(sentence if sentence[-1] in '.!?' else sentence + '.')
+        return ' '.join(parts)
+
+    @property
+    def sentence_count(self):
+        """int: Number of sentences."""
+        return len(self._sentences)
+
+    @property
+    def word_count(self):
+        """int: Number of words."""
+        return len(self.word_offsets)
+
+    def longest_sentence(self):
+        """Return the longest sentence by character length.
+
+        Returns:
+            str: Longest sentence, or an empty string.
+        """
+        return max(self._sentences, key=len, default="")
+
+def segment_words(sentence):
+    """Find the words of a sentence with their offsets, lengths, syllable and letter counts.
+
+    Args:
+        sentence (str): Sentence to segment.
+
+    Returns:
+        tuple: (offsets, lengths, syllables, letters) arrays.
+    """
+    offsets, lengths, syllables, letters = array('i'), array('i'), array('i'), array('i')
+    for match in WORD_PATTERN.finditer(sentence):
+        word = match.group(0)
+        offsets.append(match.start())
+        lengths.append(len(word))
+        syllables.append(word_syllables(word))
+        letters.append(sum(1 for char in word if char.isalnum()))
+    return offsets, lengths, syllables, letters
@@ -0,0 +1,432 @@
+import sqlite3
+import contextlib
+import contextvars
+import hashlib
+import json
+import re
+import threading
+import time
+import logging
+import os
+from collections import Counter
+from backend.resources import lazy_import
+from backend.metrics import SIMPLIFY_SENTENCES
+
+np = lazy_import("numpy")
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sentence simplification memo settings
+MEMO_ENABLED = os.environ.get("SIMPLIFY_MEMO", "1") != "0"  # Set SIMPLIFY_MEMO=0 to send every sentence to Gemini
+MEMO_PATH = os.path.join("Output", "cache", "sentences.sqlite3")
+MEMO_MAX_ENTRIES = 200000  # Least recently used simplifications are evicted beyond this
+SIMILARITY_THRESHOLD = float(os.environ.get("SIMPLIFY_SIMILARITY", "0.85"))  # Word-shingle Jaccard similarity for reusing a near-duplicate (1.0: normalized matches only)
+SHINGLE_SIZE = 2  # Words per shingle
+MINHASH_PERMUTATIONS = 64  # MinHash signature length
+LSH_BANDS = 16  # Signature bands; sentences sharing any band are compared
+MAX_CANDIDATES = 20  # Near-duplicate candidates compared per lookup
+INFLIGHT_WAIT = 120  # Seconds to wait for a sentence another request is already simplifying
+MERSENNE_PRIME = (1 << 61) - 1
+
+NUMBER = re.compile(r'\d+(?:[.,:]\d+)*')
+WORD = re.compile(r'\w+')
+
+# Where simplifications came from: 'llm' (sent to Gemini), 'memo_exact' / 'memo_near'
+# (stored simplification of the same or a similar sentence), 'duplicate' (copy of
+# another sentence in the same request, or in flight in another one)
+SOURCES = ("llm", "memo_exact", "memo_near", "duplicate")
+
+class Fingerprint:
+    """Normalized form, numbers, shingles and LSH bands of one sentence.
+
+    Sentences are normalized for case, whitespace and numbers: every number
+    becomes 0, so 'Wait 5 minutes.' and 'wait 10  minutes.' share a
+    normalized form. The numbers are kept to put back into a reused
+    simplification.
+
+    Args:
+        sentence (str): Sentence to fingerprint.
+    """
+
+    def __init__(self, sentence):
+        self.sentence = sentence
+        self.numbers = NUMBER.findall(sentence)
+        self.normalized = ' '.join(NUMBER.sub('0', sentence).lower().split())
+        self.key = hashlib.sha256(self.normalized.encode("utf-8")).hexdigest()
+        self.shingles = shingles(self.normalized)
+        self._bands = None
+
+    @property
+    def bands(self):
+        """list: LSH band keys of the MinHash signature, computed on first use."""
+        if self._bands is None:
+            self._bands = get_hasher().bands(self.shingles)
+        return self._bands
+
+def shingles(normalized):
+    """Split a normalized sentence into overlapping word shingles.
+
+    Args:
+        normalized (str): Normalized sentence.
+
+    Returns:
+        set: Shingles of SHINGLE_SIZE words (the whole sentence if it is shorter).
+    """
+    words = WORD.findall(normalized)
+    if len(words) <= SHINGLE_SIZE:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def jaccard(a, b):
+    """Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def only_numbers_differ(a, b):
+    """Check that two normalized sentences use the same words apart from numbers.
+
+    Shingle similarity alone would let 'Do not delete the file.' reuse the
+    simplification of 'Do delete the file.', or an iOS step reuse an Android
+    one. Word order and punctuation may still differ.
+
+    Args:
+        a (str): Normalized sentence.
+        b (str): Normalized sentence.
+
+    Returns:
+        bool: True if every word in one but not the other is a number.
+    """
+    words_a, words_b = Counter(WORD.findall(a)), Counter(WORD.findall(b))
+    return all(NUMBER.fullmatch(word) for word in (words_a - words_b) + (words_b - words_a))
+
+def restore_numbers(text, source, target):
+    """Carry a simplification over to a sentence that differs only in its numbers.
+
+    Args:
+        text (str): Simplification of the source sentence.
+        source (list): Numbers of the source sentence.
+        target (list): Numbers of the sentence the simplification is reused for.
+
+    Returns:
+        str: Text with the source numbers replaced by the target numbers, or
+            None if the simplification does not contain the source numbers in order.
+    """
+    if source == target:
+        return text
+    if len(source) != len(target) or NUMBER.findall(text) != source:
+        return None
+    numbers = iter(target)
+    return NUMBER.sub(lambda match: next(numbers), text)
+
+class MinHasher:
+    """MinHash signatures and LSH band keys of shingle sets.
+
+    The permutations come from a fixed seed, so every process computes the
+    same band keys and can share one memo file.
+
+    Args:
+        permutations (int): Signature length.
+        bands (int): Bands the signature is split into (must divide permutations).
+        seed (int): Seed of the permutation coefficients.
+    """
+
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, bands=LSH_BANDS, seed=1):
+        if permutations % bands:
+            raise ValueError(f"{bands} bands do not divide {permutations} permutations")
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 32, size=permutations, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=permutations, dtype=np.uint64)
+        self.rows = permutations // bands
+
+    def signature(self, shingle_set):
+        """Return the MinHash signature of a shingle set.
+
+        Args:
+            shingle_set (set): Shingles.
+
+        Returns:
+            numpy.ndarray: One minimum per permutation (uint64).
+        """
+        hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                           for s in shingle_set], dtype=np.uint64)
+        # 32-bit hashes times 32-bit coefficients stay below 2**64
+        return ((hashes[:, None] * self.a + self.b) % np.uint64(MERSENNE_PRIME)).min(axis=0)
+
+    def bands(self, shingle_set):
+        """Return the LSH band keys of a shingle set.
+
+        Args:
+            shingle_set (set): Shingles.
+
+        Returns:
+            list: One 'band:hash' key per band.
+        """
+        signature = self.signature(shingle_set)
+        return [f"{i}:{hashlib.blake2b(signature[i * self.rows:(i + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+                for i in range(len(signature) // self.rows)]
+
+class SentenceMemo:
+    """Store of sentence simplifications with near-duplicate lookup, backed by SQLite.
+
+    Entries are keyed by the normalized sentence and a namespace (a hash of
+    the prompts, so changing a prompt starts afresh). Lookups first try the
+    normalized form, then MinHash/LSH candidates, which are verified by the
+    Jaccard similarity of their shingles and must not differ in any word but
+    a number. The least recently used entries are
+    evicted once the store grows past max_entries. Callers claim sentences
+    they are about to send, so concurrent pages in this process wait for one
+    request instead of sending the same sentence each.
+
+    Args:
+        path (str): SQLite database path (':memory:' for a private in-memory store).
+        namespace (str): Namespace of the entries.
+        threshold (float): Minimum similarity for a near-duplicate match.
+        max_entries (int): Entry cap.
+    """
+
+    def __init__(self, path=MEMO_PATH, namespace="", threshold=SIMILARITY_THRESHOLD, max_entries=MEMO_MAX_ENTRIES):
+        self.path = path
+        self.namespace = namespace
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._inflight = {}  # Key -> Event set when the claiming caller is done
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentences ("
+            "key TEXT PRIMARY KEY, normalized TEXT NOT NULL, numbers TEXT NOT NULL, "
+            "value TEXT NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS bands (band TEXT NOT NULL, key TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_band ON bands (band)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sentences_accessed ON sentences (accessed)")
+        self._conn.commit()
+
+    def _key(self, fingerprint):
+        return f"{self.namespace}:{fingerprint.key}"
+
+    def _bands(self, fingerprint):
+        return [f"{self.namespace}:{band}" for band in fingerprint.bands]
+
+    def find(self, fingerprint):
+        """Find the stored entry of the same or the most similar sentence.
+
+        Args:
+            fingerprint (Fingerprint): Sentence to look up.
+
+        Returns:
+            dict: 'value', 'numbers' (of the stored sentence) and 'similarity'
+                (1.0 for a normalized match), or None if nothing is similar enough.
+        """
+        now = time.time()
+        bands = self._bands(fingerprint) if self.threshold < 1.0 else []
+        with self._lock:
+            key = self._key(fingerprint)
+            row = self._conn.execute("SELECT numbers, value FROM sentences WHERE key = ?", (key,)).fetchone()
+            match = None
+            if row is not None:
+                match = {"key": key, "numbers": json.loads(row[0]), "value": json.loads(row[1]), "similarity": 1.0}
+            elif bands:
+                candidates = self._conn.execute(
+                    "SELECT key, normalized, numbers, value FROM sentences WHERE key IN "
+                    f"(SELECT DISTINCT key FROM bands WHERE band IN ({','.join('?' * len(bands))}) LIMIT ?)",
+                    (*bands, MAX_CANDIDATES)
+                ).fetchall()
+                for candidate_key, normalized, numbers, value in candidates:
+                    similarity = jaccard(fingerprint.shingles, shingles(normalized))
+                    if similarity >= self.threshold and (match is None or similarity > match["similarity"]) \
+                            and only_numbers_differ(fingerprint.normalized, normalized):
+                        match = {"key": candidate_key, "numbers": json.loads(numbers), "value": json.loads(value),
+                                 "similarity": similarity}
+            if match is None:
+                return None
+            self._conn.execute("UPDATE sentences SET accessed = ? WHERE key = ?", (now, match.pop("key")))
+            self._conn.commit()
+            return match
+
+    def add(self, fingerprint, value):
+        """Store a value for a sentence and evict least recently used entries over the cap.
+
+        Args:
+            fingerprint (Fingerprint): Sentence the value belongs to.
+            value: JSON-serializable value, e.g. the simplified sentence.
+        """
+        bands = self._bands(fingerprint) if self.threshold < 1.0 else []
+        with self._lock:
+            key = self._key(fingerprint)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sentences (key, normalized, numbers, value, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint.normalized, json.dumps(fingerprint.numbers), json.dumps(value), time.time())
+            )
+            self._conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+            self._conn.executemany("INSERT INTO bands (band, key) VALUES (?, ?)", [(band, key) for band in bands])
+            count = self._conn.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
+            if count > self.max_entries:
+                evicted = [row[0] for row in self._conn.execute(
+                    "SELECT key FROM sentences ORDER BY accessed ASC LIMIT ?", (count - self.max_entries,))]
+                self._conn.executemany("DELETE FROM sentences WHERE key = ?", [(k,) for k in evicted])
+                self._conn.executemany("DELETE FROM bands WHERE key = ?", [(k,) for k in evicted])
+            self._conn.commit()
+
+    def claim(self, fingerprint):
+        """Claim a sentence before sending it, unless another caller already has.
+
+        Args:
+            fingerprint (Fingerprint): Sentence about to be simplified.
+
+        Returns:
+            threading.Event: Event set when the other caller releases the
+                sentence, with the outcome it passed as 'outcome'; or None if
+                this caller now holds the claim.
+        """
+        with self._lock:
+            key = self._key(fingerprint)
+            event = self._inflight.get(key)
+            if event is None:
+                claimed = threading.Event()
+                claimed.outcome = None
+                self._inflight[key] = claimed
+            return event
+
+    def release(self, fingerprint, outcome=None):
+        """Release a claimed sentence and wake waiting callers.
+
+        Args:
+            fingerprint (Fingerprint): Sentence claimed with claim.
+            outcome: Result handed to waiting callers, e.g. (sentence, simplified
+                sentence); None if the caller failed and they should send it themselves.
+        """
+        with self._lock:
+            event = self._inflight.pop(self._key(fingerprint), None)
+        if event is not None:
+            event.outcome = outcome
+            event.set()
+
+    def lookup(self, fingerprint):
+        """Return a stored simplification usable for a sentence.
+
+        Args:
+            fingerprint (Fingerprint): Sentence to simplify.
+
+        Returns:
+            tuple: (simplified sentence, 'memo_exact' or 'memo_near'), or (None, None)
+                if there is no match or its numbers cannot be carried over.
+        """
+        match = self.find(fingerprint)
+        if match is None:
+            return None, None
+        simplified = restore_numbers(match["value"], match["numbers"], fingerprint.numbers)
+        if simplified is None:
+            return None, None
+        return simplified, "memo_exact" if match["similarity"] == 1.0 else "memo_near"
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM sentences")
+            self._conn.execute("DELETE FROM bands")
+            self._conn.commit()
+
+class SimplificationStats:
+    """Thread-safe tally of where the simplified sentences of a run came from."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(SOURCES, 0)
+        self._lock = threading.Lock()
+
+    def add(self, source, count=1):
+        """Count sentences from one source."""
+        with self._lock:
+            self.counts[source] += count
+
+    def summary(self):
+        """Return the counts with the total and the dedup ratio.
+
+        Returns:
+            dict: Count per source, 'sentences' (total) and 'dedup_ratio'
+                (share of sentences that did not need a Gemini request).
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        return dedup_summary(counts)
+
+def dedup_summary(counts):
+    """Add the total and the dedup ratio to per-source counts.
+
+    Args:
+        counts (dict): Sentences per source.
+
+    Returns:
+        dict: The counts, 'sentences' and 'dedup_ratio'.
+    """
+    total = sum(counts.get(source, 0) for source in SOURCES)
+    reused = total - counts.get("llm", 0)
+    return {**{source: counts.get(source, 0) for source in SOURCES},
+            "sentences": total, "dedup_ratio": round(reused / total, 3) if total else 0.0}
+
+_stats = contextvars.ContextVar("simplification_stats", default=None)
+
+@contextlib.contextmanager
+def tracking():
+    """Tally the simplifications made inside the block, including pool threads run with in_context.
+
+    Yields:
+        SimplificationStats: Tally of this block.
+    """
+    stats = SimplificationStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+def record(source, count=1):
+    """Count simplified sentences by source in /metrics and the active tally.
+
+    Args:
+        source (str): One of SOURCES.
+        count (int): Number of sentences.
+    """
+    if not count:
+        return
+    SIMPLIFY_SENTENCES.inc(count, source=source)
+    stats = _stats.get()
+    if stats is not None:
+        stats.add(source, count)
+
+_hasher = None
+_memos = {}
+_memo_lock = threading.Lock()
+
+def get_hasher():
+    """Return the process-wide MinHasher, creating it on first use."""
+    global _hasher
+    with _memo_lock:
+        if _hasher is None:
+            _hasher = MinHasher()
+        return _hasher
+
+def get_sentence_memo(*prompts):
+    """Return the process-wide simplification memo for a set of prompts, opening it on first use.
+
+    Args:
+        *prompts (str): Prompts whose simplifications are stored; they form the namespace.
+
+    Returns:
+        SentenceMemo: Shared memo, or None when SIMPLIFY_MEMO=0.
+    """
+    if not MEMO_ENABLED:
+        return None
+    namespace = hashlib.sha256(json.dumps(prompts).encode("utf-8")).hexdigest()[:16]
+    with _memo_lock:
+        if namespace not in _memos:
+            _memos[namespace] = SentenceMemo(MEMO_PATH, namespace)
+            logger.info(f"Opened sentence simplification memo at {MEMO_PATH}")
+        return _memos[namespace]
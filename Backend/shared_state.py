@@ -0,0 +1,441 @@
+import re
+import random
+import sqlite3
+import contextlib
+import threading
+import time
+import uuid
+import logging
+import os
+from backend.resources import lazy_import
+
+# Configure logging for backend debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+redis = lazy_import("redis")
+
+# Where workers share caches, rate limits and locks: redis://host:6379/0 (also rediss:// and
+# unix://) for workers on several hosts, sqlite:///path for processes on one host, or memory://
+# for a single process. Unset: the SQLite file at SHARED_STATE_PATH.
+SHARED_STATE_URL = os.environ.get("SHARED_STATE_URL", "")
+SHARED_STATE_PATH = os.path.join("Output", "cache", "shared_state.sqlite3")
+KEY_PREFIX = "docagent:"  # Prefix of every key in a Redis store shared with other applications
+
+# Single-flight settings
+LOCK_TTL = 60.0  # Seconds a lock is held at most, so a crashed worker's lock expires
+SINGLE_FLIGHT_WAIT = 60.0  # Seconds to wait for another worker's result before doing the work too
+POLL_INTERVAL = 0.05  # Seconds before the first re-check while waiting; doubles after every check
+POLL_MAX_INTERVAL = 1.0  # Longest pause between checks while waiting
+
+def refill(tokens, updated, now, rate, capacity, take):
+    """Refill a token bucket to now and try to take tokens from it.
+
+    Args:
+        tokens (float): Tokens held at the last update (None for a new bucket, which starts full).
+        updated (float): Time of the last update.
+        now (float): Current time.
+        rate (float): Tokens added per second.
+        capacity (int): Maximum tokens held.
+        take (int): Tokens wanted.
+
+    Returns:
+        tuple: (tokens left, seconds to wait before enough tokens are available;
+            0.0 if they were taken).
+    """
+    tokens = capacity if tokens is None else min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= take:
+        return tokens - take, 0.0
+    return tokens, (take - tokens) / rate
+
+class MemoryState:
+    """Shared state for the threads of one process (memory://)."""
+
+    kind = "memory"
+
+    def __init__(self):
+        self.url = "memory://"
+        self._entries = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a stored value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+                self._entries.pop(key, None)
+                return None
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Store a string value, expiring after ttl seconds (None: never)."""
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        """Remove a value."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def try_lock(self, key, ttl=LOCK_TTL):
+        """Take a lock unless another holder has it.
+
+        Returns:
+            str: Owner token for unlock, or None if the lock is held.
+        """
+        owner = uuid.uuid4().hex
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return None
+            self._entries[key] = (owner, time.time() + ttl)
+        return owner
+
+    def unlock(self, key, owner):
+        """Release a lock if owner still holds it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == owner:
+                del self._entries[key]
+
+    def take_tokens(self, name, rate, capacity, tokens=1):
+        """Take tokens from a named token bucket.
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise seconds until they could be.
+        """
+        with self._lock:
+            held, updated = self._buckets.get(name, (None, 0.0))
+            now = time.monotonic()
+            held, wait = refill(held, updated, now, rate, capacity, tokens)
+            self._buckets[name] = (held, now)
+        return wait
+
+    def clear(self, prefix=""):
+        """Remove the values and locks whose keys start with prefix; with no prefix, buckets too."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+            if not prefix:
+                self._buckets.clear()
+
+class SQLiteState:
+    """Shared state for the processes of one host, in a SQLite file.
+
+    Every change runs in an immediate transaction, so bucket updates and
+    lock takeovers are atomic across processes.
+
+    Args:
+        path (str): SQLite database path.
+    """
+
+    kind = "sqlite"
+
+    def __init__(self, path=SHARED_STATE_PATH):
+        self.url = f"sqlite:///{path}"
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Locks and buckets need no fsync on every commit
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get(self, key):
+        """Return a stored value, or None if it is missing or expired."""
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        """Store a string value, expiring after ttl seconds (None: never)."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                         (key, value, time.time() + ttl if ttl else None))
+            # Drop expired entries now and then, so the file does not grow with dead keys
+            if random.random() < 0.01:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+    def delete(self, key):
+        """Remove a value."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def try_lock(self, key, ttl=LOCK_TTL):
+        """Take a lock unless another holder has it.
+
+        Returns:
+            str: Owner token for unlock, or None if the lock is held.
+        """
+        owner = uuid.uuid4().hex
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute("SELECT expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] > now:
+                return None
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)", (key, owner, now + ttl))
+        return owner
+
+    def unlock(self, key, owner):
+        """Release a lock if owner still holds it."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ? AND value = ?", (key, owner))
+
+    def take_tokens(self, name, rate, capacity, tokens=1):
+        """Take tokens from a named token bucket.
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise seconds until they could be.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            now = time.time()
+            held, wait = refill(row[0] if row else None, row[1] if row else 0.0, now, rate, capacity, tokens)
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (name, held, now))
+        return wait
+
+    def clear(self, prefix=""):
+        """Remove the values and locks whose keys start with prefix; with no prefix, buckets too."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            if not prefix:
+                conn.execute("DELETE FROM buckets")
+
+class RedisState:
+    """Shared state for workers on several hosts, in Redis or a Redis-compatible store.
+
+    Values and locks are plain keys with expiry times; token buckets are
+    hashes updated in WATCH/MULTI transactions against the server clock,
+    so no server-side scripting is needed.
+
+    Args:
+        url (str): Redis URL, e.g. redis://localhost:6379/0.
+        client: Existing redis-py compatible client (e.g. fakeredis.FakeRedis) instead of url.
+        prefix (str): Prefix of every key.
+    """
+
+    kind = "redis"
+
+    def __init__(self, url=None, client=None, prefix=KEY_PREFIX):
+        self.url = re.sub(r'//[^@/]*@', '//', url or "redis://")  # Without credentials, for logs
+        self.prefix = prefix
+        self.client = client if client is not None else redis.Redis.from_url(url)
+
+    def get(self, key):
+        """Return a stored value, or None if it is missing or expired."""
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=None):
+        """Store a string value, expiring after ttl seconds (None: never)."""
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key):
+        """Remove a value."""
+        self.client.delete(self.prefix + key)
+
+    def try_lock(self, key, ttl=LOCK_TTL):
+        """Take a lock unless another holder has it.
+
+        Returns:
+            str: Owner token for unlock, or None if the lock is held.
+        """
+        owner = uuid.uuid4().hex
+        return owner if self.client.set(self.prefix + key, owner, nx=True, px=int(ttl * 1000)) else None
+
+    def unlock(self, key, owner):
+        """Release a lock if owner still holds it."""
+        key = self.prefix + key
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                value = pipe.get(key)
+                if (value.decode("utf-8") if isinstance(value, bytes) else value) == owner:
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except redis.WatchError:
+                pass  # The lock expired and was taken over in the meantime
+
+    def take_tokens(self, name, rate, capacity, tokens=1):
+        """Take tokens from a named token bucket.
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise seconds until they could be.
+        """
+        key = f"{self.prefix}bucket:{name}"
+        while True:
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    stored = pipe.hmget(key, "tokens", "updated")
+                    seconds, microseconds = pipe.time()
+                    now = seconds + microseconds / 1e6
+                    held = float(stored[0]) if stored[0] is not None else None
+                    updated = float(stored[1]) if stored[1] is not None else 0.0
+                    held, wait = refill(held, updated, now, rate, capacity, tokens)
+                    pipe.multi()
+                    pipe.hset(key, mapping={"tokens": held, "updated": now})
+                    # An idle bucket is full again after capacity / rate seconds; let it expire then
+                    pipe.pexpire(key, int((capacity / rate + 60) * 1000))
+                    pipe.execute()
+                    return wait
+                except redis.WatchError:
+                    continue  # Another worker updated the bucket; read it again
+
+    def clear(self, prefix=""):
+        """Remove the values and locks whose keys start with prefix; with no prefix, buckets too."""
+        pattern = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix + prefix) + "*"
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+
+class SharedTokenBucket:
+    """Token-bucket rate limiter shared by every worker using the same state.
+
+    Args:
+        name (str): Bucket name; workers using the same name share its tokens.
+        rate (float): Tokens added per second.
+        capacity (int): Maximum tokens held, i.e. the allowed burst.
+        state: Shared state (default: get_shared_state()).
+    """
+
+    def __init__(self, name, rate, capacity, state=None):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.state = state or get_shared_state()
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until enough tokens are available.
+
+        Args:
+            tokens (int): Tokens to take.
+            timeout (float): Give up after this many seconds (None waits forever).
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.state.take_tokens(self.name, self.rate, self.capacity, tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+@contextlib.contextmanager
+def single_flight(key, lookup, state=None, wait=SINGLE_FLIGHT_WAIT, ttl=LOCK_TTL):
+    """Let one worker at a time do the work behind a key; the others wait for its result.
+
+    The block runs in every caller. A caller that gets the lock receives
+    lookup()'s value at that moment (None: do the work and store the result
+    before the block ends). Callers that find the lock taken poll lookup()
+    with exponential backoff (POLL_INTERVAL doubling up to
+    POLL_MAX_INTERVAL) until the holder's result appears and receive it; if
+    the holder releases the lock without storing one, the next caller to
+    take it does the work, and if nothing appears within wait seconds they
+    receive None and do the work themselves. lookup() is called on every
+    poll, so it should be cheap and must not count as a cache lookup.
+
+    Args:
+        key (str): Name of the work, e.g. 'llm:<cache key>'.
+        lookup (callable): Returns the stored result, or None.
+        state: Shared state (default: get_shared_state()).
+        wait (float): Seconds to wait for another worker's result.
+        ttl (float): Seconds the lock is held at most.
+
+    Yields:
+        Stored result, or None if the caller has to do the work.
+    """
+    state = state or get_shared_state()
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + wait
+    owner = value = None
+    delay = POLL_INTERVAL
+    while True:
+        owner = state.try_lock(lock_key, ttl)
+        value = lookup()
+        if owner is not None or value is not None:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, POLL_MAX_INTERVAL)
+        # Most waits end with the holder's result; read it before trying the lock (a write) again
+        value = lookup()
+        if value is not None:
+            break
+    try:
+        yield value
+    finally:
+        if owner is not None:
+            state.unlock(lock_key, owner)
+
+def open_state(url=None):
+    """Open the shared state a URL points at.
+
+    Args:
+        url (str): redis://, rediss:// or unix:// URL, sqlite:///path, memory://,
+            or empty for the SQLite file at SHARED_STATE_PATH.
+
+    Returns:
+        MemoryState, SQLiteState or RedisState: The store.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+    """
+    if not url:
+        return SQLiteState()
+    scheme = url.split("://", 1)[0].lower()
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisState(url)
+    if scheme == "sqlite":
+        return SQLiteState(url[len("sqlite:///"):] or SHARED_STATE_PATH)
+    if scheme == "memory":
+        return MemoryState()
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_shared_state():
+    """Return the process-wide shared state, opening it on first use.
+
+    Returns:
+        MemoryState, SQLiteState or RedisState: Store selected by SHARED_STATE_URL.
+    """
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = open_state(SHARED_STATE_URL)
+            logger.info(f"Using {_state.kind} shared state at {_state.url}")
+        return _state
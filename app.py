@@ -1,9 +1,17 @@
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify
 import json
+import hashlib
 import os
+import time
 import logging
+from backend.doc_context import DocumentContext
 from backend.doc_analyzer import analyze_documentation
-from backend.doc_revision import revise_documentation
+from backend.doc_revision import revise_documentation, render_markdown
+from backend.run_store import get_run_store
+from backend.job_queue import JobQueue, QUEUED, RUNNING, FAILED
+from backend.crawler import crawl_site, load_sitemap, BATCH_DIR
+from backend.events import publish, format_sse
+from backend.metrics import span, start_trace, end_trace, render_metrics
 
 # Configure logging for Flask app
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -11,9 +19,19 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Output directory
-OUTPUT_DIR = "Output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Set JOB_DB_PATH to persist the job queue in SQLite across restarts
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH")
+
+SSE_KEEPALIVE = 15.0  # Seconds between keep-alive comments on an idle event stream
+SSE_POLL_INTERVAL = 1.0  # Seconds between status checks of a job whose events this process does not hold
+
+# Set TRACE_REPORTS=1 to embed per-stage span timings in analysis reports and job results
+TRACE_REPORTS = os.environ.get("TRACE_REPORTS") == "1"
+
+# Limits on batch crawls started over HTTP
+BATCH_MAX_DEPTH = 3  # Deepest link-following depth a request may ask for
+BATCH_MAX_PAGES = 1000  # Largest 'max_pages' a request may ask for
+BATCH_DEFAULT_PAGES = 200  # 'max_pages' applied when a request gives none
 
 @app.route('/')
 def index():
@@ -25,70 +43,313 @@ def index():
     logger.info("Rendering index page")
     return render_template('index.html')
 
+def run_pipeline(url):
+    """Run the pipeline for a URL as one timed stage, tracing it if TRACE_REPORTS is set.
+    
+    Args:
+        url (str): Webpage URL with scheme.
+    
+    Returns:
+        dict: Result of run_stages, plus the recorded spans under 'trace' when tracing.
+    """
+    token = start_trace() if TRACE_REPORTS else None
+    try:
+        with span("pipeline"):
+            result = run_stages(url)
+    finally:
+        trace = end_trace(token) if token is not None else None
+    if trace is not None:
+        result["trace"] = trace
+    return result
+
+def run_stages(url):
+    """Fetch, analyze and revise a URL, saving the output files in a new run.
+    
+    Args:
+        url (str): Webpage URL with scheme.
+    
+    Returns:
+        dict: Run ID, analysis report, revision result and revised Markdown text.
+    """
+    # Fetch and parse the page once for both tasks
+    doc = DocumentContext.fetch(url)
+    run_id = runs.new_run()
+    publish("fetch", url=url, run_id=run_id, error=doc.error, structure=doc.structure,
+            words=doc.segments.word_count, sentences=doc.segments.sentence_count)
+    
+    # Run Task 1: Analyze documentation
+    logger.info("Starting documentation analysis")
+    analysis_report = analyze_documentation(doc, run_id=run_id)
+    publish("analysis", timings=analysis_report["timings"], partial=analysis_report.get("partial", []))
+    
+    # Run Task 2: Revise documentation, handing the report over in memory; the revised
+    # text is streamed to the output files and 'revised_text' events as it is produced
+    logger.info("Starting documentation revision")
+    revision_result = revise_documentation(doc, analysis_report, run_id=run_id)
+    
+    # Save revision result as JSON
+    try:
+        revision_json_path = runs.write_json(run_id, "revision_result.json", revision_result)
+        logger.info(f"Revision result saved to {revision_json_path}")
+    except Exception as e:
+        logger.error(f"Error saving revision result: {str(e)}")
+    
+    return {
+        "run_id": run_id,
+        "analysis_report": analysis_report,
+        "revision_result": revision_result,
+        "revised_text": render_markdown(revision_result.get("revised_text") or "")
+    }
+
+runs = get_run_store()
+jobs = JobQueue(run_pipeline, db_path=JOB_DB_PATH)
+
+def wants_json():
+    """Check whether the client asked for a JSON response.
+    
+    Returns:
+        bool: True if JSON is preferred over HTML.
+    """
+    return request.accept_mimetypes.best_match(['application/json', 'text/html']) == 'application/json'
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    """Analyze and revise the provided URL.
+    """Queue analysis and revision of the provided URL.
     
     Returns:
-        str: Rendered result.html template with analysis and revision data.
+        Response: Redirect to the job page, or the job ID as JSON (202).
     """
     logger.info("Processing analyze request")
-    url = request.form.get('url')
+    url = request.form.get('url') or (request.get_json(silent=True) or {}).get('url')
     if not url:
         logger.warning("No URL provided in request")
+        if wants_json():
+            return jsonify({"error": "No URL provided."}), 400
         return render_template('result.html', error="No URL provided.", analysis_report=None, revision_result=None, revised_text=None)
     
-    try:
-        # Ensure URL has a scheme
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-            logger.info(f"Added https scheme to URL: {url}")
-        
-        # Run Task 1: Analyze documentation
-        logger.info("Starting documentation analysis")
-        analysis_report = analyze_documentation(url)
-        
-        # Run Task 2: Revise documentation
-        logger.info("Starting documentation revision")
-        revision_result = revise_documentation(url, os.path.join(OUTPUT_DIR, "analysis_report.json"))
-        
-        # Save revision result as JSON
-        revision_json_path = os.path.join(OUTPUT_DIR, "revision_result.json")
-        try:
-            with open(revision_json_path, 'w') as f:
-                json.dump(revision_result, f, indent=4)
-            logger.info(f"Revision result saved to {revision_json_path}")
-        except Exception as e:
-            logger.error(f"Error saving revision result: {str(e)}")
-        
-        # Read revised Markdown file
-        revised_text = None
-        md_output = os.path.join(OUTPUT_DIR, "revised__content.md")
-        try:
-            with open(md_output, 'r') as f:
-                revised_text = f.read()
-            logger.info(f"Successfully read revised file: {md_output}")
-        except Exception as e:
-            logger.error(f"Error reading revised file: {str(e)}")
-            revised_text = f"Error reading revised file: {str(e)}"
-        
-        logger.info("Rendering result page")
-        return render_template(
-            'result.html',
-            analysis_report=json.dumps(analysis_report, indent=4),
-            revision_result=json.dumps(revision_result, indent=4),
-            revised_text=revised_text,
-            error=None
-        )
-    except Exception as e:
-        logger.error(f"Error processing URL: {str(e)}")
+    # Ensure URL has a scheme
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+        logger.info(f"Added https scheme to URL: {url}")
+    
+    job_id = jobs.submit(url)
+    if wants_json():
+        return jsonify({"job_id": job_id, "status_url": url_for('job_status', job_id=job_id),
+                        "result_url": url_for('job_result', job_id=job_id)}), 202
+    return redirect(url_for('job_page', job_id=job_id))
+
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    """Show a job's results; while it runs, the page streams them in as they are ready.
+    
+    Returns:
+        str: Rendered result.html template.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return render_template('result.html', error="Unknown job ID.", analysis_report=None, revision_result=None, revised_text=None), 404
+    if job["status"] in (QUEUED, RUNNING):
+        # Rendered empty; the page fills in its sections from /jobs/<id>/events
+        return render_template('result.html', job=job, error=None, analysis_report=None, revision_result=None, revised_text=None)
+    if job["status"] == FAILED:
+        logger.error(f"Error processing URL: {job['error']}")
         return render_template(
             'result.html',
-            error=f"Error processing URL: {str(e)}. Ensure the URL is accessible.",
+            error=f"Error processing URL: {job['error']}. Ensure the URL is accessible.",
             analysis_report=None,
             revision_result=None,
             revised_text=None
         )
+    
+    logger.info("Rendering result page")
+    result = job["result"]
+    return render_template(
+        'result.html',
+        analysis_report=json.dumps(result["analysis_report"], indent=4),
+        revision_result=json.dumps(result["revision_result"], indent=4),
+        revised_text=result["revised_text"],
+        error=None
+    )
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    """Report a job's status as JSON.
+    
+    Returns:
+        Response: Job ID, URL, status and any error.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job ID."}), 404
+    return jsonify({key: job[key] for key in ("id", "url", "status", "error", "created", "updated")})
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events.
+    
+    Events: 'status', 'fetch', 'dimension' (one per analysis dimension, as it
+    finishes), 'analysis', 'sentences' (revised sentences as batches come
+    back), 'revised_text' (the revised Markdown in chunks) and a final 'done'.
+    Reconnecting clients resume after their Last-Event-ID; a 'gap' event
+    means older events were dropped and the full result should be fetched.
+    For jobs whose events this process does not hold (run by another
+    worker, or finished long ago) only 'status' changes and 'done' are sent.
+    
+    Returns:
+        Response: text/event-stream response, or 404 for an unknown job.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job ID."}), 404
+    log = jobs.events(job_id)
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    except ValueError:
+        after = 0
+    
+    def stream():
+        if log is None:
+            # No events here: the job finished long ago, or another worker runs it; follow its status instead
+            current, reported, idle = job, None, 0.0
+            while current["status"] in (QUEUED, RUNNING):
+                if current["status"] != reported:
+                    reported = current["status"]
+                    yield format_sse(None, "status", {"status": reported, "url": current["url"]})
+                    idle = 0.0
+                elif idle >= SSE_KEEPALIVE:
+                    yield ": keep-alive\n\n"
+                    idle = 0.0
+                time.sleep(SSE_POLL_INTERVAL)
+                idle += SSE_POLL_INTERVAL
+                latest = jobs.get(job_id)
+                if latest is None:
+                    break
+                current = latest
+            yield format_sse(None, "done", {"status": current["status"], "error": current["error"]})
+            return
+        last = after
+        while True:
+            events, gap = log.read(last, timeout=SSE_KEEPALIVE)
+            if gap:
+                yield format_sse(None, "gap", {})
+            for event_id, event, data in events:
+                yield format_sse(event_id, event, data)
+                last = event_id
+            if not events:
+                if log.closed:
+                    return
+                yield ": keep-alive\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Return a finished job's results as JSON.
+    
+    Returns:
+        Response: Pipeline result, 202 while the job is still running, or 404/500.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job ID."}), 404
+    if job["status"] in (QUEUED, RUNNING):
+        return jsonify({"id": job_id, "status": job["status"]}), 202
+    if job["status"] == FAILED:
+        return jsonify({"id": job_id, "status": job["status"], "error": job["error"]}), 500
+    return jsonify(job["result"])
+
+def run_batch(spec_json):
+    """Crawl and analyze a set of pages described by a batch spec.
+    
+    Args:
+        spec_json (str): Canonical JSON with one of 'sitemap', 'seed' or 'urls',
+            plus optional 'depth' and 'max_pages'.
+    
+    Returns:
+        dict: Output directory and site-level summary.
+    """
+    spec = json.loads(spec_json)
+    if spec.get("sitemap"):
+        seeds = load_sitemap(spec["sitemap"])
+    elif spec.get("seed"):
+        seeds = [spec["seed"]]
+    else:
+        seeds = spec["urls"]
+    depth = spec.get("depth", 2 if spec.get("seed") else 0)
+    # Same spec, same directory: resubmitting resumes an interrupted batch
+    output_dir = os.path.join(BATCH_DIR, hashlib.sha1(spec_json.encode("utf-8")).hexdigest()[:16])
+    summary = crawl_site(seeds, output_dir, max_depth=depth, max_pages=spec.get("max_pages"))
+    return {"output_dir": output_dir, "summary": summary}
+
+batch_jobs = JobQueue(run_batch, workers=1)
+
+def validate_batch_spec(spec):
+    """Check a batch spec from a request and apply the server-side limits.
+    
+    Args:
+        spec (dict): Decoded request body.
+    
+    Returns:
+        tuple: (spec, error): the spec reduced to known keys with 'max_pages'
+            defaulting to BATCH_DEFAULT_PAGES, and None; or None and an error message.
+    """
+    def is_http(value):
+        return isinstance(value, str) and value.startswith(('http://', 'https://'))
+    
+    def is_count(value, limit):
+        return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= limit
+    
+    if not (spec.get("sitemap") or spec.get("seed") or isinstance(spec.get("urls"), list)):
+        return None, "Provide 'sitemap', 'seed' or a 'urls' list."
+    for key in ("sitemap", "seed"):
+        if key in spec and not is_http(spec[key]):
+            return None, f"'{key}' must be an http(s) URL."
+    if "urls" in spec and not (isinstance(spec["urls"], list) and all(is_http(url) for url in spec["urls"])):
+        return None, "'urls' must be a list of http(s) URLs."
+    if "depth" in spec and not is_count(spec["depth"], BATCH_MAX_DEPTH):
+        return None, f"'depth' must be an integer from 0 to {BATCH_MAX_DEPTH}."
+    if "max_pages" in spec and not is_count(spec["max_pages"], BATCH_MAX_PAGES):
+        return None, f"'max_pages' must be an integer from 0 to {BATCH_MAX_PAGES}."
+    spec = {key: spec[key] for key in ("sitemap", "seed", "urls", "depth", "max_pages") if key in spec}
+    spec.setdefault("max_pages", BATCH_DEFAULT_PAGES)
+    return spec, None
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Queue a batch crawl of a sitemap, a seed URL or a URL list.
+    
+    Returns:
+        Response: Batch job ID as JSON (202), or 400 for an invalid spec.
+    """
+    spec = request.get_json(silent=True)
+    spec, error = validate_batch_spec(spec if isinstance(spec, dict) else {})
+    if error:
+        return jsonify({"error": error}), 400
+    job_id = batch_jobs.submit(json.dumps(spec, sort_keys=True))
+    return jsonify({"job_id": job_id, "status_url": url_for('batch_status', job_id=job_id)}), 202
+
+@app.route('/batch/<job_id>')
+def batch_status(job_id):
+    """Report a batch job's status, and its summary once finished.
+    
+    Returns:
+        Response: Batch job status as JSON.
+    """
+    job = batch_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job ID."}), 404
+    return jsonify({"id": job["id"], "spec": json.loads(job["url"]), "status": job["status"],
+                    "error": job["error"], "result": job["result"]})
+
+@app.route('/metrics')
+def metrics():
+    """Expose stage timings and pipeline counters for Prometheus.
+    
+    Returns:
+        Response: Metrics in the Prometheus text exposition format.
+    """
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     logger.info("Starting Flask application")
@@ -0,0 +1,62 @@
+import argparse
+import json
+import logging
+import os
+import time
+from backend.batch_runner import collect_targets, run_batch_shards, merge_shards, load_manifest, MANIFEST_FILE, SHARD_SIZE, PAGE_CONCURRENCY, SHARD_RETRIES
+from backend.crawler import BATCH_DIR
+
+# Configure logging for the batch runner
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command-line options.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Analyze and revise many URLs or local HTML files on all cores.")
+    parser.add_argument("inputs", nargs="*", help="URLs, HTML files, or directories of HTML files")
+    parser.add_argument("--url-list", help="Text file with one URL or file path per line")
+    parser.add_argument("--sitemap", help="URL of a sitemap.xml (or sitemap index)")
+    parser.add_argument("--output", help="Output directory; rerun with the same directory to resume or retry shards")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Pages per shard")
+    parser.add_argument("--concurrency", type=int, default=PAGE_CONCURRENCY, help="Pages in flight per worker")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between requests to one host")
+    parser.add_argument("--retries", type=int, default=SHARD_RETRIES, help="Retries per failed shard")
+    parser.add_argument("--no-revise", action="store_true", help="Only analyze; skip revised text")
+    parser.add_argument("--merge-only", action="store_true", help="Merge the completed shards of --output and exit")
+    parser.add_argument("--verbose", action="store_true", help="Log every page instead of showing progress only")
+    return parser.parse_args()
+
+def main():
+    """Run a sharded batch from the command line."""
+    args = parse_args()
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.merge_only:
+        if not args.output:
+            raise SystemExit("--merge-only needs --output")
+        if not os.path.exists(os.path.join(args.output, MANIFEST_FILE)):
+            raise SystemExit(f"No batch to merge in {args.output}: {MANIFEST_FILE} is missing.")
+        manifest = load_manifest(args.output, [], args.shard_size)
+        shards = -(-len(manifest["targets"]) // manifest["shard_size"])
+        print(json.dumps(merge_shards(args.output, shards), indent=4))
+        return
+
+    output_dir = args.output or os.path.join(BATCH_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    targets = collect_targets(args.inputs, args.url_list, args.sitemap)
+    resuming = os.path.exists(os.path.join(output_dir, MANIFEST_FILE))
+    if not targets and not resuming:
+        raise SystemExit("No URLs or HTML files to process.")
+    logger.info(f"Processing {len(targets)} targets into {output_dir}" if targets else f"Resuming batch in {output_dir}")
+
+    summary = run_batch_shards(targets, output_dir, workers=args.workers, shard_size=args.shard_size,
+                               concurrency=args.concurrency, delay=args.delay, revise=not args.no_revise,
+                               retries=args.retries)
+    print(json.dumps(summary, indent=4))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark text extraction on deeply nested documentation HTML.
+
+Compares the single-pass block extractor in backend.doc_context with the
+previous find_all/get_text approach, which re-emitted the text of every
+nested div and span. Reports extracted size relative to the page's real
+text (blowup) and extraction time, and writes the results as JSON.
+
+Usage:
+    python benchmarks/bench_extraction.py [--output benchmarks/results/extraction.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from backend.doc_context import find_content, extract_blocks
+
+def nested_page(depth, sections=20):
+    """Build a documentation-like page whose paragraphs sit inside `depth` nested divs/spans.
+
+    Args:
+        depth (int): Wrapper elements around each paragraph.
+        sections (int): Number of heading/paragraph sections.
+
+    Returns:
+        tuple: (html, unique_text_chars).
+    """
+    parts = []
+    unique = 0
+    for i in range(sections):
+        heading = f"Section {i} overview"
+        paragraph = f"Users can configure campaign {i} settings to reach the right audience at the right time."
+        unique += len(heading) + len(paragraph)
+        inner = f"<p>{paragraph}</p>"
+        for level in range(depth):
+            tag = "div" if level % 2 else "span"
+            inner = f"<{tag} class='wrap-{level}'>{inner}</{tag}>"
+        parts.append(f"<h2>{heading}</h2>{inner}")
+    html = "<html><body><article>" + "".join(parts) + "</article></body></html>"
+    return html, unique
+
+def legacy_extract(soup):
+    """The pre-block extractor: joins get_text over every matching element."""
+    content = find_content(soup)
+    text = ' '.join(p.get_text(strip=True) for p in content.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'span', 'div']) if p.get_text(strip=True))
+    return re.sub(r'\s+', ' ', text).strip()
+
+def block_extract(soup):
+    """The single-pass block extractor."""
+    return ' '.join(block["text"] for block in extract_blocks(find_content(soup)))
+
+def measure(extract, html, unique, repeat):
+    """Time an extractor and measure its output size.
+
+    Returns:
+        dict: Mean seconds per extraction, extracted characters and blowup ratio.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = extract(soup)
+    elapsed = (time.perf_counter() - start) / repeat
+    return {"seconds": round(elapsed, 6), "chars": len(text), "blowup": round(len(text) / unique, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "extraction.json"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for depth in (1, 4, 8, 16, 32):
+        html, unique = nested_page(depth)
+        start = time.perf_counter()
+        BeautifulSoup(html, 'html.parser')
+        parse_seconds = time.perf_counter() - start
+        row = {
+            "depth": depth,
+            "html_bytes": len(html),
+            "unique_text_chars": unique,
+            "parse_seconds": round(parse_seconds, 6),
+            "legacy": measure(legacy_extract, html, unique, args.repeat),
+            "blocks": measure(block_extract, html, unique, args.repeat)
+        }
+        results.append(row)
+        print(f"depth={depth:>3}  legacy blowup={row['legacy']['blowup']:>6}x {row['legacy']['seconds']*1000:8.2f} ms  "
+              f"blocks blowup={row['blocks']['blowup']:>5}x {row['blocks']['seconds']*1000:8.2f} ms")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({"benchmark": "extraction", "results": results}, f, indent=4)
+    print(f"Results saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark HTML parser backends on large documentation pages.
+
+Times DocumentContext.from_html (parse, structure counts, links and
+content extraction) with each backend on the saved pages in
+benchmarks/fixtures/pages, plus a synthetic page made by repeating the
+largest one --scale times. BeautifulSoup with lxml's tree builder is
+included for comparison. Every backend's text, blocks, structure counts and
+links are checked against the html.parser backend. Results (median
+seconds, MB/s and speedup per page) are written as JSON.
+
+Usage:
+    python benchmarks/bench_parser.py [--repeat 5] [--scale 10] [--output benchmarks/results/parser.json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "fixtures", "pages")
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+from backend.doc_context import DocumentContext, count_structure, find_content, extract_blocks, text_from_blocks
+
+def bs4_lxml(url, html):
+    """The html.parser pipeline with BeautifulSoup's lxml tree builder instead."""
+    doc = DocumentContext(url, html=html)
+    doc.soup = BeautifulSoup(html, 'lxml')
+    doc.structure = count_structure(doc.soup)
+    doc.links = [a['href'] for a in doc.soup.find_all('a', href=True)]
+    content = find_content(doc.soup)
+    doc.text, doc.error, doc.blocks = text_from_blocks(extract_blocks(content) if content else None)
+    return doc
+
+BACKENDS = {
+    "html.parser": lambda url, html: DocumentContext.from_html(url, html, parser="html.parser"),
+    "bs4+lxml": bs4_lxml,
+    "lxml": lambda url, html: DocumentContext.from_html(url, html, parser="lxml"),
+}
+
+def load_pages(scale):
+    """Read the fixture pages and build the scaled synthetic page.
+
+    Args:
+        scale (int): Copies of the largest page's body in the synthetic page (0 to skip it).
+
+    Returns:
+        dict: Page name to HTML.
+    """
+    pages = {}
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+                pages[name] = f.read()
+    if scale:
+        largest = max(pages.values(), key=len)
+        head, body, tail = re.split(r'(?s)<body>|</body>', largest)
+        pages[f"scaled_x{scale}"] = head + "<body>" + body * scale + "</body>" + tail
+    return pages
+
+def fingerprint(doc):
+    """Everything the rest of the pipeline reads from a parsed page."""
+    return doc.text, doc.blocks, doc.structure, doc.links
+
+def time_backend(backend, html, repeat):
+    """Median seconds of one backend on one page."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend("http://localhost/", html)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "parser.json"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    mismatches = 0
+    for name, html in load_pages(args.scale).items():
+        reference = fingerprint(BACKENDS["html.parser"]("http://localhost/", html))
+        mb = len(html.encode("utf-8")) / 1e6
+        row = {"bytes": len(html.encode("utf-8"))}
+        for backend_name, backend in BACKENDS.items():
+            backend("http://localhost/", html)  # Warm-up
+            seconds = time_backend(backend, html, args.repeat)
+            matches = fingerprint(backend("http://localhost/", html)) == reference
+            mismatches += not matches
+            row[backend_name] = {"median": round(seconds, 6), "mb_per_s": round(mb / seconds, 2), "matches": matches}
+        for backend_name in BACKENDS:
+            row[backend_name]["speedup"] = round(row["html.parser"]["median"] / row[backend_name]["median"], 2)
+        results[name] = row
+        print(f"{name:<22} {mb:6.2f} MB  " + "  ".join(
+            f"{b} {row[b]['median'] * 1000:8.1f} ms ({row[b]['speedup']:4.1f}x{'' if row[b]['matches'] else ' MISMATCH'})"
+            for b in BACKENDS))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({"benchmark": "parser", "repeat": args.repeat, "python": sys.version.split()[0],
+                   "results": results}, f, indent=4)
+    print(f"Results saved to {args.output}")
+    if mismatches:
+        print(f"{mismatches} backend outputs differ from html.parser")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
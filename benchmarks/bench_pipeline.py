@@ -0,0 +1,226 @@
+"""Benchmark the pipeline offline against saved pages and a stub Gemini server.
+
+The documentation pages in benchmarks/fixtures/pages (from a 2 KB
+quickstart to a 120 KB API reference and a deeply nested page-builder
+layout) are served from a local HTTP server, and Gemini calls go to
+benchmarks/stub_gemini.py with configurable latency and failure rate, so
+no live URL or API key is needed and runs are comparable between commits.
+
+Suites:
+    fetch                   fetch_article_content over HTTP (download, parse, extract)
+    analyze_<dimension>     each analyze_* function on a freshly parsed page
+    apply_suggestions       rule-based rewrites and batched simplification
+    analyze_route           POST /analyze through to a finished job
+
+The Gemini response cache is cleared before every timed run unless --warm
+is given. Results (min/median/mean/p95 seconds and Gemini requests per run
+for each suite and page, plus the commit they were measured on) are
+written as JSON; compare two result files with benchmarks/compare_results.py.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--repeat 5] [--latency 0.05] [--failure-rate 0.0]
+        [--suite fetch --suite analyze_route ...] [--warm] [--output benchmarks/results/pipeline.json]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "fixtures", "pages")
+sys.path.insert(0, ROOT)
+
+from stub_gemini import StubGemini
+
+# Suggestions that switch on every revision step (the revision agent's fallback set)
+SUGGESTIONS = {
+    "readability": {"suggestions": [
+        "Simplify sentences, e.g., replace 'utilize' with 'use'.",
+        "Break sentences longer than 15 words into shorter ones."
+    ]},
+    "style": {"suggestions": [
+        "Use second-person pronouns, e.g., 'You can' instead of 'Users can'.",
+        "Replace jargon with simpler terms.",
+        "Shorten complex sentences."
+    ]}
+}
+SUITES = ["fetch", "analyze_readability", "analyze_structure", "analyze_completeness", "analyze_style",
+          "apply_suggestions", "analyze_route"]
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_pages(directory=PAGES_DIR):
+    """Serve the fixture pages on a free local port.
+
+    Returns:
+        tuple: (server, base URL ending in '/').
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+def git_commit():
+    """Return the short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def summarize(samples, requests):
+    """Summarize the timings of one suite on one page.
+
+    Args:
+        samples (list): Seconds per run.
+        requests (int): Gemini requests the stub received across all runs.
+
+    Returns:
+        dict: min, median, mean and p95 seconds, the run count and Gemini requests per run.
+    """
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 6),
+        "median": round(statistics.median(ordered), 6),
+        "mean": round(statistics.mean(ordered), 6),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 6),
+        "runs": len(ordered),
+        "gemini_requests": round(requests / len(ordered), 2)
+    }
+
+def measure(run, setup, repeat, stub, warm):
+    """Time a callable repeatedly, preparing its input outside the timed region.
+
+    One untimed warm-up run comes first, so lazy imports and connection
+    setup are not charged to the first sample.
+
+    Args:
+        run (callable): Function taking setup()'s result.
+        setup (callable): Builds the input of one run.
+        repeat (int): Timed runs.
+        stub (StubGemini): Stub server, for counting Gemini requests.
+        warm (bool): Keep the Gemini response cache between runs.
+
+    Returns:
+        dict: Summary from summarize().
+    """
+    from backend.llm_cache import get_cache
+    samples = []
+    run(setup())
+    stub.reset()
+    for _ in range(repeat):
+        if not warm:
+            get_cache().clear()
+        value = setup()
+        start = time.perf_counter()
+        run(value)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, stub.requests)
+
+def run_job(client, url):
+    """Submit a URL to /analyze and wait for the job to finish.
+
+    Args:
+        client (FlaskClient): Test client of the Flask app.
+        url (str): Page URL.
+    """
+    response = client.post("/analyze", json={"url": url}, headers={"Accept": "application/json"})
+    status_url = response.get_json()["status_url"]
+    while client.get(status_url).get_json()["status"] not in ("done", "failed"):
+        time.sleep(0.005)
+
+def run_suites(suites, pages, base_url, repeat, stub, warm):
+    """Run the selected suites over every fixture page.
+
+    Returns:
+        dict: {suite: {page: summary}}.
+    """
+    from backend.doc_context import DocumentContext
+    from backend import doc_analyzer
+    from backend.doc_revision import apply_suggestions
+
+    html = {}
+    for page in pages:
+        with open(os.path.join(PAGES_DIR, page), encoding="utf-8") as f:
+            html[page] = f.read()
+    parsed = lambda page: lambda: DocumentContext.from_html(base_url + page, html[page])
+
+    results = {}
+    for suite in suites:
+        results[suite] = {}
+        for page in pages:
+            url = base_url + page
+            if suite == "fetch":
+                row = measure(lambda _: doc_analyzer.fetch_article_content(url), lambda: None, repeat, stub, warm)
+            elif suite.startswith("analyze_") and suite != "analyze_route":
+                row = measure(getattr(doc_analyzer, suite), parsed(page), repeat, stub, warm)
+            elif suite == "apply_suggestions":
+                text = parsed(page)().text
+                row = measure(lambda text: apply_suggestions(text, SUGGESTIONS), lambda: text, repeat, stub, warm)
+            else:
+                import app
+                client = app.app.test_client()
+                row = measure(lambda _: run_job(client, url), lambda: None, repeat, stub, warm)
+            results[suite][page] = row
+            print(f"{suite:<22} {page:<22} median {row['median'] * 1000:9.1f} ms  "
+                  f"p95 {row['p95'] * 1000:9.1f} ms  gemini {row['gemini_requests']:6.1f}/run")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "pipeline.json"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub Gemini latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of stub requests answered with 503")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--page", action="append", help="Fixture page to use (repeatable; default: all)")
+    parser.add_argument("--warm", action="store_true", help="Keep the Gemini response cache between runs")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    stub = StubGemini(args.latency, args.jitter, args.failure_rate).start()
+    os.environ["GEMINI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("FETCH_CACHE_TTL", "0")  # Time real fetches, not the shared fetch cache
+    pages_server, base_url = serve_pages()
+    pages = args.page or sorted(name for name in os.listdir(PAGES_DIR) if name.endswith(".html"))
+
+    # Caches and run outputs go to a scratch directory, not the checkout's Output/
+    workdir = tempfile.mkdtemp(prefix="docagent-bench-")
+    os.chdir(workdir)
+    logging.disable(logging.WARNING)
+    try:
+        results = run_suites(args.suite or SUITES, pages, base_url, args.repeat, stub, args.warm)
+    finally:
+        logging.disable(logging.NOTSET)
+        pages_server.shutdown()
+        stub.stop()
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "benchmark": "pipeline",
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "config": {"repeat": args.repeat, "latency": args.latency, "jitter": args.jitter,
+                       "failure_rate": args.failure_rate, "warm_cache": args.warm},
+            "page_bytes": {page: os.path.getsize(os.path.join(PAGES_DIR, page)) for page in pages},
+            "results": results
+        }, f, indent=4)
+    print(f"Results saved to {output}")
+
+if __name__ == '__main__':
+    main()
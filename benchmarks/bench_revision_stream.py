@@ -0,0 +1,135 @@
+"""Benchmark streaming revision against apply_suggestions on very large pages.
+
+The text of the largest fixture page is repeated --scale times and revised
+with every revision step switched on, against the stub Gemini server:
+
+    apply_suggestions   segment the whole text, revise it step by step, then write the output files
+    stream              iter_sentences -> stream_suggestions -> write_revision (keep_text=False)
+
+For each scale the script records wall time, time to the first revised
+sentence, and peak Python memory allocated during the run (tracemalloc, in
+a separate pass because tracing slows the run down). Both modes must write
+the same revised text. Results are written as JSON.
+
+Usage:
+    python benchmarks/bench_revision_stream.py [--scale 1 --scale 5 --scale 20] [--latency 0.0]
+        [--output benchmarks/results/revision_stream.json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "fixtures", "pages")
+sys.path.insert(0, ROOT)
+
+from stub_gemini import StubGemini
+from bench_pipeline import SUGGESTIONS, git_commit
+
+def load_text(scale):
+    """Return the largest fixture page's text repeated scale times."""
+    from backend.doc_context import DocumentContext
+    pages = [os.path.join(PAGES_DIR, name) for name in os.listdir(PAGES_DIR) if name.endswith(".html")]
+    with open(max(pages, key=os.path.getsize), encoding="utf-8") as f:
+        text = DocumentContext.from_html("http://localhost/", f.read()).text
+    return ' '.join([text] * scale)
+
+def run_materialized(text, run_id, first):
+    """Revise the whole text with apply_suggestions, then write both files."""
+    from backend.doc_revision import apply_suggestions, render_markdown
+    from backend.run_store import get_run_store
+    revised = apply_suggestions(text, SUGGESTIONS)
+    first.append(time.perf_counter())  # Nothing is available before the whole text is revised
+    store = get_run_store()
+    store.write_text(run_id, "revised_content.md", render_markdown(revised))
+    store.write_text(run_id, "revised_content.txt", revised)
+
+def run_stream(text, run_id, first):
+    """Stream the text through the revision stages into both files."""
+    from backend.doc_revision import iter_sentences, stream_suggestions, write_revision
+
+    def pieces():
+        for sentence in stream_suggestions(iter_sentences(text), SUGGESTIONS):
+            if not first:
+                first.append(time.perf_counter())
+            yield sentence
+    write_revision(pieces(), run_id, keep_text=False)
+
+MODES = {"apply_suggestions": run_materialized, "stream": run_stream}
+
+def measure(mode, text, run_id, trace):
+    """Run one mode once.
+
+    Returns:
+        dict: 'seconds', 'first_output' (seconds) and, when traced, 'peak_mb'.
+    """
+    from backend.llm_cache import get_cache
+    get_cache().clear()
+    first = []
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    MODES[mode](text, run_id, first)
+    seconds = time.perf_counter() - start
+    result = {"seconds": round(seconds, 4), "first_output": round(first[0] - start, 4) if first else None}
+    if trace:
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "revision_stream.json"))
+    parser.add_argument("--scale", type=int, action="append", help="Copies of the page text (repeatable; default: 1, 5, 20)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub Gemini latency in seconds")
+    args = parser.parse_args()
+    scales = args.scale or [1, 5, 20]
+    output = os.path.abspath(args.output)
+
+    stub = StubGemini(latency=args.latency).start()
+    os.environ["GEMINI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    workdir = tempfile.mkdtemp(prefix="docagent-bench-")
+    os.chdir(workdir)
+    logging.disable(logging.WARNING)
+    from backend.run_store import get_run_store
+
+    results = {}
+    mismatches = 0
+    try:
+        for scale in scales:
+            text = load_text(scale)
+            row = {"chars": len(text)}
+            outputs = {}
+            for mode in MODES:
+                run_id = f"{mode}-{scale}"
+                row[mode] = measure(mode, text, run_id, trace=False)
+                row[mode].update({k: v for k, v in measure(mode, text, run_id, trace=True).items() if k == "peak_mb"})
+                with open(get_run_store().path(run_id, "revised_content.txt"), encoding="utf-8") as f:
+                    outputs[mode] = f.read()
+            row["matches"] = len(set(outputs.values())) == 1
+            mismatches += not row["matches"]
+            results[f"x{scale}"] = row
+            print(f"x{scale:<4} {len(text) / 1e6:6.2f} MB text  " + "  ".join(
+                f"{mode} {row[mode]['seconds']:6.2f}s first {row[mode]['first_output']:6.2f}s peak {row[mode]['peak_mb']:7.1f} MB"
+                for mode in MODES) + ("" if row["matches"] else "  MISMATCH"))
+    finally:
+        logging.disable(logging.NOTSET)
+        stub.stop()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"benchmark": "revision_stream", "commit": git_commit(), "latency": args.latency,
+                   "python": sys.version.split()[0], "results": results}, f, indent=4)
+    print(f"Results saved to {output}")
+    if mismatches:
+        print(f"{mismatches} scales wrote different text in the two modes")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark cross-worker coordination of Gemini calls with each shared-state backend.
+
+Several worker processes, each with a few threads, ask the stub Gemini
+server for the same set of prompts at the same time, the way gunicorn
+workers handling the same pages would. For every backend the script
+records wall time, requests that reached the stub (ideally one per
+distinct prompt: the rest should be served by single-flight and the
+shared cache) and the request rate against the configured rate limit,
+which with shared state holds for all workers together:
+
+    memory   per-process state (no coordination between workers)
+    sqlite   SQLite file shared by the processes of one host
+    redis    Redis at --redis-url, or a local fakeredis TCP server when fakeredis is installed
+
+Usage:
+    python benchmarks/bench_shared_state.py [--workers 4] [--threads 4] [--prompts 40] [--latency 0.2]
+        [--redis-url redis://localhost:6379/15] [--output benchmarks/results/shared_state.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_gemini import StubGemini
+from bench_pipeline import git_commit
+
+RATE = 5.0  # Requests per second allowed for all workers together
+BURST = 10
+
+def worker(seed, prompts, threads):
+    """Send every prompt once from a few threads, in a worker-specific order."""
+    import logging
+    logging.disable(logging.WARNING)
+    from backend.llm_client import GeminiClient
+    client = GeminiClient(rate=RATE, burst=BURST)
+    order = list(prompts)
+    random.Random(seed).shuffle(order)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        replies = list(pool.map(lambda text: client.generate("Echo the text.", text), order))
+    return sum(1 for reply in replies if reply)
+
+def run_backend(url, args, stub):
+    """Run all workers against one backend in a fresh working directory."""
+    os.environ["SHARED_STATE_URL"] = url
+    os.chdir(tempfile.mkdtemp(prefix="docagent-bench-"))
+    prompts = [f"Prompt {n}: configure the campaign delivery settings for segment {n}." for n in range(args.prompts)]
+    stub.reset()
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(args.workers) as pool:
+        answered = sum(pool.starmap(worker, [(seed, prompts, args.threads) for seed in range(args.workers)]))
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "calls": args.workers * len(prompts),
+        "answered": answered,
+        "stub_requests": stub.requests,
+        "duplicate_requests": stub.requests - len(prompts),
+        "requests_per_second": round(stub.requests / seconds, 2),
+        "within_rate_limit": stub.requests <= BURST + RATE * seconds + 1
+    }
+
+def start_fake_redis():
+    """Start a fakeredis TCP server on a free port, or return None if fakeredis is not installed."""
+    try:
+        from fakeredis import TcpFakeServer
+    except ImportError:
+        return None
+    server = TcpFakeServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "shared_state.json"))
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker")
+    parser.add_argument("--prompts", type=int, default=40, help="Distinct prompts every worker sends")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub Gemini latency in seconds")
+    parser.add_argument("--redis-url", help="Redis to test against (default: a local fakeredis server)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    stub = StubGemini(latency=args.latency).start()
+    os.environ["GEMINI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    backends = {"memory": "memory://", "sqlite": ""}
+    redis_url = args.redis_url or start_fake_redis()
+    if redis_url:
+        backends["redis"] = redis_url
+    else:
+        print("Skipping redis: pass --redis-url or install fakeredis")
+
+    results = {}
+    try:
+        for name, url in backends.items():
+            row = run_backend(url, args, stub)
+            results[name] = row
+            print(f"{name:<7} {row['seconds']:6.2f}s  {row['stub_requests']:4} requests for {args.prompts} prompts "
+                  f"({row['duplicate_requests']} duplicates)  {row['requests_per_second']:5.2f}/s "
+                  f"{'within' if row['within_rate_limit'] else 'OVER'} the {RATE:g}/s limit")
+    finally:
+        stub.stop()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"benchmark": "shared_state", "commit": git_commit(), "workers": args.workers,
+                   "threads": args.threads, "prompts": args.prompts, "latency": args.latency,
+                   "rate_limit": RATE, "burst": BURST, "python": sys.version.split()[0], "results": results}, f, indent=4)
+    print(f"Results saved to {output}")
+
+if __name__ == '__main__':
+    main()
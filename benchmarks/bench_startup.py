@@ -0,0 +1,99 @@
+"""Benchmark worker cold start: import time and resident memory.
+
+Each measurement runs in a fresh interpreter, as a new gunicorn worker
+would. For every target module the child process records the wall time of
+the import, RSS after the import, and the time and RSS after a first
+request-like use (parse a page, segment it and score readability), which
+is where lazily imported dependencies are now paid for. A bare interpreter
+is measured as the baseline. Results are written as JSON.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--output benchmarks/results/startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ["backend.doc_analyzer", "backend.doc_revision", "backend.crawler", "app"]
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+baseline_rss = rss_kb()
+import_start = time.perf_counter()
+{import_line}
+import_seconds = time.perf_counter() - import_start
+import_rss = rss_kb()
+result = {{"import_seconds": import_seconds, "baseline_rss_kb": baseline_rss, "import_rss_kb": import_rss,
+          "modules_loaded": len(sys.modules)}}
+if {first_use}:
+    use_start = time.perf_counter()
+    from backend.doc_context import DocumentContext
+    from backend.readability import readability_metrics
+    html = "<html><body><article><h1>Setup</h1>" + "<p>Users can configure campaigns. Segments update daily.</p>" * 50 + "</article></body></html>"
+    readability_metrics(DocumentContext.from_html("http://localhost/", html).segments)
+    result["first_use_seconds"] = time.perf_counter() - use_start
+    result["first_use_rss_kb"] = rss_kb()
+print(json.dumps(result))
+"""
+
+def run_child(module, first_use):
+    """Measure one cold start in a fresh interpreter.
+
+    Args:
+        module (str): Module to import, or None for a bare interpreter.
+        first_use (bool): Also exercise parsing, segmentation and scoring.
+
+    Returns:
+        dict: Measurements reported by the child process.
+    """
+    import_line = f"import {module}" if module else "pass"
+    code = CHILD.format(root=ROOT, import_line=import_line, first_use=first_use)
+    env = dict(os.environ, NLTK_AUTO_DOWNLOAD="0")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(samples):
+    """Median of every numeric field across runs."""
+    return {key: round(statistics.median(s[key] for s in samples), 4) for key in samples[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "startup.json"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"baseline": summarize([run_child(None, False) for _ in range(args.runs)])}
+    print(f"{'baseline':<22} import {0:8.1f} ms  rss {results['baseline']['import_rss_kb'] / 1024:6.1f} MB")
+    for module in TARGETS:
+        row = summarize([run_child(module, True) for _ in range(args.runs)])
+        results[module] = row
+        print(f"{module:<22} import {row['import_seconds'] * 1000:8.1f} ms  rss {row['import_rss_kb'] / 1024:6.1f} MB  "
+              f"first use {row['first_use_seconds'] * 1000:8.1f} ms  rss {row['first_use_rss_kb'] / 1024:6.1f} MB")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({"benchmark": "startup", "runs": args.runs, "python": sys.version.split()[0], "results": results}, f, indent=4)
+    print(f"Results saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare two bench_pipeline.py result files and flag regressions.
+
+For every suite and page present in both files the median times are
+compared; a case is a regression when the new median is slower than the
+baseline by more than the threshold (relative) and the minimum time
+difference (absolute, to ignore noise on sub-millisecond cases). The exit
+status is 1 if any case regressed, so this can gate a CI job.
+
+Usage:
+    python benchmarks/compare_results.py BASELINE.json NEW.json [--threshold 0.10] [--min-delta 0.002]
+"""
+import argparse
+import json
+import sys
+
+def load(path):
+    """Read a result file.
+
+    Returns:
+        dict: Parsed results.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline, new, threshold, min_delta):
+    """Compare median times case by case.
+
+    Args:
+        baseline (dict): Results of the reference commit.
+        new (dict): Results to check.
+        threshold (float): Relative slowdown that counts as a regression (0.10 = 10%).
+        min_delta (float): Seconds a slowdown must also exceed.
+
+    Returns:
+        list: Rows of (suite, page, baseline median, new median, change, regressed).
+    """
+    rows = []
+    for suite, pages in new["results"].items():
+        for page, row in pages.items():
+            before = baseline["results"].get(suite, {}).get(page)
+            if before is None:
+                continue
+            change = (row["median"] - before["median"]) / before["median"] if before["median"] else 0.0
+            regressed = change > threshold and row["median"] - before["median"] > min_delta
+            rows.append((suite, page, before["median"], row["median"], change, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--min-delta", type=float, default=0.002)
+    args = parser.parse_args()
+
+    baseline, new = load(args.baseline), load(args.new)
+    if baseline.get("config") != new.get("config"):
+        print(f"Warning: configurations differ ({baseline.get('config')} vs {new.get('config')})")
+    rows = compare(baseline, new, args.threshold, args.min_delta)
+    print(f"{'suite':<22} {'page':<22} {baseline.get('commit') or 'baseline':>10} {new.get('commit') or 'new':>10}  change")
+    for suite, page, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{suite:<22} {page:<22} {before * 1000:8.1f}ms {after * 1000:8.1f}ms  {change:+7.1%}{flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{len(rows)} cases compared, {regressions} regressions")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Check the vectorized readability engine against textstat and measure throughput.
+
+Scores every text in benchmarks/fixtures/readability with backend.readability
+and with textstat, compares each metric within a tolerance, and times textstat,
+the single-document engine and the batch engine over the corpus. Exits with
+status 1 if any metric is outside its tolerance, so it can gate changes to the
+engine.
+
+Gunning Fog gets the widest tolerance: textstat counts difficult words against
+its easy-word list, while the engine counts every word of three or more
+syllables as the formula defines it.
+
+Usage:
+    python benchmarks/readability_parity.py [--output benchmarks/results/readability.json]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import textstat
+from backend.segmentation import SegmentedText
+from backend.readability import readability_metrics, readability_batch
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "readability")
+
+# Allowed absolute difference from textstat per metric (grade levels)
+TOLERANCES = {
+    "flesch_kincaid": 0.5,
+    "gunning_fog": 2.0,
+    "smog": 0.5,
+    "coleman_liau": 1.0
+}
+
+def textstat_scores(text):
+    """Score a text with textstat, the reference implementation.
+
+    textstat memoizes whole-text results; set_lang clears those caches so
+    repeated runs time real work.
+    """
+    textstat.set_lang("en_US")
+    return {
+        "flesch_kincaid": textstat.flesch_kincaid_grade(text),
+        "gunning_fog": textstat.gunning_fog(text),
+        "smog": textstat.smog_index(text),
+        "coleman_liau": textstat.coleman_liau_index(text)
+    }
+
+def timed(func, repeat):
+    """Return the mean seconds of func() over repeat runs."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "readability.json"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    texts = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.txt"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            texts[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    if not texts:
+        print(f"No fixtures found in {FIXTURE_DIR}")
+        sys.exit(1)
+
+    segmented = {name: SegmentedText(text) for name, text in texts.items()}
+    batch = dict(zip(segmented, readability_batch(list(segmented.values()))))
+    documents = []
+    failures = 0
+    for name, text in texts.items():
+        engine = readability_metrics(segmented[name])
+        reference = textstat_scores(text)
+        diffs = {metric: round(abs(engine[metric] - reference[metric]), 2) for metric in TOLERANCES}
+        failed = [metric for metric, diff in diffs.items() if diff > TOLERANCES[metric]]
+        if batch[name] != engine:
+            failed.append("batch")
+        failures += len(failed)
+        documents.append({"name": name, "engine": engine, "textstat": reference, "diff": diffs, "failed": failed})
+        print(f"{name:<20} " + "  ".join(f"{metric}={engine[metric]:>6} ({diffs[metric]:+.2f})" for metric in TOLERANCES)
+              + ("  FAIL: " + ", ".join(failed) if failed else ""))
+
+    corpus = list(texts.values())
+    timings = {
+        "textstat": timed(lambda: [textstat_scores(text) for text in corpus], args.repeat),
+        "engine_single": timed(lambda: [readability_metrics(text) for text in corpus], args.repeat),
+        "engine_batch": timed(lambda: readability_batch(corpus), args.repeat),
+        "engine_presegmented": timed(lambda: readability_batch(list(segmented.values())), args.repeat)
+    }
+    words = sum(s.word_count for s in segmented.values())
+    throughput = {name: round(words / seconds) for name, seconds in timings.items()}
+    for name, value in throughput.items():
+        print(f"{name:<20} {value:>10} words/s")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            "benchmark": "readability",
+            "tolerances": TOLERANCES,
+            "documents": documents,
+            "corpus_words": words,
+            "words_per_second": throughput,
+            "passed": failures == 0
+        }, f, indent=4)
+    print(f"Results saved to {args.output}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Local stand-in for the Gemini generateContent API, for offline benchmarks.
+
+The stub answers every POST to /v1beta/models/<model>:generateContent by
+echoing the input text that follows the prompt (so numbered batch prompts
+get numbered replies), with usageMetadata token counts. Latency (also per
+model, to stand in for faster and slower models), jitter and a failure
+rate (or a number of leading failures) are configurable; failed requests
+get the configured HTTP status, and optionally a Retry-After header, so
+the client's retry path is exercised.
+
+Point the backend at it with GEMINI_BASE_URL, which is what the benchmark
+scripts do. It can also be run on its own for manual testing:
+
+Usage:
+    python benchmarks/stub_gemini.py [--port 8081] [--latency 0.2] [--jitter 0.05] [--failure-rate 0.1]
+        [--model-latency gemini-1.5-flash-8b=0.05] [--fail-first 2] [--retry-after 1]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubGemini:
+    """Threaded stub Gemini server.
+
+    Args:
+        latency (float): Seconds every request takes before it is answered.
+        jitter (float): Extra random delay of up to this many seconds.
+        failure_rate (float): Share of requests (0-1) answered with failure_status.
+        failure_status (int): HTTP status of failed requests (503 and 429 are retried by the client).
+        seed (int): Random seed, so runs are repeatable.
+        port (int): Port to listen on (0 picks a free one).
+        model_latency (dict): Latency of requests to particular models, instead of latency.
+        fail_first (int): Number of requests, from the start or the last reset, that fail regardless of failure_rate.
+        retry_after (int): Retry-After seconds sent with failed requests (None: no header).
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=503, seed=0, port=0,
+                 model_latency=None, fail_first=0, retry_after=None):
+        self.latency = latency
+        self.model_latency = dict(model_latency or {})
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """str: Value for GEMINI_BASE_URL."""
+        return f"http://127.0.0.1:{self._server.server_port}/v1beta"
+
+    def start(self):
+        """Serve requests on a background thread.
+
+        Returns:
+            StubGemini: This server.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        """Zero the request and failure counters."""
+        with self._lock:
+            self.requests = 0
+            self.failures = 0
+
+    def _decide(self, model):
+        """Count a request to a model and draw its delay and whether it fails."""
+        with self._lock:
+            self.requests += 1
+            delay = self.model_latency.get(model, self.latency) + self._random.uniform(0, self.jitter)
+            failed = self.requests <= self.fail_first or self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        return delay, failed
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                model = re.search(r'/models/([^/:]+):', self.path)
+                delay, failed = stub._decide(model.group(1) if model else None)
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    self.send_response(stub.failure_status)
+                    if stub.retry_after is not None:
+                        self.send_header("Retry-After", str(stub.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                sent = body.get("contents", [{}])[0].get("parts", [{}])[0].get("text", "")
+                reply = sent.split("\n\n", 1)[1] if "\n\n" in sent else sent
+                output = json.dumps({
+                    "candidates": [{"content": {"parts": [{"text": reply}]}}],
+                    "usageMetadata": {"promptTokenCount": len(sent) // 4, "candidatesTokenCount": len(reply) // 4}
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(output)))
+                self.end_headers()
+                self.wfile.write(output)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many requests first")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with failed requests")
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="Latency of one model's requests (repeatable)")
+    args = parser.parse_args()
+
+    model_latency = {}
+    for item in args.model_latency:
+        model, _, seconds = item.partition("=")
+        model_latency[model] = float(seconds)
+    stub = StubGemini(args.latency, args.jitter, args.failure_rate, args.failure_status, port=args.port,
+                      model_latency=model_latency, fail_first=args.fail_first, retry_after=args.retry_after)
+    print(f"Stub Gemini listening; set GEMINI_BASE_URL={stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import json
+import logging
+import os
+import time
+from backend.crawler import crawl_site, load_sitemap, load_url_list, BATCH_DIR, CRAWL_CONCURRENCY, HOST_DELAY
+
+# Configure logging for the batch crawler
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command-line options.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Analyze a whole documentation portal.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sitemap", help="URL of a sitemap.xml (or sitemap index)")
+    source.add_argument("--seed", help="Start URL; same-domain links are followed up to --depth")
+    source.add_argument("--url-list", help="Text file with one URL per line")
+    parser.add_argument("--depth", type=int, default=None, help="Link-following depth (default: 2 with --seed, 0 otherwise)")
+    parser.add_argument("--output", help="Output directory; rerun with the same directory to resume")
+    parser.add_argument("--max-pages", type=int, default=None, help="Stop after this many pages")
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY, help="Pages processed at once")
+    parser.add_argument("--delay", type=float, default=HOST_DELAY, help="Seconds between requests to one host")
+    parser.add_argument("--revise", action="store_true", help="Also store revised text for each page")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Use conditional GETs and reuse cached results for unchanged pages and sections")
+    return parser.parse_args()
+
+def main():
+    """Run a batch crawl from the command line."""
+    args = parse_args()
+    if args.sitemap:
+        seeds = load_sitemap(args.sitemap)
+    elif args.url_list:
+        seeds = load_url_list(args.url_list)
+    else:
+        seeds = [args.seed]
+    depth = args.depth if args.depth is not None else (2 if args.seed else 0)
+    output_dir = args.output or os.path.join(BATCH_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    logger.info(f"Crawling {len(seeds)} seed URLs into {output_dir}")
+
+    summary = crawl_site(seeds, output_dir, max_depth=depth, max_pages=args.max_pages,
+                         concurrency=args.concurrency, delay=args.delay, revise=args.revise,
+                         incremental=args.incremental)
+    print(json.dumps(summary, indent=4))
+
+if __name__ == '__main__':
+    main()
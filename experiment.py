@@ -0,0 +1,57 @@
+import argparse
+import json
+import logging
+from backend.experiments import load_variants, load_page, run_experiment, comparison_table
+from backend.doc_analyzer import analyze_documentation
+
+# Configure logging for revision experiments
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command-line options.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compare revision models and prompts on the same page.")
+    parser.add_argument("target", help="URL or local HTML file to revise")
+    parser.add_argument("--model", action="append", default=[], help="Gemini model to compare (repeatable)")
+    parser.add_argument("--variants", help="JSON file with a list of variants (name, model, simplify_prompt, batch_prompt, price)")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Analyze the page first and apply its suggestions (default: every revision step)")
+    parser.add_argument("--warm", action="store_true",
+                        help="Use the shared response cache and sentence memo instead of starting every variant cold")
+    parser.add_argument("--sequential", action="store_true", help="Run the variants one after another")
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON instead of a table")
+    parser.add_argument("--verbose", action="store_true", help="Show backend logs")
+    return parser.parse_args()
+
+def main():
+    """Run a revision experiment from the command line."""
+    args = parse_args()
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    try:
+        variants = load_variants(args.variants, args.model)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Invalid variants: {str(e)}")
+    if not variants:
+        raise SystemExit("Give at least one --model or a --variants file.")
+
+    doc = load_page(args.target)
+    report = None
+    if args.analyze and not doc.error:
+        report = analyze_documentation(doc, save=False)
+        report.pop("run_id", None)
+    experiment = run_experiment(doc, variants, report, cold=not args.warm, parallel=not args.sequential)
+    if experiment.get("error"):
+        raise SystemExit(f"Could not load {args.target}: {experiment['error']}")
+    if args.json:
+        print(json.dumps(experiment, indent=4))
+    else:
+        print(comparison_table(experiment))
+        print(f"\nResults saved to {experiment['output_files'][0]}")
+
+if __name__ == '__main__':
+    main()
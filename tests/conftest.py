@@ -0,0 +1,59 @@
+import functools
+import importlib.util
+import os
+import sys
+import threading
+import types
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# The code imports the Backend/ folder as 'backend'; map the name on case-sensitive filesystems
+if importlib.util.find_spec("backend") is None:
+    backend = types.ModuleType("backend")
+    backend.__path__ = [os.path.join(ROOT, "Backend")]
+    sys.modules["backend"] = backend
+
+@pytest.fixture
+def stub_gemini():
+    """Start a local stub Gemini server (benchmarks/stub_gemini.py) for one test."""
+    from stub_gemini import StubGemini
+    stub = StubGemini().start()
+    yield stub
+    stub.stop()
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def serve():
+    """Serve directories of static pages (with Last-Modified and 304 support) on free local ports.
+
+    Yields:
+        callable: Takes a directory and returns its base URL, ending in '/'.
+    """
+    servers = []
+
+    def start(directory):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(directory)))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Run every test in an empty directory, so caches and outputs land in Output/ under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
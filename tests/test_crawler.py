@@ -0,0 +1,132 @@
+import os
+import json
+import pytest
+import backend.doc_context as doc_context
+import backend.llm_client as llm_client
+import backend.page_cache as page_cache
+import backend.shared_state as shared_state
+from backend.crawler import crawl_site
+from backend.doc_context import DocumentContext, FALLBACK_TEXT
+from backend.llm_cache import ResponseCache
+from backend.llm_client import GeminiClient
+from backend.shared_state import MemoryState
+
+PAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "pages")
+
+SITE = {
+    "index.html": '<html><body><main><h1>Guide</h1><p>Start with the <a href="setup.html">setup</a> page.</p>'
+                  '<p>Then read the <a href="usage.html#first">usage</a> notes or '
+                  '<a href="https://example.com/">the blog</a>.</p></main></body></html>',
+    "setup.html": '<html><body><main><h1>Setup</h1><p>Install the agent and sign in.</p>'
+                  '<p>Go <a href="index.html">back</a>.</p></main></body></html>',
+    "usage.html": '<html><body><main><h1>Usage</h1><p>Open the dashboard to see your reports.</p>'
+                  '<p>See <a href="more.html">more</a>.</p></main></body></html>',
+    "more.html": '<html><body><main><h1>More</h1><p>Too deep to be crawled.</p></main></body></html>',
+}
+
+@pytest.fixture(autouse=True)
+def fresh_caches(work_dir, monkeypatch):
+    """Open the page cache and shared state per test instead of reusing process-wide ones."""
+    monkeypatch.setattr(page_cache, "_page_cache", None)
+    monkeypatch.setattr(page_cache, "_section_cache", None)
+    monkeypatch.setattr(shared_state, "_state", MemoryState())
+
+@pytest.fixture
+def site(serve, tmp_path):
+    directory = tmp_path / "site"
+    directory.mkdir()
+    for name, html in SITE.items():
+        (directory / name).write_text(html, encoding="utf-8")
+    return serve(directory)
+
+def test_download_extracts_page(serve):
+    doc = DocumentContext.download(serve(PAGES) + "quickstart.html")
+    assert doc.error is None
+    assert doc.html and doc.text and doc.text != FALLBACK_TEXT
+    assert doc.structure["headings"] > 0 and doc.structure["paragraphs"] > 0
+
+def test_download_error_uses_fallback_text(serve):
+    doc = DocumentContext.download(serve(PAGES) + "missing.html")
+    assert doc.html is None
+    assert doc.text == FALLBACK_TEXT
+    assert "404" in doc.error
+
+@pytest.mark.parametrize("name", sorted(os.listdir(PAGES)))
+def test_parsers_extract_the_same_text(name):
+    pytest.importorskip("lxml")
+    with open(os.path.join(PAGES, name), encoding="utf-8") as f:
+        html = f.read()
+    fast = DocumentContext.from_html(name, html, parser="lxml")
+    reference = DocumentContext.from_html(name, html, parser="html.parser")
+    assert fast.text == reference.text
+    assert fast.structure == reference.structure
+    assert fast.links == reference.links
+
+def test_conditional_get_reuses_stored_page(serve):
+    url = serve(PAGES) + "release_notes.html"
+    first = DocumentContext.download(url, incremental=True)
+    assert first.incremental and not first.not_modified
+    assert first.previous_sections is None
+    second = DocumentContext.download(url, incremental=True)
+    assert second.incremental and second.not_modified
+    assert second.text == first.text
+    assert second.previous_sections == [s["hash"] for s in first.sections]
+
+def test_fetch_shares_recent_pages(site, tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_context, "FETCH_CACHE_TTL", 60)
+    first = DocumentContext.fetch(site + "setup.html")
+    (tmp_path / "site" / "setup.html").unlink()
+    second = DocumentContext.fetch(site + "setup.html")
+    assert second.error is None and second.text == first.text
+    monkeypatch.setattr(doc_context, "FETCH_CACHE_TTL", 0)
+    assert DocumentContext.fetch(site + "setup.html").html is None
+
+@pytest.fixture
+def gemini(stub_gemini, monkeypatch):
+    client = GeminiClient(api_key="test", base_url=stub_gemini.base_url, cache=ResponseCache(":memory:"),
+                          rate=1000, burst=1000)
+    monkeypatch.setattr(llm_client, "_client", client)
+    return stub_gemini
+
+def read_pages(output_dir):
+    with open(os.path.join(output_dir, "pages.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_crawl_follows_same_host_links(site, gemini):
+    summary = crawl_site([site + "index.html"], "out", max_depth=1, delay=0)
+    records = {record["url"]: record for record in read_pages("out")}
+    assert set(records) == {site + "index.html", site + "setup.html", site + "usage.html"}
+    assert records[site + "index.html"]["links"] == [site + "setup.html", site + "usage.html"]
+    assert records[site + "setup.html"]["links"] == []
+    assert all(record["status"] == "ok" for record in records.values())
+    assert summary["pages"] == 3 and summary["errors"] == 0
+
+def test_crawl_resumes_from_pages_file(site, gemini):
+    crawl_site([site + "index.html"], "out", max_depth=1, max_pages=1, delay=0)
+    assert [record["url"] for record in read_pages("out")] == [site + "index.html"]
+    summary = crawl_site([site + "index.html"], "out", max_depth=1, delay=0)
+    urls = [record["url"] for record in read_pages("out")]
+    assert urls[0] == site + "index.html" and sorted(urls[1:]) == [site + "setup.html", site + "usage.html"]
+    assert summary["pages"] == 3
+
+def test_incremental_crawl_reuses_reports_for_the_same_model(site, gemini, monkeypatch):
+    import backend.doc_analyzer as doc_analyzer
+
+    def reused(output_dir):
+        crawl_site([site + "setup.html"], output_dir, delay=0, incremental=True)
+        return read_pages(output_dir)[0]["report"]["incremental"]["reused_report"]
+
+    assert not reused("first")
+    assert reused("second")
+    prompt, config, _ = doc_analyzer.ASSESSMENT_KEY_PARAMS
+    monkeypatch.setattr(doc_analyzer, "ASSESSMENT_KEY_PARAMS", (prompt, config, "another-model"))
+    assert not reused("third")
+
+def test_failed_conditional_get_is_still_incremental(site, tmp_path):
+    url = site + "usage.html"
+    first = DocumentContext.download(url, incremental=True)
+    (tmp_path / "site" / "usage.html").unlink()
+    failed = DocumentContext.download(url, incremental=True)
+    assert failed.html is None and failed.text == FALLBACK_TEXT
+    assert failed.incremental and not failed.not_modified
+    assert failed.previous_sections == [s["hash"] for s in first.sections]
@@ -0,0 +1,64 @@
+import time
+from backend.llm_cache import ResponseCache
+from backend.llm_client import GeminiClient
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    key = cache.make_key("gemini-1.5-flash", "Simplify.", "Some text.", {"maxOutputTokens": 20})
+    assert cache.get(key) is None
+    cache.set(key, "Short text.")
+    assert cache.get(key) == "Short text."
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+def test_key_covers_model_prompt_text_and_config():
+    base = ("gemini-1.5-flash", "Simplify.", "Some text.", {"maxOutputTokens": 20})
+    key = ResponseCache.make_key(*base)
+    assert ResponseCache.make_key(*base) == key
+    for changed in (("gemini-1.5-pro",) + base[1:], base[:1] + ("Shorten.",) + base[2:],
+                    base[:2] + ("Other text.",) + base[3:], base[:3] + ({"maxOutputTokens": 40},)):
+        assert ResponseCache.make_key(*changed) != key
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path).set("key", "value")
+    assert ResponseCache(path).get("key") == "value"
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=0.2)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    time.sleep(0.3)
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"  # Now more recently used than b
+    time.sleep(0.01)
+    cache.set("c", "3")
+    assert cache.stats()["entries"] == 2
+    assert cache.peek("b") is None
+    assert cache.peek("a") == "1" and cache.peek("c") == "3"
+
+def test_peek_is_not_counted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("key", "value")
+    assert cache.peek("key") == "value"
+    assert cache.peek("missing") is None
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+
+def test_client_serves_repeated_requests_from_cache(stub_gemini):
+    cache = ResponseCache(":memory:")
+    client = GeminiClient(api_key="test", base_url=stub_gemini.base_url, cache=cache)
+    first = client.generate("Simplify.", "Configure the campaign settings.")
+    second = client.generate("Simplify.", "Configure the campaign settings.")
+    assert first == second == "Configure the campaign settings."
+    assert stub_gemini.requests == 1
+    assert client.usage()["requests"] == 1 and client.usage()["cached"] == 1
+    client.generate("Simplify.", "Configure the campaign settings.", generation_config={"maxOutputTokens": 5})
+    assert stub_gemini.requests == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 2}
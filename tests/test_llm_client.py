@@ -0,0 +1,97 @@
+import threading
+import time
+import pytest
+import backend.llm_client as llm_client
+from backend.llm_cache import ResponseCache
+from backend.llm_client import GeminiClient, LLMError
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    """Keep jittered backoff short; Retry-After and deadlines are tested explicitly."""
+    monkeypatch.setattr(llm_client, "BACKOFF_BASE", 0.01)
+
+def make_client(stub, **kwargs):
+    return GeminiClient(api_key="test", base_url=stub.base_url, cache=ResponseCache(":memory:"),
+                        rate=1000, burst=1000, **kwargs)
+
+def test_transient_failures_are_retried(stub_gemini):
+    stub_gemini.fail_first = 2
+    client = make_client(stub_gemini)
+    assert client.generate("Simplify.", "Open the dashboard.") == "Open the dashboard."
+    assert stub_gemini.requests == 3
+    assert client.usage()["requests"] == 1 and client.usage()["errors"] == 0
+
+def test_retries_are_bounded(stub_gemini):
+    stub_gemini.failure_rate = 1.0
+    client = make_client(stub_gemini, max_retries=2)
+    with pytest.raises(LLMError, match="after 3 attempts"):
+        client.generate("Simplify.", "Open the dashboard.")
+    assert stub_gemini.requests == 3
+    assert client.usage()["errors"] == 1
+
+def test_client_errors_are_not_retried(stub_gemini):
+    stub_gemini.failure_rate = 1.0
+    stub_gemini.failure_status = 400
+    with pytest.raises(LLMError):
+        make_client(stub_gemini).generate("Simplify.", "Open the dashboard.")
+    assert stub_gemini.requests == 1
+
+def test_retry_after_is_honoured(stub_gemini):
+    stub_gemini.fail_first = 1
+    stub_gemini.failure_status = 429
+    stub_gemini.retry_after = 1
+    start = time.monotonic()
+    assert make_client(stub_gemini).generate("Simplify.", "Open the dashboard.") == "Open the dashboard."
+    assert time.monotonic() - start >= 1.0
+    assert stub_gemini.requests == 2
+
+def test_retry_after_beyond_the_deadline_fails_fast(stub_gemini):
+    stub_gemini.failure_rate = 1.0
+    stub_gemini.failure_status = 429
+    stub_gemini.retry_after = 30
+    start = time.monotonic()
+    with pytest.raises(LLMError, match="deadline"):
+        make_client(stub_gemini).generate("Simplify.", "Open the dashboard.", timeout=2.0)
+    assert time.monotonic() - start < 1.0
+    assert stub_gemini.requests == 1
+
+def test_slow_responses_stop_at_the_deadline(stub_gemini):
+    stub_gemini.latency = 3.0
+    start = time.monotonic()
+    with pytest.raises(LLMError):
+        make_client(stub_gemini).generate("Simplify.", "Open the dashboard.", timeout=0.5)
+    assert time.monotonic() - start < 2.5
+
+def test_failed_responses_are_not_cached(stub_gemini):
+    stub_gemini.failure_rate = 1.0
+    client = make_client(stub_gemini, max_retries=0)
+    with pytest.raises(LLMError):
+        client.generate("Simplify.", "Open the dashboard.")
+    stub_gemini.failure_rate = 0.0
+    assert client.generate("Simplify.", "Open the dashboard.") == "Open the dashboard."
+    assert stub_gemini.requests == 2
+
+@pytest.mark.parametrize("result", [
+    {},
+    {"candidates": []},
+    {"candidates": [{"finishReason": "SAFETY"}]},
+    {"candidates": [{"content": {"parts": []}}]},
+])
+def test_responses_without_text(result):
+    assert llm_client.response_text(result) is None
+
+def test_response_text():
+    result = {"candidates": [{"content": {"parts": [{"text": "Open the dashboard."}]}}]}
+    assert llm_client.response_text(result) == "Open the dashboard."
+
+def test_private_caches_do_not_wait_for_each_other(stub_gemini):
+    stub_gemini.latency = 0.3
+    clients = [make_client(stub_gemini, share_requests=False) for _ in range(2)]
+    start = time.monotonic()
+    threads = [threading.Thread(target=client.generate, args=("Simplify.", "Open the dashboard.")) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub_gemini.requests == 2
+    assert time.monotonic() - start < 0.55
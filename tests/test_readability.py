@@ -0,0 +1,50 @@
+import glob
+import os
+import pytest
+from backend.segmentation import SegmentedText, COMPLEX_WORD_SYLLABLES
+from backend.readability import readability_metrics, readability_batch, sentence_counts
+
+textstat = pytest.importorskip("textstat")
+from readability_parity import TOLERANCES, textstat_scores
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+CORPUS = sorted(glob.glob(os.path.join(FIXTURES, "readability", "*.txt")))
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+@pytest.mark.parametrize("path", CORPUS, ids=[os.path.basename(path) for path in CORPUS])
+@pytest.mark.parametrize("metric", sorted(TOLERANCES))
+def test_parity_with_textstat(path, metric):
+    text = read(path)
+    engine = readability_metrics(text)[metric]
+    reference = textstat_scores(text)[metric]
+    assert abs(engine - reference) <= TOLERANCES[metric], f"{metric}: engine {engine}, textstat {reference}"
+
+def test_corpus_is_not_empty():
+    assert len(CORPUS) >= 5
+
+def test_batch_matches_single_documents():
+    texts = [read(path) for path in CORPUS] + [""]
+    assert readability_batch(texts) == [readability_metrics(text) for text in texts]
+
+def test_gunning_fog_counts_every_long_word():
+    # Documented deviation: textstat leaves its easy words ("family", "every") out of the
+    # complex-word share, the engine counts every word of three or more syllables
+    text = "Every family has a computer. Our family uses it every day."
+    segments = SegmentedText(text)
+    complex_words = sum(1 for s in segments.word_syllables if s >= COMPLEX_WORD_SYLLABLES)
+    assert complex_words > textstat.difficult_words(text)
+    words, sentences = segments.word_count, segments.sentence_count
+    expected = 0.4 * (words / sentences + 100 * complex_words / words)
+    assert readability_metrics(segments)["gunning_fog"] == round(expected, 2)
+    assert readability_metrics(segments)["gunning_fog"] > textstat_scores(text)["gunning_fog"]
+
+def test_empty_last_sentence_keeps_previous_counts():
+    segments = SegmentedText("Configuration settings matter. X.")
+    segments.replace_sentence(1, ["***"])
+    counts = sentence_counts(segments)
+    assert counts["words"].tolist() == [3, 0]
+    assert counts["syllables"].tolist() == [9, 0]
+    assert counts["complex"].tolist() == [1, 0]
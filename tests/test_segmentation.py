@@ -0,0 +1,29 @@
+from backend.segmentation import SegmentedText
+
+TEXT = "Open the dashboard. Click the report. Save it now."
+
+def test_map_sentences_drops_empty_results():
+    segments = SegmentedText(TEXT)
+    seen = []
+
+    def drop_middle(sentence):
+        seen.append(sentence)
+        return "" if sentence.startswith("Click") else sentence
+
+    segments.map_sentences(drop_middle)
+    assert seen == ["Open the dashboard.", "Click the report.", "Save it now."]
+    assert segments.sentences == ["Open the dashboard.", "Save it now."]
+    assert segments.word_count == 6
+
+def test_map_sentences_skips_split_results():
+    segments = SegmentedText(TEXT)
+    seen = []
+
+    def split_first(sentence):
+        seen.append(sentence)
+        return ["Open it.", " ", "Look at the dashboard."] if sentence.startswith("Open") else sentence
+
+    segments.map_sentences(split_first)
+    assert seen == ["Open the dashboard.", "Click the report.", "Save it now."]
+    assert segments.sentences == ["Open it.", "Look at the dashboard.", "Click the report.", "Save it now."]
+    assert list(segments.sentence_words) == [0, 2, 6, 9, 12]
@@ -0,0 +1,31 @@
+import pytest
+from backend.sentence_memo import Fingerprint, SentenceMemo, only_numbers_differ
+
+pytest.importorskip("numpy")
+
+@pytest.fixture
+def memo():
+    return SentenceMemo(":memory:", threshold=0.5)
+
+def test_exact_match_ignores_case_whitespace_and_numbers(memo):
+    memo.add(Fingerprint("Wait 5 minutes for the sync."), "Wait 5 minutes.")
+    match = memo.find(Fingerprint("wait 10  minutes for the sync."))
+    assert match == {"value": "Wait 5 minutes.", "numbers": ["5"], "similarity": 1.0}
+
+@pytest.mark.parametrize("stored, sentence", [
+    ("Do delete the old backup files before you upgrade.", "Do not delete the old backup files before you upgrade."),
+    ("Install the mobile app from the store on iOS devices.", "Install the mobile app from the store on Android devices."),
+])
+def test_near_duplicates_with_a_different_word_are_not_reused(memo, stored, sentence):
+    memo.add(Fingerprint(stored), "stored")
+    assert memo.find(Fingerprint(sentence)) is None
+
+def test_near_duplicates_differing_in_punctuation_are_reused(memo):
+    memo.add(Fingerprint("Open the settings page, then click Save."), "Open settings and click Save.")
+    match = memo.find(Fingerprint("Open the settings page then click Save!"))
+    assert match["value"] == "Open settings and click Save." and match["similarity"] == 1.0
+
+def test_only_numbers_differ():
+    assert only_numbers_differ("retry 0 times, then stop.", "retry 0 0 times then stop")
+    assert not only_numbers_differ("retry 0 times, then stop.", "retry 0 or 0 times then stop")
+    assert not only_numbers_differ("do not retry.", "do retry.")
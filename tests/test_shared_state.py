@@ -0,0 +1,143 @@
+import threading
+import time
+import pytest
+from backend.shared_state import MemoryState, SQLiteState, RedisState, SharedTokenBucket, single_flight, open_state
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def states(request, tmp_path):
+    """Return a factory of state handles that share one store, like the workers of a deployment."""
+    if request.param == "memory":
+        state = MemoryState()
+        return lambda: state
+    if request.param == "sqlite":
+        path = str(tmp_path / "shared_state.sqlite3")
+        return lambda: SQLiteState(path)
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    return lambda: RedisState(client=fakeredis.FakeRedis(server=server))
+
+def test_values_are_shared_and_expire(states):
+    first, second = states(), states()
+    first.set("fetch:a", "<html>a</html>")
+    first.set("fetch:b", "<html>b</html>", ttl=0.2)
+    assert second.get("fetch:a") == "<html>a</html>"
+    assert second.get("fetch:b") == "<html>b</html>"
+    time.sleep(0.3)
+    assert second.get("fetch:b") is None
+    second.delete("fetch:a")
+    assert first.get("fetch:a") is None
+    assert first.get("missing") is None
+
+def test_clear_removes_prefix_only(states):
+    state = states()
+    state.set("llm:1", "x")
+    state.set("fetch:1", "y")
+    state.clear("llm:")
+    assert state.get("llm:1") is None
+    assert state.get("fetch:1") == "y"
+
+def test_token_bucket_allows_burst_then_paces(states):
+    first, second = states(), states()
+    for _ in range(3):
+        assert first.take_tokens("gemini:test", 10.0, 3) == 0.0
+    # The burst is used up for every worker sharing the bucket
+    wait = second.take_tokens("gemini:test", 10.0, 3)
+    assert 0.0 < wait <= 0.1 + 1e-6
+    time.sleep(0.15)
+    assert second.take_tokens("gemini:test", 10.0, 3) == 0.0
+
+def test_shared_token_bucket_acquire(states):
+    bucket = SharedTokenBucket("gemini:acquire", 20.0, 2, state=states())
+    other = SharedTokenBucket("gemini:acquire", 20.0, 2, state=states())
+    assert bucket.acquire() and other.acquire()
+    assert not bucket.acquire(timeout=0)
+    start = time.monotonic()
+    assert other.acquire(timeout=1.0)
+    assert 0.02 <= time.monotonic() - start < 0.5
+
+def test_lock_is_exclusive_until_unlocked(states):
+    first, second = states(), states()
+    owner = first.try_lock("lock:page", ttl=10)
+    assert owner is not None
+    assert second.try_lock("lock:page", ttl=10) is None
+    second.unlock("lock:page", "someone-else")
+    assert second.try_lock("lock:page", ttl=10) is None
+    first.unlock("lock:page", owner)
+    assert second.try_lock("lock:page", ttl=10) is not None
+
+def test_lock_expires_after_ttl(states):
+    first, second = states(), states()
+    stale = first.try_lock("lock:crashed", ttl=0.2)
+    assert stale is not None
+    time.sleep(0.3)
+    owner = second.try_lock("lock:crashed", ttl=10)
+    assert owner is not None
+    # The expired holder must not release the new holder's lock
+    first.unlock("lock:crashed", stale)
+    assert first.try_lock("lock:crashed", ttl=10) is None
+    second.unlock("lock:crashed", owner)
+
+def test_single_flight_hands_result_to_waiters(states):
+    store = states()
+    calls = []
+    results = {}
+    started = threading.Event()
+
+    def worker(name):
+        state = states()
+        with single_flight("llm:key", lambda: state.get("result"), state=state, wait=5) as value:
+            if value is None:
+                calls.append(name)
+                started.set()
+                time.sleep(0.3)
+                value = f"done by {name}"
+                state.set("result", value)
+            results[name] = value
+
+    holder = threading.Thread(target=worker, args=("holder",))
+    holder.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=worker, args=(f"waiter-{n}",)) for n in range(3)]
+    for thread in waiters:
+        thread.start()
+    for thread in [holder] + waiters:
+        thread.join()
+    assert calls == ["holder"]
+    assert set(results.values()) == {"done by holder"}
+    assert store.try_lock("lock:llm:key") is not None  # Released after the work
+
+def test_single_flight_waiter_takes_over_when_holder_stores_nothing(states):
+    state = states()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def failing_holder():
+        with single_flight("llm:fails", lambda: None, state=states(), wait=5):
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=failing_holder)
+    holder.start()
+    assert entered.wait(5)
+    threading.Timer(0.2, release.set).start()
+    start = time.monotonic()
+    with single_flight("llm:fails", lambda: None, state=state, wait=5) as value:
+        assert value is None  # The waiter now holds the lock and does the work itself
+        assert state.try_lock("lock:llm:fails") is None
+    assert time.monotonic() - start < 3
+    holder.join()
+
+def test_single_flight_gives_up_after_wait(states):
+    state = states()
+    owner = state.try_lock("lock:llm:stuck", ttl=30)
+    start = time.monotonic()
+    with single_flight("llm:stuck", lambda: None, state=states(), wait=0.3) as value:
+        assert value is None
+    assert 0.3 <= time.monotonic() - start < 2
+    state.unlock("lock:llm:stuck", owner)
+
+def test_open_state_schemes(tmp_path):
+    assert open_state("memory://").kind == "memory"
+    assert open_state(f"sqlite:///{tmp_path / 'state.sqlite3'}").kind == "sqlite"
+    with pytest.raises(ValueError):
+        open_state("ftp://example.com")